@@ -4,11 +4,17 @@ Mortgage Calculator Module
 Calculates mortgage payments using standard amortization formulas.
 """
 
+from functools import lru_cache
 
+
+@lru_cache(maxsize=None)
 def calculate_annual_payment(principal: float, annual_rate: float, years: int) -> float:
     """
     Calculate annual mortgage payment using amortization formula.
 
+    Results are memoized - scripts and sweeps call this repeatedly with the
+    same handful of mortgages.
+
     Formula: PMT = P × [r(1+r)^n] / [(1+r)^n - 1]
 
     Args:
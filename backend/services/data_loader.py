@@ -7,7 +7,33 @@ Uses FRED CPI data to convert nominal returns to real returns.
 
 import json
 import os
-from typing import List, Dict
+from functools import lru_cache
+from typing import List, Dict, Tuple
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def _read_returns_file(data_file_path: str) -> Tuple[Dict, np.ndarray, int]:
+    """
+    Parse a returns JSON file into (data, returns_array, first_year).
+
+    Memoized per path - the API, the agents and the backtester each build
+    their own loader, and they all share one parse of the same file. The
+    array is indexed by year - first_year, years missing from the file are
+    NaN, and it is read-only so sharing it is safe.
+    """
+    with open(data_file_path, 'r') as f:
+        data = json.load(f)
+
+    returns_by_year = {item['year']: item['return'] for item in data['returns']}
+    first_year = min(returns_by_year)
+    returns_array = np.full(max(returns_by_year) - first_year + 1, np.nan)
+    for year, annual_return in returns_by_year.items():
+        returns_array[year - first_year] = annual_return
+    returns_array.flags.writeable = False
+
+    return data, returns_array, first_year
 
 
 class SP500DataLoader:
@@ -30,13 +56,14 @@ class SP500DataLoader:
         self.data_file_path = data_file_path
         self.data = None
         self.returns_by_year = {}
+        self.first_year = None
+        self.returns_array = None
         self.load_data()
 
     def load_data(self) -> None:
         """Load S&P 500 returns from JSON file."""
         try:
-            with open(self.data_file_path, 'r') as f:
-                self.data = json.load(f)
+            self.data, self.returns_array, self.first_year = _read_returns_file(self.data_file_path)
 
             # Create a dictionary for easy lookup by year
             self.returns_by_year = {
@@ -66,14 +93,35 @@ class SP500DataLoader:
             >>> loader.get_returns(2000, 2002)
             [-9.10, -11.89, -22.10]
         """
+        return self.get_returns_array(start_year, end_year).tolist()
+
+    def get_returns_array(self, start_year: int, end_year: int) -> np.ndarray:
+        """
+        Get returns for a specific year range as a read-only float64 array.
+
+        Same range checks as get_returns, but returns a view into the cached
+        series instead of building a list.
+
+        Args:
+            start_year: Starting year (inclusive)
+            end_year: Ending year (inclusive)
+
+        Returns:
+            Array of annual returns as percentages
+        """
         if start_year > end_year:
             raise ValueError(f"Start year ({start_year}) must be <= end year ({end_year})")
 
-        returns = []
-        for year in range(start_year, end_year + 1):
-            if year not in self.returns_by_year:
-                raise ValueError(f"No data available for year {year}")
-            returns.append(self.returns_by_year[year])
+        last_year = self.first_year + len(self.returns_array) - 1
+        if start_year < self.first_year:
+            raise ValueError(f"No data available for year {start_year}")
+        if end_year > last_year:
+            raise ValueError(f"No data available for year {max(start_year, last_year + 1)}")
+
+        returns = self.returns_array[start_year - self.first_year:end_year - self.first_year + 1]
+        missing = np.flatnonzero(np.isnan(returns))
+        if len(missing):
+            raise ValueError(f"No data available for year {start_year + int(missing[0])}")
 
         return returns
 
@@ -11,10 +11,12 @@ Generates:
 """
 
 from typing import List, Dict, Tuple
-from statistics import mean, median, stdev
+from statistics import mean
 import math
 
-from .optimal_allocator import OptimalAllocator
+import numpy as np
+
+from .optimal_allocator import OptimalAllocator, BatchOptimalAllocator
 from .data_loader import SP500DataLoader
 
 
@@ -33,14 +35,21 @@ class HistoricalOptimizer:
         self.mortgage = mortgage_balance
         self.base = protected_base
         self.data_loader = SP500DataLoader()
+        self._windows_cache = {}
 
     def get_all_windows(self, window_size: int = 25) -> List[Dict]:
         """
         Get all rolling windows of specified size.
 
+        Windows are loaded once per window_size and reused by later calls;
+        the returned list is a fresh copy, the window dicts are shared.
+
         Returns:
             List of {period, start_year, end_year, returns}
         """
+        if window_size in self._windows_cache:
+            return list(self._windows_cache[window_size])
+
         windows = []
 
         for start_year in range(1926, 2001):  # 1926-2000
@@ -58,50 +67,93 @@ class HistoricalOptimizer:
                 except Exception as e:
                     print(f"Skipping {start_year}-{end_year}: {e}")
 
-        return windows
+        self._windows_cache[window_size] = windows
+        return list(windows)
 
-    def optimize_all_periods(
-        self,
-        tolerance: float = 1000,
-        progress_callback=None
-    ) -> List[Dict]:
+    def _batch_allocator(self, windows: List[Dict]) -> BatchOptimalAllocator:
+        """Allocator over all windows' returns stacked as one matrix."""
+        return BatchOptimalAllocator(
+            np.array([window['returns'] for window in windows], dtype=np.float64),
+            self.payment,
+            self.mortgage,
+            self.base
+        )
+
+    def optimize_period_columns(self, tolerance: float = 1000) -> Dict:
         """
-        Find optimal allocation for each historical period.
+        Find optimal allocation for each historical period, as columns.
 
         Returns:
-            List of results with period, capital, stock, cash, years, etc.
+            {'windows': [...], 'stock', 'cash', 'total_capital', 'success',
+             'years_to_payoff', 'leftover'} with one array entry per window;
+            years_to_payoff is 0 and leftover 0 where no allocation succeeds
         """
         windows = self.get_all_windows()
-        results = []
 
-        for i, window in enumerate(windows):
-            if progress_callback:
-                progress_callback(i + 1, len(windows), window['period'])
+        # Every period searches in lockstep, one batched simulation per step
+        stocks, cashes, successes, years, leftovers = self._batch_allocator(windows).find_minimum(tolerance)
 
-            allocator = OptimalAllocator(
-                window['returns'],
-                self.payment,
-                self.mortgage,
-                self.base
-            )
+        return {
+            'windows': windows,
+            'stock': stocks,
+            'cash': cashes,
+            'total_capital': stocks + cashes,
+            'success': successes,
+            'years_to_payoff': np.where(successes, years, 0),
+            'leftover': np.where(successes, leftovers, 0.0)
+        }
 
-            stock, cash, sim_result = allocator.find_minimum(tolerance)
+    def _period_results(self, columns: Dict) -> List[Dict]:
+        """Per-period result dicts from optimize_period_columns output."""
+        windows = columns['windows']
+        results = []
 
+        for i, (stock, cash, total, success, years, leftover) in enumerate(zip(
+            columns['stock'].tolist(),
+            columns['cash'].tolist(),
+            columns['total_capital'].tolist(),
+            columns['success'].tolist(),
+            columns['years_to_payoff'].tolist(),
+            columns['leftover'].tolist()
+        )):
+            window = windows[i]
             results.append({
                 'period': window['period'],
                 'start_year': window['start_year'],
                 'end_year': window['end_year'],
-                'total_capital': stock + cash,
+                'total_capital': total,
                 'stock': stock,
                 'cash': cash,
-                'stock_ratio': stock / (stock + cash) if (stock + cash) > 0 else 0,
-                'success': sim_result.get('success', False) if sim_result else False,
-                'years_to_payoff': sim_result.get('years_to_payoff') if sim_result else None,
-                'leftover': sim_result.get('leftover', 0) if sim_result else 0
+                'stock_ratio': stock / total if total > 0 else 0,
+                'success': success,
+                'years_to_payoff': years if success else None,
+                'leftover': leftover if success else 0
             })
 
         return results
 
+    def optimize_all_periods(
+        self,
+        tolerance: float = 1000,
+        progress_callback=None
+    ) -> List[Dict]:
+        """
+        Find optimal allocation for each historical period.
+
+        All periods are searched in one batch, so progress_callback(current,
+        total, period) is called once, with current == total and the last
+        period, after the batch has finished.
+
+        Returns:
+            List of results with period, capital, stock, cash, years, etc.
+        """
+        columns = self.optimize_period_columns(tolerance)
+        windows = columns['windows']
+        if progress_callback and windows:
+            progress_callback(len(windows), len(windows), windows[-1]['period'])
+
+        return self._period_results(columns)
+
     def percentile_analysis(
         self,
         percentiles: List[int] = [10, 25, 50, 75, 90, 95],
@@ -122,53 +174,52 @@ class HistoricalOptimizer:
             }
         """
         print(f"Optimizing all historical periods (tolerance=${tolerance:,.0f})...")
-        all_results = self.optimize_all_periods(
-            tolerance,
-            progress_callback=lambda c, t, p: print(f"  Progress: {c}/{t} - {p}")
-        )
+        columns = self.optimize_period_columns(tolerance)
+        all_results = self._period_results(columns)
+        print(f"  Optimized {len(all_results)} periods")
 
-        # Sort by total capital required
-        sorted_results = sorted(all_results, key=lambda x: x['total_capital'])
+        # Order by total capital required
+        capitals = columns['total_capital']
+        order = np.argsort(capitals, kind='stable')
 
         # Calculate percentiles
         percentile_results = {}
-        n = len(sorted_results)
+        n = len(order)
 
         for p in percentiles:
             index = int((p / 100.0) * n)
             if index >= n:
                 index = n - 1
 
-            percentile_results[p] = sorted_results[index]
+            percentile_results[p] = all_results[order[index]]
 
         # Calculate statistics
-        capitals = [r['total_capital'] for r in all_results]
-        stocks = [r['stock'] for r in all_results]
-        cash = [r['cash'] for r in all_results]
-        years = [r['years_to_payoff'] for r in all_results if r['years_to_payoff']]
+        stocks = columns['stock']
+        cash = columns['cash']
+        years = columns['years_to_payoff'][columns['success']]
 
         statistics = {
             'count': len(all_results),
             'capital': {
-                'mean': mean(capitals),
-                'median': median(capitals),
-                'std': stdev(capitals) if len(capitals) > 1 else 0,
-                'min': min(capitals),
-                'max': max(capitals)
+                'mean': float(capitals.mean()),
+                'median': float(np.median(capitals)),
+                'std': float(capitals.std(ddof=1)) if len(capitals) > 1 else 0,
+                'min': float(capitals[order[0]]),
+                'max': float(capitals[order[-1]])
             },
             'stock': {
-                'mean': mean(stocks),
-                'median': median(stocks)
+                'mean': float(stocks.mean()),
+                'median': float(np.median(stocks))
             },
             'cash': {
-                'mean': mean(cash),
-                'median': median(cash)
+                'mean': float(cash.mean()),
+                'median': float(np.median(cash))
             },
             'years_to_payoff': {
-                'mean': mean(years) if years else 0,
-                'median': median(years) if years else 0,
-                'min': min(years) if years else 0,
-                'max': max(years) if years else 0
+                'mean': float(years.mean()) if len(years) else 0,
+                'median': float(np.median(years)) if len(years) else 0,
+                'min': int(years.min()) if len(years) else 0,
+                'max': int(years.max()) if len(years) else 0
             }
         }
 
@@ -206,27 +257,15 @@ class HistoricalOptimizer:
         print(f"Generating success curve across {len(windows)} periods...")
 
         curve = []
+        allocator = self._batch_allocator(windows)
 
         for i, capital in enumerate(capital_range):
             print(f"  Testing capital ${capital:,.0f} ({i+1}/{len(capital_range)})...")
 
-            successes = 0
-            years_list = []
-
-            for window in windows:
-                allocator = OptimalAllocator(
-                    window['returns'],
-                    self.payment,
-                    self.mortgage,
-                    self.base
-                )
-
-                # Find best split for this capital
-                success, stock, cash, result = allocator.find_best_split(capital)
-
-                if success:
-                    successes += 1
-                    years_list.append(result['years_to_payoff'])
+            # Find best split for this capital in every period at once
+            success, _, _, years, _ = allocator.find_best_split(capital)
+            successes = int(np.count_nonzero(success))
+            years_list = years[success].tolist()
 
             success_rate = (successes / len(windows)) * 100
             avg_years = mean(years_list) if years_list else 0
@@ -267,21 +306,12 @@ class HistoricalOptimizer:
             }
         """
         windows = self.get_all_windows()
+        allocator = self._batch_allocator(windows)
 
         def test_capital(capital: float) -> float:
             """Test capital and return success rate."""
-            successes = 0
-
-            for window in windows:
-                allocator = OptimalAllocator(
-                    window['returns'],
-                    self.payment,
-                    self.mortgage,
-                    self.base
-                )
-                success, _, _, _ = allocator.find_best_split(capital)
-                if success:
-                    successes += 1
+            success, _, _, _, _ = allocator.find_best_split(capital)
+            successes = int(np.count_nonzero(success))
 
             return (successes / len(windows)) * 100
 
@@ -7,6 +7,8 @@ Uses binary search to find the minimum initial investment required.
 
 from typing import List, Dict, Tuple
 
+import numpy as np
+
 
 def simulate_investment(
     initial_amount: float,
@@ -109,6 +111,85 @@ def find_minimum_investment(
     return round(high, 2)
 
 
+def _growth_terms(returns_sequence, start_of_year: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cumulative growth G along the last axis, and the growth each year's
+    withdrawal is discounted by: the growth before the year (1 for the
+    first year) when paying at the start, G itself when paying at the end.
+    """
+    growth = 1 + np.asarray(returns_sequence, dtype=np.float64) / 100.0
+    cumulative_growth = np.cumprod(growth, axis=-1)
+    if not start_of_year:
+        return cumulative_growth, cumulative_growth
+    prior_growth = np.ones_like(cumulative_growth)
+    prior_growth[..., 1:] = cumulative_growth[..., :-1]
+    return cumulative_growth, prior_growth
+
+
+def withdrawal_growth(returns_sequence) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Growth terms of the pay-then-grow balance, along the last axis.
+
+    With G the cumulative growth and G_prev[k] the growth before year k
+    (1 for the first year), the balance after year k of withdrawing the
+    payment at the start of each year is G[k] * (initial - payment * D[k])
+    where D[k] = sum(1 / G_prev[i] for i <= k).
+
+    Returns:
+        (G, D); a 2-D returns_sequence gives one row per window
+    """
+    cumulative_growth, prior_growth = _growth_terms(returns_sequence)
+    return cumulative_growth, np.cumsum(1.0 / prior_growth, axis=-1)
+
+
+def withdrawal_balance_path(
+    returns_sequence,
+    withdrawals,
+    initial_amount: float,
+    start_of_year: bool = True
+) -> np.ndarray:
+    """
+    Balance at the end of every year with a per-year withdrawal schedule.
+
+    withdrawals broadcasts against the years on the last axis (a scalar,
+    one amount per year, or one schedule per row). With start_of_year the
+    withdrawal is taken before that year's return, otherwise after it.
+    """
+    cumulative_growth, discount_growth = _growth_terms(returns_sequence, start_of_year)
+    return cumulative_growth * (initial_amount - np.cumsum(withdrawals / discount_growth, axis=-1))
+
+
+def suffix_growth(returns_sequence) -> np.ndarray:
+    """
+    suffix[..., t] = product of the growth factors from year t to the end of
+    the last axis, i.e. what a dollar moved at the start of year t grows to.
+
+    Depends only on the returns, so one table serves every strategy run
+    over the same windows.
+    """
+    growth = 1 + np.asarray(returns_sequence, dtype=np.float64) / 100.0
+    return np.flip(np.cumprod(np.flip(growth, axis=-1), axis=-1), axis=-1)
+
+
+def stock_balance_path(
+    returns_sequence,
+    annual_payment: float,
+    initial_amount: float
+) -> np.ndarray:
+    """
+    Balance at the end of every year, withdrawing the payment at the start
+    of the year and then applying that year's return (see
+    withdrawal_growth). A 2-D returns_sequence gives one path per row.
+    """
+    cumulative_growth, draw_factors = withdrawal_growth(returns_sequence)
+    return cumulative_growth * (initial_amount - annual_payment * draw_factors)
+
+
+def first_year(mask: np.ndarray) -> int:
+    """1-based year of the first True entry in mask, or 0 if there is none."""
+    return int(mask.argmax()) + 1 if mask.any() else 0
+
+
 def simulate_investment_with_early_payoff(
     initial_amount: float,
     returns_sequence: List[float],
@@ -137,38 +218,46 @@ def simulate_investment_with_early_payoff(
         If balance exceeds remaining mortgage in year 5, returns:
         (True, 5, leftover_amount, year_by_year_data)
     """
-    balance = initial_amount
-    remaining_mortgage = initial_mortgage_balance
-    year_by_year = []
-
-    for year, annual_return_pct in enumerate(returns_sequence, start=1):
-        # Withdraw payment at beginning of year
-        balance -= annual_payment
-        remaining_mortgage -= annual_payment
-
-        # Apply market return
-        balance *= (1 + annual_return_pct / 100.0)
-
-        year_by_year.append({
+    returns = np.asarray(returns_sequence, dtype=np.float64)
+    num_years = len(returns)
+    if num_years == 0:
+        return initial_amount >= 0, 0, round(initial_amount, 2), []
+
+    # Balance after each year's withdrawal and return, all years at once
+    balances = stock_balance_path(returns, annual_payment, initial_amount)
+    remaining_mortgages = initial_mortgage_balance - annual_payment * np.arange(1, num_years + 1)
+
+    # First year that can pay off early or runs out; otherwise the full term
+    can_payoff = balances >= remaining_mortgages
+    stop = can_payoff | (balances < 0)
+    years = int(stop.argmax()) + 1 if stop.any() else num_years
+
+    year_by_year = [
+        {
             'year': year,
             'return': annual_return_pct,
             'balance': round(balance, 2),
             'remaining_mortgage': round(remaining_mortgage, 2),
-            'can_payoff_early': balance >= remaining_mortgage
-        })
+            'can_payoff_early': payoff
+        }
+        for year, annual_return_pct, balance, remaining_mortgage, payoff in zip(
+            range(1, years + 1),
+            returns[:years].tolist(),
+            balances[:years].tolist(),
+            remaining_mortgages[:years].tolist(),
+            can_payoff[:years].tolist()
+        )
+    ]
 
-        # Check for early payoff
-        if balance >= remaining_mortgage:
-            leftover = balance - remaining_mortgage
-            return True, year, round(leftover, 2), year_by_year
+    final_balance = float(balances[years - 1])
 
-        # Check for failure
-        if balance < 0:
-            return False, year, round(balance, 2), year_by_year
+    # Check for early payoff
+    if can_payoff[years - 1]:
+        leftover = final_balance - float(remaining_mortgages[years - 1])
+        return True, years, round(leftover, 2), year_by_year
 
-    # Completed full term
-    success = balance >= 0
-    return success, len(returns_sequence), round(balance, 2), year_by_year
+    # Failure, or completed full term
+    return final_balance >= 0, years, round(final_balance, 2), year_by_year
 
 
 def find_minimum_with_early_payoff(
@@ -14,6 +14,8 @@ Based on:
 from typing import List, Tuple, Dict
 import math
 
+import numpy as np
+
 
 def simulate_smart_withdrawal(
     initial_stock: float,
@@ -102,6 +104,74 @@ def simulate_smart_withdrawal(
     }
 
 
+def simulate_smart_withdrawal_batch(
+    initial_stock: np.ndarray,
+    initial_cash: np.ndarray,
+    returns_matrix: np.ndarray,
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    protected_base: float = 100000
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized simulate_smart_withdrawal over many periods at once.
+
+    Row i of returns_matrix is simulated with initial_stock[i] and
+    initial_cash[i], using the same withdrawal policy and the same float
+    operations as the scalar version. A row stops changing outcome once it
+    pays off or fails.
+
+    Returns:
+        (success, years_to_payoff, leftover) arrays, one entry per row
+    """
+    returns_matrix = np.asarray(returns_matrix, dtype=np.float64)
+    num_rows, num_years = returns_matrix.shape
+    growth_matrix = 1 + returns_matrix / 100.0
+
+    stock_balance = np.array(initial_stock, dtype=np.float64)
+    cash_balance = np.array(initial_cash, dtype=np.float64)
+    remaining_mortgage = initial_mortgage_balance
+    total_balance = stock_balance + cash_balance
+
+    success = np.zeros(num_rows, dtype=bool)
+    years_to_payoff = np.full(num_rows, num_years)
+    leftover = np.zeros(num_rows)
+    active = np.ones(num_rows, dtype=bool)
+
+    for year in range(num_years):
+        market_down = returns_matrix[:, year] < 0
+        has_cash = cash_balance >= annual_payment
+
+        # Market DOWN: cash if there is enough. Market UP: stocks if above
+        # base, else cash if there is enough. Otherwise stocks are forced.
+        use_cash = np.where(market_down, has_cash, ~(stock_balance > protected_base) & has_cash)
+        cash_balance = np.where(use_cash, cash_balance - annual_payment, cash_balance)
+        stock_balance = np.where(use_cash, stock_balance, stock_balance - annual_payment)
+
+        # Apply returns
+        stock_balance *= growth_matrix[:, year]
+        cash_balance *= 1.037  # Cash earns 3.7%
+        remaining_mortgage -= annual_payment
+
+        total_balance = stock_balance + cash_balance
+
+        # Early payoff, then failure, for rows still running
+        paid_off = active & (total_balance >= remaining_mortgage)
+        failed = active & ~paid_off & (total_balance < 0)
+
+        success[paid_off] = True
+        leftover[paid_off] = total_balance[paid_off] - remaining_mortgage
+        leftover[failed] = total_balance[failed]
+        years_to_payoff[paid_off | failed] = year + 1
+
+        active &= ~(paid_off | failed)
+        if not active.any():
+            return success, years_to_payoff, leftover
+
+    success[active] = total_balance[active] >= 0
+    leftover[active] = total_balance[active]
+    return success, years_to_payoff, leftover
+
+
 class OptimalAllocator:
     """
     Find minimum capital allocation using two-phase binary search.
@@ -119,22 +189,57 @@ class OptimalAllocator:
         self.mortgage = mortgage_balance
         self.base = protected_base
 
-    def find_best_split(
-        self,
-        total_capital: float,
-        precision: float = 0.01
-    ) -> Tuple[bool, float, float, Dict]:
+        # The returns never change between probes, so convert them once
+        self._market_down = [stock_return < 0 for stock_return in returns_sequence]
+        self._growth = [1 + stock_return / 100.0 for stock_return in returns_sequence]
+
+    def _simulate_outcome(self, initial_stock: float, initial_cash: float) -> Tuple[bool, int]:
         """
-        Phase 2: For given total capital, find optimal stock/cash split.
+        simulate_smart_withdrawal reduced to what the search compares.
 
-        Uses golden section search on the split ratio.
+        Same arithmetic, but without building year_by_year.
 
-        Args:
-            total_capital: Total capital available
-            precision: Precision for ratio (0.01 = 1%)
+        Returns:
+            (success, years_to_payoff)
+        """
+        payment = self.payment
+        base = self.base
+        stock_balance = initial_stock
+        cash_balance = initial_cash
+        remaining_mortgage = self.mortgage
+        total_balance = stock_balance + cash_balance
+
+        for year, (market_down, growth) in enumerate(zip(self._market_down, self._growth), start=1):
+            if cash_balance >= payment and (market_down or not stock_balance > base):
+                cash_balance -= payment
+            else:
+                stock_balance -= payment
+
+            stock_balance *= growth
+            cash_balance *= 1.037
+            remaining_mortgage -= payment
+
+            total_balance = stock_balance + cash_balance
+
+            if total_balance >= remaining_mortgage:
+                return True, year
+            if total_balance < 0:
+                return False, year
+
+        return total_balance >= 0, len(self._growth)
+
+    def _search_split(
+        self,
+        total_capital: float,
+        precision: float
+    ) -> Tuple[bool, float, float, Tuple[float, float]]:
+        """
+        Golden section search behind find_best_split.
 
         Returns:
-            (success, optimal_stock, optimal_cash, result)
+            (success, optimal_stock, optimal_cash, best_point) where
+            best_point is the (stock, cash) whose simulation was kept, or
+            None if nothing was evaluated
         """
         phi = (1 + math.sqrt(5)) / 2  # Golden ratio ≈ 1.618
 
@@ -143,7 +248,8 @@ class OptimalAllocator:
         c = b - (b - a) / phi
         d = a + (b - a) / phi
 
-        best_result = None
+        best_success = False
+        best_point = None
         best_ratio = 0.5
 
         iterations = 0
@@ -153,50 +259,66 @@ class OptimalAllocator:
             iterations += 1
 
             # Evaluate both points
-            stock_c = total_capital * c
-            cash_c = total_capital * (1 - c)
-            result_c = simulate_smart_withdrawal(
-                stock_c, cash_c, self.returns, self.payment, self.mortgage, self.base
-            )
-
-            stock_d = total_capital * d
-            cash_d = total_capital * (1 - d)
-            result_d = simulate_smart_withdrawal(
-                stock_d, cash_d, self.returns, self.payment, self.mortgage, self.base
-            )
+            point_c = (total_capital * c, total_capital * (1 - c))
+            success_c, years_c = self._simulate_outcome(*point_c)
 
-            # Selection criteria: prefer successful, then faster payoff
-            def score(result):
-                if not result['success']:
-                    return -1000  # Large penalty for failure
-                return -result['years_to_payoff']  # Negative so lower years = higher score
+            point_d = (total_capital * d, total_capital * (1 - d))
+            success_d, years_d = self._simulate_outcome(*point_d)
 
-            score_c = score(result_c)
-            score_d = score(result_d)
+            # Selection criteria: prefer successful, then faster payoff
+            score_c = -years_c if success_c else -1000  # Large penalty for failure
+            score_d = -years_d if success_d else -1000
 
             if score_c > score_d:
                 # c is better, narrow to [a, d]
                 b = d
                 d = c
                 c = b - (b - a) / phi
-                best_result = result_c
+                best_success, best_point = success_c, point_c
                 best_ratio = c
             else:
                 # d is better, narrow to [c, b]
                 a = c
                 c = d
                 d = a + (b - a) / phi
-                best_result = result_d
+                best_success, best_point = success_d, point_d
                 best_ratio = d
 
         # Calculate final allocation
         optimal_stock = total_capital * best_ratio
         optimal_cash = total_capital * (1 - best_ratio)
 
-        if best_result and best_result['success']:
-            return True, optimal_stock, optimal_cash, best_result
-        else:
-            return False, optimal_stock, optimal_cash, best_result
+        return best_success, optimal_stock, optimal_cash, best_point
+
+    def _full_result(self, point: Tuple[float, float]) -> Dict:
+        """Full simulate_smart_withdrawal result for a (stock, cash) point."""
+        if point is None:
+            return None
+        return simulate_smart_withdrawal(
+            point[0], point[1], self.returns, self.payment, self.mortgage, self.base
+        )
+
+    def find_best_split(
+        self,
+        total_capital: float,
+        precision: float = 0.01
+    ) -> Tuple[bool, float, float, Dict]:
+        """
+        Phase 2: For given total capital, find optimal stock/cash split.
+
+        Uses golden section search on the split ratio. Probes only track
+        success and payoff year; the full result (with year_by_year) is
+        simulated once for the split that is kept.
+
+        Args:
+            total_capital: Total capital available
+            precision: Precision for ratio (0.01 = 1%)
+
+        Returns:
+            (success, optimal_stock, optimal_cash, result)
+        """
+        success, optimal_stock, optimal_cash, best_point = self._search_split(total_capital, precision)
+        return success, optimal_stock, optimal_cash, self._full_result(best_point)
 
     def find_minimum(
         self,
@@ -221,7 +343,7 @@ class OptimalAllocator:
 
         optimal_stock = 0
         optimal_cash = 0
-        optimal_result = None
+        optimal_point = None
 
         iterations = 0
         max_iterations = 50  # Safety limit
@@ -231,28 +353,28 @@ class OptimalAllocator:
             mid = (low + high) / 2
 
             # Phase 2: Find best split for this total capital
-            success, stock, cash, result = self.find_best_split(mid)
+            success, stock, cash, point = self._search_split(mid, 0.01)
 
             if success:
                 # Can succeed with this capital, try less
                 optimal_stock = stock
                 optimal_cash = cash
-                optimal_result = result
+                optimal_point = point
                 high = mid
             else:
                 # Need more capital
                 low = mid
 
         # If we never found a success, search up to max
-        if optimal_result is None or not optimal_result.get('success'):
+        if optimal_point is None:
             # Try the maximum capital
-            success, stock, cash, result = self.find_best_split(max_capital)
+            success, stock, cash, point = self._search_split(max_capital, 0.01)
             if success:
                 optimal_stock = stock
                 optimal_cash = cash
-                optimal_result = result
+                optimal_point = point
 
-        return optimal_stock, optimal_cash, optimal_result
+        return optimal_stock, optimal_cash, self._full_result(optimal_point)
 
     def search_range(
         self,
@@ -292,6 +414,178 @@ class OptimalAllocator:
         return results
 
 
+class BatchOptimalAllocator:
+    """
+    OptimalAllocator over many periods of equal length at once.
+
+    Runs the same two-phase search as OptimalAllocator for every row of
+    returns_matrix in lockstep, so each search step is one batched
+    simulation across all periods instead of one simulation per period.
+    """
+
+    def __init__(
+        self,
+        returns_matrix: np.ndarray,
+        annual_payment: float,
+        mortgage_balance: float,
+        protected_base: float = 100000
+    ):
+        self.returns = np.asarray(returns_matrix, dtype=np.float64)
+        self.payment = annual_payment
+        self.mortgage = mortgage_balance
+        self.base = protected_base
+
+    def _subset(self, rows: np.ndarray) -> 'BatchOptimalAllocator':
+        return BatchOptimalAllocator(self.returns[rows], self.payment, self.mortgage, self.base)
+
+    def _simulate(self, stock: np.ndarray, cash: np.ndarray, rows: np.ndarray):
+        return simulate_smart_withdrawal_batch(
+            stock[rows], cash[rows], self.returns[rows], self.payment, self.mortgage, self.base
+        )
+
+    def find_best_split(
+        self,
+        total_capital: np.ndarray,
+        precision: float = 0.01
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Phase 2 for every period: golden section search on the split ratio.
+
+        Args:
+            total_capital: Total capital available, per period
+            precision: Precision for ratio (0.01 = 1%)
+
+        Returns:
+            (success, optimal_stock, optimal_cash, years_to_payoff, leftover)
+            arrays; years_to_payoff and leftover describe the best split found
+        """
+        phi = (1 + math.sqrt(5)) / 2  # Golden ratio ≈ 1.618
+        total_capital = np.broadcast_to(np.asarray(total_capital, dtype=np.float64), (len(self.returns),))
+        num_rows = len(self.returns)
+
+        # Search bounds: [0, 1] representing stock ratio
+        a = np.zeros(num_rows)
+        b = np.ones(num_rows)
+        c = b - (b - a) / phi
+        d = a + (b - a) / phi
+
+        best_ratio = np.full(num_rows, 0.5)
+        success = np.zeros(num_rows, dtype=bool)
+        years_to_payoff = np.zeros(num_rows, dtype=int)
+        leftover = np.zeros(num_rows)
+
+        iterations = 0
+        max_iterations = 50  # Safety limit
+
+        while iterations < max_iterations:
+            rows = np.flatnonzero(np.abs(b - a) > precision)
+            if len(rows) == 0:
+                break
+            iterations += 1
+
+            # Evaluate both points
+            success_c, years_c, leftover_c = self._simulate(total_capital * c, total_capital * (1 - c), rows)
+            success_d, years_d, leftover_d = self._simulate(total_capital * d, total_capital * (1 - d), rows)
+
+            # Selection criteria: prefer successful, then faster payoff
+            score_c = np.where(success_c, -years_c, -1000)
+            score_d = np.where(success_d, -years_d, -1000)
+            pick_c = score_c > score_d
+            rows_c = rows[pick_c]
+            rows_d = rows[~pick_c]
+
+            # c is better, narrow to [a, d]
+            b[rows_c] = d[rows_c]
+            d[rows_c] = c[rows_c]
+            c[rows_c] = b[rows_c] - (b[rows_c] - a[rows_c]) / phi
+            best_ratio[rows_c] = c[rows_c]
+
+            # d is better, narrow to [c, b]
+            a[rows_d] = c[rows_d]
+            c[rows_d] = d[rows_d]
+            d[rows_d] = a[rows_d] + (b[rows_d] - a[rows_d]) / phi
+            best_ratio[rows_d] = d[rows_d]
+
+            success[rows] = np.where(pick_c, success_c, success_d)
+            years_to_payoff[rows] = np.where(pick_c, years_c, years_d)
+            leftover[rows] = np.where(pick_c, leftover_c, leftover_d)
+
+        # Calculate final allocation
+        optimal_stock = total_capital * best_ratio
+        optimal_cash = total_capital * (1 - best_ratio)
+
+        return success, optimal_stock, optimal_cash, years_to_payoff, leftover
+
+    def find_minimum(
+        self,
+        tolerance: float = 1000,
+        max_capital: float = None
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Phase 1 for every period: binary search on total capital.
+
+        Args:
+            tolerance: Dollar precision (default $1K)
+            max_capital: Maximum to search (default = mortgage balance)
+
+        Returns:
+            (optimal_stock, optimal_cash, success, years_to_payoff, leftover)
+            arrays; success is False for periods that fail even at
+            max_capital, whose stock/cash are 0
+        """
+        if max_capital is None:
+            max_capital = self.mortgage
+
+        num_rows = len(self.returns)
+        low = np.zeros(num_rows)
+        high = np.full(num_rows, float(max_capital))
+
+        optimal_stock = np.zeros(num_rows)
+        optimal_cash = np.zeros(num_rows)
+        found = np.zeros(num_rows, dtype=bool)
+        years_to_payoff = np.zeros(num_rows, dtype=int)
+        leftover = np.zeros(num_rows)
+
+        iterations = 0
+        max_iterations = 50  # Safety limit
+
+        while iterations < max_iterations:
+            running = high - low > tolerance
+            if not running.any():
+                break
+            iterations += 1
+            rows = np.flatnonzero(running)
+            mid = (low[rows] + high[rows]) / 2
+
+            # Phase 2: Find best split for this total capital
+            success, stock, cash, years, left = self._subset(rows).find_best_split(mid)
+
+            # Can succeed with this capital, try less
+            hit = rows[success]
+            optimal_stock[hit] = stock[success]
+            optimal_cash[hit] = cash[success]
+            years_to_payoff[hit] = years[success]
+            leftover[hit] = left[success]
+            found[hit] = True
+            high[hit] = mid[success]
+
+            # Need more capital
+            low[rows[~success]] = mid[~success]
+
+        # If we never found a success, try the maximum capital
+        if not found.all():
+            rows = np.flatnonzero(~found)
+            success, stock, cash, years, left = self._subset(rows).find_best_split(float(max_capital))
+            hit = rows[success]
+            optimal_stock[hit] = stock[success]
+            optimal_cash[hit] = cash[success]
+            years_to_payoff[hit] = years[success]
+            leftover[hit] = left[success]
+            found[hit] = True
+
+        return optimal_stock, optimal_cash, found, years_to_payoff, leftover
+
+
 def find_optimal_allocation(
     returns_sequence: List[float],
     annual_payment: float,
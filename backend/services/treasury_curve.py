@@ -0,0 +1,28 @@
+"""
+Treasury Curve Module
+
+Interpolates a treasury yield curve given as {maturity_year: rate_percent}.
+"""
+
+from typing import Union
+
+import numpy as np
+
+
+def interpolate_treasury_rate(year: Union[int, np.ndarray], rate_points: dict) -> Union[float, np.ndarray]:
+    """
+    Interpolate treasury rate for given year (or array of years), clamped to
+    the first and last points of the curve.
+    """
+    years = sorted(rate_points)
+    return np.interp(year, years, [rate_points[y] for y in years])
+
+
+def treasury_present_values(annual_payment: float, num_years: int, rate_points: dict) -> np.ndarray:
+    """
+    Cost today of each year's payment, for years 1..num_years (index
+    year - 1): the payment discounted at that maturity's interpolated rate.
+    """
+    years_from_now = np.arange(1, num_years + 1)
+    rates = interpolate_treasury_rate(years_from_now, rate_points) / 100.0
+    return annual_payment / (1 + rates) ** years_from_now
@@ -21,39 +21,14 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
+from backend.services.treasury_curve import interpolate_treasury_rate
 from typing import Tuple, List, Dict
 
 
-def interpolate_treasury_rate(year: int, rate_points: dict) -> float:
-    """Interpolate treasury rate for given year."""
-    years = sorted(rate_points.keys())
-
-    if year in rate_points:
-        return rate_points[year]
-
-    lower_year = None
-    upper_year = None
-
-    for y in years:
-        if y < year:
-            lower_year = y
-        elif y > year and upper_year is None:
-            upper_year = y
-            break
-
-    if lower_year is None:
-        return rate_points[years[0]]
-    if upper_year is None:
-        return rate_points[years[-1]]
-
-    lower_rate = rate_points[lower_year]
-    upper_rate = rate_points[upper_year]
-
-    return lower_rate + (year - lower_year) * (upper_rate - lower_rate) / (upper_year - lower_year)
-
-
 def calculate_treasury_cost_for_years(
     annual_payment: float,
     start_year: int,
@@ -61,15 +36,9 @@ def calculate_treasury_cost_for_years(
     treasury_rates: dict
 ) -> float:
     """Calculate cost TODAY to buy treasury ladder for years [start_year, end_year]."""
-    total_cost = 0
-
-    for year in range(start_year, end_year + 1):
-        rate = interpolate_treasury_rate(year, treasury_rates) / 100.0
-        discount_factor = (1 + rate) ** year
-        cost_today = annual_payment / discount_factor
-        total_cost += cost_today
-
-    return total_cost
+    years = np.arange(start_year, end_year + 1)
+    rates = interpolate_treasury_rate(years, treasury_rates) / 100.0
+    return float(np.sum(annual_payment / (1 + rates) ** years))
 
 
 def simulate_barbell_strategy(
@@ -14,6 +14,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
+import numpy as np
 
 
 def simulate_correct_strategy(
@@ -101,6 +102,64 @@ def simulate_correct_strategy(
     }
 
 
+def simulate_correct_strategy_batch(
+    initial_stocks: np.ndarray,
+    initial_cashes: np.ndarray,
+    returns_sequence: list,
+    annual_payment: float,
+    remaining_schedule: np.ndarray,
+    protected_base: float = 100000
+):
+    """
+    Run simulate_correct_strategy for several (stock, cash) allocations at once.
+
+    Each balance is an array with one slot per allocation; the withdrawal rules
+    become masks, and the mortgage balance after each year's payment is read
+    from the precomputed remaining_schedule. Allocations that have already
+    paid off or failed keep updating but their outcome is frozen.
+
+    Returns:
+        (success, years_to_payoff, leftover) arrays, one entry per allocation
+    """
+    stock_balance = np.array(initial_stocks, dtype=np.float64)
+    cash_balance = np.array(initial_cashes, dtype=np.float64)
+
+    success = np.zeros(len(stock_balance), dtype=bool)
+    years_to_payoff = np.full(len(stock_balance), len(returns_sequence))
+    leftover = np.zeros(len(stock_balance))
+    active = np.ones(len(stock_balance), dtype=bool)
+
+    for year, stock_return in enumerate(returns_sequence, start=1):
+        cash_ok = cash_balance >= annual_payment
+        if stock_return < 0:
+            use_cash = cash_ok
+        else:
+            use_cash = (stock_balance <= protected_base) & cash_ok
+        cash_balance = np.where(use_cash, cash_balance - annual_payment, cash_balance)
+        stock_balance = np.where(use_cash, stock_balance, stock_balance - annual_payment)
+
+        stock_balance = stock_balance * (1 + stock_return / 100.0)
+        cash_balance = cash_balance * 1.037
+        remaining_mortgage = remaining_schedule[year - 1]
+
+        total_balance = stock_balance + cash_balance
+
+        paid_off = active & (total_balance >= remaining_mortgage)
+        failed = active & ~paid_off & (total_balance < 0)
+        success[paid_off] = True
+        years_to_payoff[paid_off | failed] = year
+        leftover[paid_off] = total_balance[paid_off] - remaining_mortgage
+        leftover[failed] = total_balance[failed]
+        active &= ~(paid_off | failed)
+
+        if not active.any():
+            return success, years_to_payoff, leftover
+
+    success[active] = total_balance[active] >= 0
+    leftover[active] = total_balance[active]
+    return success, years_to_payoff, leftover
+
+
 def find_optimal_allocation(returns_sequence, annual_payment, mortgage_balance, period_name):
     """Find minimum capital needed for this period."""
     # Test allocations well UNDER $500K
@@ -125,26 +184,41 @@ def find_optimal_allocation(returns_sequence, annual_payment, mortgage_balance,
     print("Stock   | Cash   | Total   | Result")
     print("--------|--------|---------|------------------------------------------")
 
+    stocks = np.array([stock for stock, _ in test_cases])
+    cashes = np.array([cash for _, cash in test_cases])
+    remaining_schedule = mortgage_balance - annual_payment * np.arange(1, len(returns_sequence) + 1)
+    success, years_to_payoff, leftover = simulate_correct_strategy_batch(
+        stocks, cashes, returns_sequence, annual_payment, remaining_schedule
+    )
+
     best = None
     best_total = float('inf')
+    rows = []
 
-    for stock, cash in test_cases:
+    for i, (stock, cash) in enumerate(test_cases):
         total = stock + cash
-        result = simulate_correct_strategy(
-            stock, cash, returns_sequence, annual_payment, mortgage_balance
-        )
 
-        if result['success']:
-            outcome = f"✓ Paid off yr {result['years_to_payoff']}, ${result['leftover']:,.0f} left"
+        if success[i]:
+            outcome = f"✓ Paid off yr {years_to_payoff[i]}, ${leftover[i]:,.0f} left"
             if total < best_total:
                 best_total = total
-                best = (stock, cash, result)
+                best = (stock, cash)
         else:
-            outcome = f"✗ Failed yr {result['years_to_payoff']}"
+            outcome = f"✗ Failed yr {years_to_payoff[i]}"
+
+        rows.append(f"${stock:>6,} | ${cash:>5,} | ${total:>6,} | {outcome}")
+
+    sys.stdout.write("\n".join(rows) + "\n")
 
-        print(f"${stock:>6,} | ${cash:>5,} | ${total:>6,} | {outcome}")
+    if best is None:
+        return None
 
-    return best
+    # Re-run the winner on its own for the full year-by-year record
+    stock, cash = best
+    result = simulate_correct_strategy(
+        stock, cash, returns_sequence, annual_payment, mortgage_balance
+    )
+    return stock, cash, result
 
 
 def main():
@@ -213,14 +287,16 @@ def main():
     print("Period      | Total Capital | Stock   | Cash   | Years | Status")
     print("------------|---------------|---------|--------|-------|------------------")
 
+    rows = []
     for r in results_summary:
         if r['total_capital']:
             status = "✓ Under $500K" if r['total_capital'] < 500000 else "⚠️ At/Over $500K"
-            print(f"{r['period']:11s} | ${r['total_capital']:>12,} | ${r['stock']:>6,} | ${r['cash']:>5,} | "
-                  f"{r['years_to_payoff']:5d} | {status}")
+            rows.append(f"{r['period']:11s} | ${r['total_capital']:>12,} | ${r['stock']:>6,} | ${r['cash']:>5,} | "
+                        f"{r['years_to_payoff']:5d} | {status}")
         else:
-            print(f"{r['period']:11s} | {'FAILED':>13s} | {'N/A':>7s} | {'N/A':>6s} | {'N/A':>5s} | ✗ Failed")
+            rows.append(f"{r['period']:11s} | {'FAILED':>13s} | {'N/A':>7s} | {'N/A':>6s} | {'N/A':>5s} | ✗ Failed")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
 
     # Analysis
@@ -9,49 +9,106 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
-from typing import List, Dict
+from typing import List, Dict, Tuple
+import numpy as np
 
 
 def simulate_smart_withdrawal(
-    initial_stock: float,
-    initial_cash: float,
-    returns_sequence: List[float],
+    initial_stocks: np.ndarray,
+    initial_cashes: np.ndarray,
+    growths: np.ndarray,
+    downs: np.ndarray,
     annual_payment: float,
-    initial_mortgage_balance: float,
+    remaining_schedule: np.ndarray,
     protected_base: float = 100000
-) -> Dict:
-    """Smart withdrawal simulation."""
-    stock_balance = initial_stock
-    cash_balance = initial_cash
-    remaining_mortgage = initial_mortgage_balance
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        if stock_return < 0:
-            if cash_balance >= annual_payment:
-                cash_balance -= annual_payment
-            else:
-                stock_balance -= annual_payment
-        else:
-            if stock_balance > protected_base:
-                stock_balance -= annual_payment
-            elif cash_balance >= annual_payment:
-                cash_balance -= annual_payment
-            else:
-                stock_balance -= annual_payment
-
-        stock_balance *= (1 + stock_return / 100.0)
-        cash_balance *= 1.037
-        remaining_mortgage -= annual_payment
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Smart withdrawal simulation, run for every allocation across every window at once.
+
+    Takes one (stock, cash) allocation per entry of initial_stocks/initial_cashes,
+    plus the stacked growth factors (1 + return/100) and down-year masks, one
+    row per window, and the mortgage balance left after each year's payment
+    (see mortgage_schedule). All allocation/window pairs step through each year
+    together. Pairs that have already paid off or failed keep updating but
+    their outcome is frozen.
+
+    Returns:
+        (success, years, leftover) arrays of shape (allocations, windows)
+    """
+    n_windows, n_years = growths.shape
+    shape = (len(initial_stocks), n_windows)
+    stock_balance = np.repeat(np.asarray(initial_stocks, dtype=np.float64)[:, None], n_windows, axis=1)
+    cash_balance = np.repeat(np.asarray(initial_cashes, dtype=np.float64)[:, None], n_windows, axis=1)
+
+    success = np.zeros(shape, dtype=bool)
+    years = np.full(shape, n_years)
+    leftover = np.zeros(shape)
+    active = np.ones(shape, dtype=bool)
+
+    for year in range(n_years):
+        cash_ok = cash_balance >= annual_payment
+        # Down year: cash if available. Up year: stocks if above base, else cash if available.
+        use_cash = np.where(downs[:, year], cash_ok, (stock_balance <= protected_base) & cash_ok)
+        cash_balance = np.where(use_cash, cash_balance - annual_payment, cash_balance)
+        stock_balance = np.where(use_cash, stock_balance, stock_balance - annual_payment)
+
+        stock_balance = stock_balance * growths[:, year]
+        cash_balance = cash_balance * 1.037
+        remaining_mortgage = remaining_schedule[year]
 
         total_balance = stock_balance + cash_balance
 
-        if total_balance >= remaining_mortgage:
-            return {'success': True, 'years': year, 'leftover': total_balance - remaining_mortgage}
-        if total_balance < 0:
-            return {'success': False, 'years': year, 'leftover': total_balance}
+        paid_off = active & (total_balance >= remaining_mortgage)
+        failed = active & ~paid_off & (total_balance < 0)
+        success[paid_off] = True
+        years[paid_off | failed] = year + 1
+        leftover[paid_off] = total_balance[paid_off] - remaining_mortgage
+        leftover[failed] = total_balance[failed]
+        active &= ~(paid_off | failed)
+
+        if not active.any():
+            return success, years, leftover
+
+    # Windows that ran the full term
+    success[active] = total_balance[active] >= 0
+    leftover[active] = np.where(
+        total_balance[active] > remaining_mortgage,
+        total_balance[active] - remaining_mortgage,
+        total_balance[active]
+    )
+    return success, years, leftover
 
-    return {'success': total_balance >= 0, 'years': len(returns_sequence),
-            'leftover': total_balance - remaining_mortgage if total_balance > remaining_mortgage else total_balance}
+
+def mortgage_schedule(mortgage_balance: float, annual_payment: float, years: int) -> np.ndarray:
+    """Mortgage balance remaining after each of the first `years` annual payments."""
+    return mortgage_balance - annual_payment * np.arange(1, years + 1)
+
+
+def simulate_splits(
+    splits: List[Tuple[float, float]],
+    growths: np.ndarray,
+    downs: np.ndarray,
+    annual_payment: float,
+    remaining_schedule: np.ndarray,
+    cache: Dict
+) -> Dict:
+    """
+    Run stock/cash splits across every window, filling in `cache`.
+
+    Splits not already in the cache are simulated together in one batch and
+    stored as (success, years, leftover) per-window arrays keyed by
+    (stocks, cash), so a split shared between sweeps (e.g. $240K/$60K is
+    both a $300K split and 80% of $300K) is only simulated once.
+    """
+    missing = [split for split in dict.fromkeys(splits) if split not in cache]
+    if missing:
+        success, years, leftover = simulate_smart_withdrawal(
+            [stocks for stocks, _ in missing], [cash for _, cash in missing],
+            growths, downs, annual_payment, remaining_schedule
+        )
+        for i, split in enumerate(missing):
+            cache[split] = (success[i], years[i], leftover[i])
+    return cache
 
 
 def main():
@@ -65,22 +122,23 @@ def main():
     mortgage_rate = 3.0
     annual_payment = calculate_annual_payment(mortgage_balance, mortgage_rate, 25)
 
-    # Get all windows
-    all_windows = []
-    for start_year in range(1926, 2001):
+    # Get all windows as one (windows, 25) array so every split reuses them
+    # (clamped to the years the data covers)
+    first_year, last_year = loader.get_available_years()
+    periods = []
+    window_returns = []
+    for start_year in range(max(1926, first_year), min(2000, last_year - 24) + 1):
         end_year = start_year + 24
-        if end_year <= 2025:
-            try:
-                returns = loader.get_returns(start_year, end_year)
-                if len(returns) == 25:
-                    all_windows.append({
-                        'period': f"{start_year}-{end_year}",
-                        'returns': returns
-                    })
-            except:
-                pass
-
-    print(f"Testing across {len(all_windows)} historical periods")
+        periods.append(f"{start_year}-{end_year}")
+        window_returns.append(loader.get_returns_array(start_year, end_year))
+
+    returns2d = np.array(window_returns, dtype=np.float64)
+    growth2d = 1.0 + returns2d / 100.0
+    down2d = returns2d < 0.0
+
+    remaining_schedule = mortgage_schedule(mortgage_balance, annual_payment, returns2d.shape[1])
+
+    print(f"Testing across {len(periods)} historical periods")
     print()
 
     # Test different splits of $300K
@@ -97,26 +155,19 @@ def main():
     print("--------|---------|---------|-----------|--------------|------------------")
 
     results_by_split = []
+    rows = []
+    split_results = simulate_splits(splits, growth2d, down2d, annual_payment, remaining_schedule, {})
 
     for stocks, cash in splits:
-        successes = []
-        failures = 0
-
-        for window in all_windows:
-            result = simulate_smart_withdrawal(
-                stocks, cash, window['returns'], annual_payment, mortgage_balance
-            )
-
-            if result['success']:
-                successes.append(result)
-            else:
-                failures += 1
+        success, years, leftover = split_results[(stocks, cash)]
+        successes = int(success.sum())
+        failures = len(periods) - successes
 
-        success_rate = len(successes) / len(all_windows) * 100
+        success_rate = successes / len(periods) * 100
 
         if successes:
-            avg_years = sum(r['years'] for r in successes) / len(successes)
-            avg_leftover = sum(r['leftover'] for r in successes) / len(successes)
+            avg_years = float(years[success].mean())
+            avg_leftover = float(leftover[success].mean())
         else:
             avg_years = 0
             avg_leftover = 0
@@ -125,7 +176,7 @@ def main():
             'stocks': stocks,
             'cash': cash,
             'success_rate': success_rate,
-            'successes': len(successes),
+            'successes': successes,
             'failures': failures,
             'avg_years': avg_years,
             'avg_leftover': avg_leftover
@@ -139,8 +190,9 @@ def main():
         else:
             notes = "❌ Poor"
 
-        print(f"${stocks:>6,} | ${cash:>6,} | {success_rate:6.1f}% | {avg_years:9.1f} | ${avg_leftover:>11,.0f} | {notes}")
+        rows.append(f"${stocks:>6,} | ${cash:>6,} | {success_rate:6.1f}% | {avg_years:9.1f} | ${avg_leftover:>11,.0f} | {notes}")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
 
     # Find best split
@@ -187,6 +239,15 @@ def main():
     print("Total   | Best Stock% | Success | Avg Years | With $200K reserve")
     print("--------|-------------|---------|-----------|--------------------")
 
+    amount_splits = [
+        (total * pct / 100, total - total * pct / 100)
+        for total in test_amounts
+        for pct in range(60, 101, 10)  # 60% to 100% stocks
+    ]
+    simulate_splits(amount_splits, growth2d, down2d, annual_payment, remaining_schedule, split_results)
+
+    rows = []
+
     for total in test_amounts:
         # Test different splits for this total
         best_success = 0
@@ -196,15 +257,8 @@ def main():
             stocks = total * pct / 100
             cash = total - stocks
 
-            successes = []
-            for window in all_windows:
-                result = simulate_smart_withdrawal(
-                    stocks, cash, window['returns'], annual_payment, mortgage_balance
-                )
-                if result['success']:
-                    successes.append(result)
-
-            success_rate = len(successes) / len(all_windows) * 100
+            success, years, _ = split_results[(stocks, cash)]
+            success_rate = success.mean() * 100
 
             if success_rate > best_success:
                 best_success = success_rate
@@ -212,13 +266,14 @@ def main():
                     'stocks': stocks,
                     'cash': cash,
                     'success_rate': success_rate,
-                    'avg_years': sum(r['years'] for r in successes) / len(successes) if successes else 0
+                    'avg_years': float(years[success].mean()) if success.any() else 0
                 }
 
         reserve = 500000 - total
-        print(f"${total:>6,} | {best_split['stocks']/total*100:>10.0f}% | {best_split['success_rate']:6.1f}% | "
-              f"{best_split['avg_years']:9.1f} | ${reserve:,} @ 1%")
+        rows.append(f"${total:>6,} | {best_split['stocks']/total*100:>10.0f}% | {best_split['success_rate']:6.1f}% | "
+                    f"{best_split['avg_years']:9.1f} | ${reserve:,} @ 1%")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
     print("NOTE: When initial deployment succeeds, you keep the entire reserve!")
     print("      When it fails, you deploy reserve (use all $500K)")
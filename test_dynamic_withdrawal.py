@@ -16,7 +16,25 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Optional
+import numpy as np
+
+
+# Withdrawal source codes stored in year_by_year['withdrawal_source']
+SOURCE_STOCKS = 0
+SOURCE_EMERGENCY = 1
+
+YEAR_DTYPE = np.dtype([
+    ('year', 'i4'),
+    ('return', 'f8'),
+    ('stock_balance', 'f8'),
+    ('emergency_balance', 'f8'),
+    ('total_balance', 'f8'),
+    ('remaining_mortgage', 'f8'),
+    ('withdrawal_source', 'u1'),
+    ('replenishment', 'f8'),
+    ('can_payoff_early', '?'),
+])
 
 
 def simulate_dynamic_withdrawal(
@@ -26,8 +44,9 @@ def simulate_dynamic_withdrawal(
     annual_payment: float,
     initial_mortgage_balance: float,
     crash_threshold: float = -5.0,  # Consider it a crash if return < -5%
-    recovery_threshold: float = 15.0  # Good year if return > 15%
-) -> Tuple[bool, int, float, float, List[Dict]]:
+    recovery_threshold: float = 15.0,  # Good year if return > 15%
+    collect: bool = False
+) -> Tuple[bool, int, float, float, Optional[np.ndarray]]:
     """
     Simulate with dynamic withdrawal strategy.
 
@@ -36,26 +55,27 @@ def simulate_dynamic_withdrawal(
     2. If market return > recovery_threshold AND emergency fund depleted: Replenish from stocks
     3. Otherwise: Withdraw from stocks normally
 
+    The year_by_year record (a YEAR_DTYPE array) is only filled in when
+    collect=True; otherwise None is returned in its place.
+
     Returns:
         (success, years_to_payoff, leftover_investment, leftover_emergency, year_by_year)
     """
     stock_balance = initial_investment
     emergency_balance = emergency_fund
     remaining_mortgage = initial_mortgage_balance
-    year_by_year = []
+    year_by_year = np.empty(len(returns_sequence), dtype=YEAR_DTYPE) if collect else None
 
     for year, stock_return_pct in enumerate(returns_sequence, start=1):
-        withdrawal_source = "stocks"  # Default
-
         # DECISION: Where to withdraw from?
         if stock_return_pct < crash_threshold and emergency_balance >= annual_payment:
             # CRASH YEAR: Use emergency fund, don't touch stocks
-            withdrawal_source = "emergency"
+            withdrawal_source = SOURCE_EMERGENCY
             emergency_balance -= annual_payment
         else:
             # NORMAL/GOOD YEAR: Withdraw from stocks
             stock_balance -= annual_payment
-            withdrawal_source = "stocks"
+            withdrawal_source = SOURCE_STOCKS
 
         # Reduce mortgage
         remaining_mortgage -= annual_payment
@@ -78,25 +98,23 @@ def simulate_dynamic_withdrawal(
 
         total_balance = stock_balance + emergency_balance
 
-        year_by_year.append({
-            'year': year,
-            'return': stock_return_pct,
-            'stock_balance': round(stock_balance, 2),
-            'emergency_balance': round(emergency_balance, 2),
-            'total_balance': round(total_balance, 2),
-            'remaining_mortgage': round(remaining_mortgage, 2),
-            'withdrawal_source': withdrawal_source,
-            'replenishment': round(replenishment, 2),
-            'can_payoff_early': total_balance >= remaining_mortgage
-        })
+        if collect:
+            year_by_year[year - 1] = (
+                year, stock_return_pct, stock_balance, emergency_balance, total_balance,
+                remaining_mortgage, withdrawal_source, replenishment,
+                total_balance >= remaining_mortgage
+            )
 
         # CHECK: Early payoff?
         if total_balance >= remaining_mortgage:
-            leftover_total = total_balance - remaining_mortgage
+            if collect:
+                year_by_year = year_by_year[:year]
             return True, year, round(stock_balance, 2), round(emergency_balance, 2), year_by_year
 
         # CHECK: Ran out of money?
         if total_balance < 0:
+            if collect:
+                year_by_year = year_by_year[:year]
             return False, year, round(stock_balance, 2), round(emergency_balance, 2), year_by_year
 
     # Completed full term
@@ -104,6 +122,69 @@ def simulate_dynamic_withdrawal(
     return success, len(returns_sequence), round(stock_balance, 2), round(emergency_balance, 2), year_by_year
 
 
+def sweep_dynamic_withdrawal(
+    candidates: np.ndarray,
+    emergency_fund: float,
+    returns_sequence: List[float],
+    annual_payment: float,
+    remaining_schedule: np.ndarray,
+    crash_threshold: float = -5.0,
+    recovery_threshold: float = 15.0
+) -> np.ndarray:
+    """
+    Run simulate_dynamic_withdrawal for every candidate investment at once.
+
+    Same rules as the scalar simulation, but each balance is an array with one
+    slot per candidate, and the mortgage balance after each year's payment
+    is read from the precomputed remaining_schedule. Candidates that have
+    already paid off or run out of money keep updating but their outcome is
+    frozen, and the loop stops as soon as every candidate has been decided.
+
+    Returns:
+        Boolean array, True where the candidate investment succeeds
+    """
+    stock_balance = np.array(candidates, dtype=np.float64)
+    emergency_balance = np.full(len(stock_balance), float(emergency_fund))
+    success = np.zeros(len(stock_balance), dtype=bool)
+    active = np.ones(len(stock_balance), dtype=bool)
+
+    for year, stock_return_pct in enumerate(returns_sequence):
+        if stock_return_pct < crash_threshold:
+            use_emergency = emergency_balance >= annual_payment
+            emergency_balance = np.where(use_emergency, emergency_balance - annual_payment, emergency_balance)
+            stock_balance = np.where(use_emergency, stock_balance, stock_balance - annual_payment)
+        else:
+            stock_balance = stock_balance - annual_payment
+
+        remaining_mortgage = remaining_schedule[year]
+
+        stock_balance = stock_balance * (1 + stock_return_pct / 100.0)
+        emergency_balance = emergency_balance * 1.02
+
+        if stock_return_pct > recovery_threshold:
+            replenish = np.where(
+                emergency_balance < emergency_fund,
+                np.minimum(emergency_fund - emergency_balance, stock_balance * 0.20),
+                0.0
+            )
+            stock_balance = stock_balance - replenish
+            emergency_balance = emergency_balance + replenish
+
+        total_balance = stock_balance + emergency_balance
+
+        paid_off = active & (total_balance >= remaining_mortgage)
+        success |= paid_off
+        active &= ~paid_off & (total_balance >= 0)
+
+        # Every candidate has paid off or failed - the rest of the window can't change anything
+        if not active.any():
+            return success
+
+    # Completed full term
+    success |= active & (total_balance >= 0)
+    return success
+
+
 def find_minimum_dynamic_withdrawal(
     emergency_fund: float,
     returns_sequence: List[float],
@@ -114,30 +195,29 @@ def find_minimum_dynamic_withdrawal(
     """
     Find minimum initial investment needed with given emergency fund size.
 
+    Evaluates every multiple of `tolerance` up to twice the mortgage in one
+    vectorized sweep and takes the smallest that succeeds.
+
     Returns:
         (min_investment, years_to_payoff, leftover_investment, leftover_emergency)
     """
-    low = 0.0
-    high = initial_mortgage_balance * 2.0
-
-    while high - low > tolerance:
-        mid = (low + high) / 2.0
-
-        success, years, leftover_inv, leftover_emerg, _ = simulate_dynamic_withdrawal(
-            mid, emergency_fund, returns_sequence, annual_payment, initial_mortgage_balance
-        )
+    candidates = np.arange(0.0, initial_mortgage_balance * 2.0, tolerance)
+    remaining_schedule = initial_mortgage_balance - annual_payment * np.arange(1, len(returns_sequence) + 1)
+    success = sweep_dynamic_withdrawal(
+        candidates, emergency_fund, returns_sequence, annual_payment, remaining_schedule
+    )
 
-        if success:
-            high = mid  # Try less
-        else:
-            low = mid  # Need more
+    if success.any():
+        minimum = float(candidates[success.argmax()])
+    else:
+        minimum = initial_mortgage_balance * 2.0
 
     # Final simulation
     success, years, leftover_inv, leftover_emerg, _ = simulate_dynamic_withdrawal(
-        high, emergency_fund, returns_sequence, annual_payment, initial_mortgage_balance
+        minimum, emergency_fund, returns_sequence, annual_payment, initial_mortgage_balance
     )
 
-    return round(high, 2), years, round(leftover_inv, 2), round(leftover_emerg, 2)
+    return round(minimum, 2), years, round(leftover_inv, 2), round(leftover_emerg, 2)
 
 
 def test_dynamic_withdrawal_2000_2024():
@@ -219,6 +299,7 @@ def test_dynamic_withdrawal_2000_2024():
     print("| Fund Size | Required   | Fund      |              |       |             |")
     print("|-----------|------------|-----------|--------------|-------|-------------|")
 
+    rows = []
     for years_emergency in emergency_sizes:
         r = results[years_emergency]
         diff = r['total_required'] - baseline['total_required']
@@ -226,10 +307,11 @@ def test_dynamic_withdrawal_2000_2024():
 
         marker = " ⭐ BEST" if years_emergency == optimal_size else ""
 
-        print(f"| {years_emergency} years   | ${r['investment']:>9,.0f} | "
-              f"${r['emergency_fund']:>8,.0f} | ${r['total_required']:>11,.0f} | "
-              f"{r['years']:>5d} | {diff:>+8,.0f} ({diff_pct:>+5.1f}%){marker} |")
+        rows.append(f"| {years_emergency} years   | ${r['investment']:>9,.0f} | "
+                    f"${r['emergency_fund']:>8,.0f} | ${r['total_required']:>11,.0f} | "
+                    f"{r['years']:>5d} | {diff:>+8,.0f} ({diff_pct:>+5.1f}%){marker} |")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
     print("=" * 80)
     print("ANALYSIS")
@@ -276,34 +358,37 @@ def test_dynamic_withdrawal_2000_2024():
         optimal['emergency_fund'],
         returns_2000,
         annual_payment,
-        mortgage_balance
+        mortgage_balance,
+        collect=True
     )
 
     print("Year | Actual | Return  | Stocks    | Emergency | Total     | Mortgage  | Source    | Replenish | Payoff?")
     print("-----|--------|---------|-----------|-----------|-----------|-----------|-----------|-----------|--------")
 
+    rows = []
     for y in yearly[:12]:  # Show first 12 years
         actual_year = 2000 + y['year'] - 1
         can_payoff = "✓ YES" if y['can_payoff_early'] else ""
-        source_symbol = "💰E" if y['withdrawal_source'] == 'emergency' else "📈S"
+        source_symbol = "💰E" if y['withdrawal_source'] == SOURCE_EMERGENCY else "📈S"
 
-        print(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | "
-              f"${y['stock_balance']:>8,.0f} | ${y['emergency_balance']:>8,.0f} | "
-              f"${y['total_balance']:>8,.0f} | ${y['remaining_mortgage']:>8,.0f} | "
-              f"{source_symbol:8s} | ${y['replenishment']:>8,.0f} | {can_payoff}")
+        rows.append(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | "
+                    f"${y['stock_balance']:>8,.0f} | ${y['emergency_balance']:>8,.0f} | "
+                    f"${y['total_balance']:>8,.0f} | ${y['remaining_mortgage']:>8,.0f} | "
+                    f"{source_symbol:8s} | ${y['replenishment']:>8,.0f} | {can_payoff}")
 
     if len(yearly) > 12:
-        print("...")
+        rows.append("...")
         last = yearly[-1]
         actual_year = 2000 + last['year'] - 1
         can_payoff = "✓ YES" if last['can_payoff_early'] else ""
-        source_symbol = "💰E" if last['withdrawal_source'] == 'emergency' else "📈S"
+        source_symbol = "💰E" if last['withdrawal_source'] == SOURCE_EMERGENCY else "📈S"
 
-        print(f"{last['year']:4d} | {actual_year} | {last['return']:>+6.2f}% | "
-              f"${last['stock_balance']:>8,.0f} | ${last['emergency_balance']:>8,.0f} | "
-              f"${last['total_balance']:>8,.0f} | ${last['remaining_mortgage']:>8,.0f} | "
-              f"{source_symbol:8s} | ${last['replenishment']:>8,.0f} | {can_payoff}")
+        rows.append(f"{last['year']:4d} | {actual_year} | {last['return']:>+6.2f}% | "
+                    f"${last['stock_balance']:>8,.0f} | ${last['emergency_balance']:>8,.0f} | "
+                    f"${last['total_balance']:>8,.0f} | ${last['remaining_mortgage']:>8,.0f} | "
+                    f"{source_symbol:8s} | ${last['replenishment']:>8,.0f} | {can_payoff}")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
     print(f"Legend: 💰E = Emergency withdrawal, 📈S = Stock withdrawal")
     print(f"Paid off in year {optimal['years']} with ${optimal['total_leftover']:,.0f} total remaining")
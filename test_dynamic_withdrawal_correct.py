@@ -20,43 +20,70 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
+import numpy as np
 
 
-def simulate_smart_withdrawal(
+# Withdrawal source codes stored in year_by_year['withdrawal_source']
+SOURCE_STOCKS = 0
+SOURCE_CASH = 1
+
+YEAR_DTYPE = np.dtype([
+    ('year', 'i4'),
+    ('return', 'f8'),
+    ('stock_balance', 'f8'),
+    ('cash_balance', 'f8'),
+    ('total_balance', 'f8'),
+    ('remaining_mortgage', 'f8'),
+    ('withdrawal_source', 'u1'),
+    ('replenished', 'f8'),
+    ('can_payoff', '?'),
+])
+
+
+def _simulate_smart_core(
     initial_stock: float,
     initial_cash: float,
-    returns_sequence: list,
+    returns_sequence: np.ndarray,
     annual_payment: float,
     initial_mortgage_balance: float,
-    replenish_threshold: float = 10.0  # Replenish cash in years with >10% return
+    replenish_threshold: float
 ):
     """
-    Simulate smart withdrawal strategy:
-    - Negative return years: Withdraw from cash
-    - Positive return years: Withdraw from stocks
-    - Good years (>10%): Replenish cash from stocks
+    Year loop behind simulate_smart_withdrawal.
+
+    Writes each year's state into preallocated arrays instead of building
+    dicts, and stops at the payoff or failure year.
+
+    Returns:
+        (stock_hist, cash_hist, total_hist, mortgage_hist, from_cash, replenished_hist, years)
+        where only the first `years` entries of each array are filled
     """
+    n = len(returns_sequence)
+    stock_hist = np.empty(n)
+    cash_hist = np.empty(n)
+    total_hist = np.empty(n)
+    mortgage_hist = np.empty(n)
+    from_cash = np.empty(n, dtype=bool)
+    replenished_hist = np.empty(n)
+
     stock_balance = initial_stock
     cash_balance = initial_cash
     remaining_mortgage = initial_mortgage_balance
 
     initial_cash_target = initial_cash
+    growth = (1.0 + returns_sequence / 100.0).tolist()
 
-    year_by_year = []
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
+    for i, stock_return in enumerate(returns_sequence.tolist()):
         # DECISION: Where to withdraw from?
         if stock_return < 0:
             # DOWN YEAR: Use cash, don't touch stocks
-            withdrawal_source = "cash"
             cash_balance -= annual_payment
             # Stocks just get the return (no withdrawal)
-            stock_balance *= (1 + stock_return / 100.0)
+            stock_balance *= growth[i]
         else:
             # UP YEAR: Use stocks
-            withdrawal_source = "stocks"
             stock_balance -= annual_payment
-            stock_balance *= (1 + stock_return / 100.0)
+            stock_balance *= growth[i]
             # Cash just earns 3.7%
             cash_balance *= 1.037
 
@@ -74,96 +101,201 @@ def simulate_smart_withdrawal(
             cash_balance += replenish_amount
             replenished = replenish_amount
 
-        year_by_year.append({
-            'year': year,
-            'return': stock_return,
-            'stock_balance': round(stock_balance, 2),
-            'cash_balance': round(cash_balance, 2),
-            'total_balance': round(total_balance, 2),
-            'remaining_mortgage': round(remaining_mortgage, 2),
-            'withdrawal_source': withdrawal_source,
-            'replenished': round(replenished, 2),
-            'can_payoff': total_balance >= remaining_mortgage
-        })
-
-        # Check for early payoff
-        if total_balance >= remaining_mortgage:
-            leftover = total_balance - remaining_mortgage
-            return {
-                'success': True,
-                'paid_off_early': True,
-                'years_to_payoff': year,
-                'leftover': leftover,
-                'year_by_year': year_by_year
-            }
-
-        # Check for failure
-        if total_balance < 0:
-            return {
-                'success': False,
-                'paid_off_early': False,
-                'years_to_payoff': year,
-                'leftover': total_balance,
-                'year_by_year': year_by_year
-            }
-
-    # Completed full term
+        stock_hist[i] = stock_balance
+        cash_hist[i] = cash_balance
+        total_hist[i] = total_balance
+        mortgage_hist[i] = remaining_mortgage
+        from_cash[i] = stock_return < 0
+        replenished_hist[i] = replenished
+
+        # Stop at early payoff or failure
+        if total_balance >= remaining_mortgage or total_balance < 0:
+            return stock_hist, cash_hist, total_hist, mortgage_hist, from_cash, replenished_hist, i + 1
+
+    return stock_hist, cash_hist, total_hist, mortgage_hist, from_cash, replenished_hist, n
+
+
+def simulate_smart_withdrawal(
+    initial_stock: float,
+    initial_cash: float,
+    returns_sequence: np.ndarray,
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    replenish_threshold: float = 10.0  # Replenish cash in years with >10% return
+):
+    """
+    Simulate smart withdrawal strategy:
+    - Negative return years: Withdraw from cash
+    - Positive return years: Withdraw from stocks
+    - Good years (>10%): Replenish cash from stocks
+
+    year_by_year is a YEAR_DTYPE structured array (one row per simulated
+    year) filled column-by-column from the core's arrays.
+    """
+    stock_hist, cash_hist, total_hist, mortgage_hist, from_cash, replenished_hist, years = _simulate_smart_core(
+        initial_stock, initial_cash, returns_sequence, annual_payment,
+        initial_mortgage_balance, replenish_threshold
+    )
+    total_balance = float(total_hist[years - 1])
+    remaining_mortgage = float(mortgage_hist[years - 1])
+
+    year_by_year = np.empty(years, dtype=YEAR_DTYPE)
+    year_by_year['year'] = np.arange(1, years + 1)
+    year_by_year['return'] = returns_sequence[:years]
+    year_by_year['stock_balance'] = np.round(stock_hist[:years], 2)
+    year_by_year['cash_balance'] = np.round(cash_hist[:years], 2)
+    year_by_year['total_balance'] = np.round(total_hist[:years], 2)
+    year_by_year['remaining_mortgage'] = np.round(mortgage_hist[:years], 2)
+    year_by_year['withdrawal_source'] = np.where(from_cash[:years], SOURCE_CASH, SOURCE_STOCKS)
+    year_by_year['replenished'] = np.round(replenished_hist[:years], 2)
+    year_by_year['can_payoff'] = total_hist[:years] >= mortgage_hist[:years]
+
+    # Check for early payoff
+    if total_balance >= remaining_mortgage:
+        leftover = total_balance - remaining_mortgage
+        return {
+            'success': True,
+            'paid_off_early': True,
+            'years_to_payoff': years,
+            'leftover': leftover,
+            'year_by_year': year_by_year
+        }
+
+    # Ran out of money, or completed the full term without paying off early
     return {
         'success': total_balance >= 0,
         'paid_off_early': False,
-        'years_to_payoff': len(returns_sequence),
+        'years_to_payoff': years,
         'leftover': total_balance,
         'year_by_year': year_by_year
     }
 
 
-def find_optimal_allocation(
-    returns_sequence: list,
+def _run_allocation(
+    total: int,
+    stock_fraction: float,
+    returns_sequence: np.ndarray,
     annual_payment: float,
     initial_mortgage_balance: float
+):
+    """
+    Simulate one total split by stock_fraction.
+
+    Returns:
+        (stock, cash, success, years, leftover)
+    """
+    stock = int(round(total * stock_fraction))
+    cash = total - stock
+    _, _, total_hist, mortgage_hist, _, _, years = _simulate_smart_core(
+        stock, cash, returns_sequence, annual_payment, initial_mortgage_balance, 10.0
+    )
+    final_total = total_hist[years - 1]
+    paid_off_early = final_total >= mortgage_hist[years - 1]
+    leftover = final_total - mortgage_hist[years - 1] if paid_off_early else final_total
+    return stock, cash, bool(paid_off_early or final_total >= 0), years, leftover
+
+
+def _minimum_total(
+    stock_fraction: float,
+    returns_sequence: np.ndarray,
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    min_total: int,
+    max_total: int,
+    resolution: int
+):
+    """
+    Bisect for the smallest total (a multiple of `resolution`) that succeeds
+    at this stock fraction. Returns None if even max_total fails.
+    """
+    # Work in whole `resolution` steps so every probe is a round dollar amount
+    low = min_total // resolution
+    high = max_total // resolution
+    args = (stock_fraction, returns_sequence, annual_payment, initial_mortgage_balance)
+
+    if not _run_allocation(high * resolution, *args)[2]:
+        return None
+    if _run_allocation(low * resolution, *args)[2]:
+        return low * resolution
+
+    while high - low > 1:
+        mid = (low + high) // 2
+        if _run_allocation(mid * resolution, *args)[2]:
+            high = mid
+        else:
+            low = mid
+
+    return high * resolution
+
+
+def find_optimal_allocation(
+    returns_sequence: np.ndarray,
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    min_total: int = 200000,
+    max_total: int = 500000,
+    resolution: int = 100,
+    exhaustive: bool = False
 ):
     """
     Find optimal split between stocks and cash for this period.
+
+    For each stock fraction from 50% to 90%, bisects the total capital
+    between min_total and max_total (to `resolution` dollars) for the
+    smallest amount that succeeds, then keeps the cheapest fraction.
+
+    Once a fraction has succeeded, later fractions only search below the
+    best total so far; a fraction that can't beat it is skipped after one
+    probe. Pass exhaustive=True to bisect every fraction over the full range.
     """
-    print("Testing different stock/cash allocations...")
+    print("Searching stock/cash allocations...")
     print()
 
-    # Test different splits
-    test_cases = [
-        (200000, 150000),  # $200K stocks, $150K cash
-        (220000, 130000),  # $220K stocks, $130K cash
-        (240000, 110000),  # $240K stocks, $110K cash
-        (260000, 90000),   # $260K stocks, $90K cash
-        (280000, 70000),   # $280K stocks, $70K cash
-        (300000, 50000),   # $300K stocks, $50K cash
-    ]
-
-    print("Stock   | Cash    | Total   | Result")
-    print("--------|---------|---------|------------------------------------------")
+    print("Stock % | Stock   | Cash    | Total   | Result")
+    print("--------|---------|---------|---------|------------------------------------------")
 
     best_result = None
     best_total = float('inf')
 
-    for stock, cash in test_cases:
-        total = stock + cash
-        result = simulate_smart_withdrawal(
-            stock, cash, returns_sequence, annual_payment, initial_mortgage_balance
+    for stock_fraction in np.linspace(0.5, 0.9, 9).tolist():
+        # Only a strictly cheaper total can replace the current best
+        upper = max_total
+        if best_result is not None and not exhaustive:
+            upper = min(max_total, best_total - resolution)
+
+        total = None
+        if upper >= min_total:
+            total = _minimum_total(
+                stock_fraction, returns_sequence, annual_payment, initial_mortgage_balance,
+                min_total, upper, resolution
+            )
+
+        if total is None:
+            if upper < max_total:
+                outcome = f"- Nothing under ${best_total:,}"
+            else:
+                outcome = f"✗ Fails even at ${max_total:,}"
+            print(f"{stock_fraction * 100:6.0f}% | {'':>7s} | {'':>7s} | {'':>7s} | {outcome}")
+            continue
+
+        stock, cash, _, years, leftover = _run_allocation(
+            total, stock_fraction, returns_sequence, annual_payment, initial_mortgage_balance
         )
+        print(f"{stock_fraction * 100:6.0f}% | ${stock:>6,} | ${cash:>6,} | ${total:>6,} | "
+              f"✓ Paid off yr {years}, ${leftover:,.0f} left")
 
-        if result['success']:
-            outcome = f"✓ Paid off yr {result['years_to_payoff']}"
-            if result['paid_off_early']:
-                outcome += f", ${result['leftover']:,.0f} left"
-
-            if total < best_total:
-                best_total = total
-                best_result = (stock, cash, result)
-        else:
-            outcome = f"✗ Failed yr {result['years_to_payoff']}"
+        if total < best_total:
+            best_total = total
+            best_result = (stock, cash)
 
-        print(f"${stock:>6,} | ${cash:>6,} | ${total:>6,} | {outcome}")
+    if best_result is None:
+        return None
 
-    return best_result
+    # Re-run the winner for its full year-by-year record
+    stock, cash = best_result
+    return stock, cash, simulate_smart_withdrawal(
+        stock, cash, returns_sequence, annual_payment, initial_mortgage_balance
+    )
 
 
 def main():
@@ -179,7 +311,7 @@ def main():
 
     # Setup
     loader = SP500DataLoader()
-    returns_2000 = loader.get_returns(2000, 2024)
+    returns_2000 = loader.get_returns_array(2000, 2024)
 
     mortgage_balance = 500000
     mortgage_rate = 3.0
@@ -224,11 +356,13 @@ def main():
     print("COMPARISON")
     print("=" * 90)
     print()
-    print(f"Strategy              | Capital Needed | Years | Result")
-    print(f"----------------------|----------------|-------|------------------")
-    print(f"Full Treasury         | ${treasury_full:>13,} |    25 | Guaranteed")
-    print(f"Stock Only (100%)     | ${stock_only:>13,} |    17 | High risk")
-    print(f"Smart Withdrawal      | ${total_capital:>13,} |    {best_result['years_to_payoff']:2d} | Optimized")
+    sys.stdout.write("\n".join([
+        f"Strategy              | Capital Needed | Years | Result",
+        f"----------------------|----------------|-------|------------------",
+        f"Full Treasury         | ${treasury_full:>13,} |    25 | Guaranteed",
+        f"Stock Only (100%)     | ${stock_only:>13,} |    17 | High risk",
+        f"Smart Withdrawal      | ${total_capital:>13,} |    {best_result['years_to_payoff']:2d} | Optimized",
+    ]) + "\n")
     print()
 
     savings_vs_treasury = treasury_full - total_capital
@@ -245,27 +379,31 @@ def main():
     print("YEAR-BY-YEAR BREAKDOWN (First 12 years)")
     print("=" * 90)
     print()
-    print("Year | Actual | Return  | Stocks  | Cash    | Total   | Mortgage | Source | Replenish")
-    print("-----|--------|---------|---------|---------|---------|----------|--------|----------")
+    rows = [
+        "Year | Actual | Return  | Stocks  | Cash    | Total   | Mortgage | Source | Replenish",
+        "-----|--------|---------|---------|---------|---------|----------|--------|----------",
+    ]
 
     for y in best_result['year_by_year'][:12]:
         actual_year = 2000 + y['year'] - 1
-        source_icon = "💰" if y['withdrawal_source'] == 'cash' else "📈"
+        source_icon = "💰" if y['withdrawal_source'] == SOURCE_CASH else "📈"
         replenish = f"${y['replenished']:>7,.0f}" if y['replenished'] > 0 else ""
 
-        print(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | ${y['stock_balance']:>6,.0f} | "
-              f"${y['cash_balance']:>6,.0f} | ${y['total_balance']:>6,.0f} | ${y['remaining_mortgage']:>7,.0f} | "
-              f"{source_icon:6s} | {replenish}")
+        rows.append(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | ${y['stock_balance']:>6,.0f} | "
+                    f"${y['cash_balance']:>6,.0f} | ${y['total_balance']:>6,.0f} | ${y['remaining_mortgage']:>7,.0f} | "
+                    f"{source_icon:6s} | {replenish}")
 
     if len(best_result['year_by_year']) > 12:
-        print("...")
+        rows.append("...")
         last = best_result['year_by_year'][-1]
         actual_year = 2000 + last['year'] - 1
-        source_icon = "💰" if last['withdrawal_source'] == 'cash' else "📈"
+        source_icon = "💰" if last['withdrawal_source'] == SOURCE_CASH else "📈"
+
+        rows.append(f"{last['year']:4d} | {actual_year} | {last['return']:>+6.2f}% | ${last['stock_balance']:>6,.0f} | "
+                    f"${last['cash_balance']:>6,.0f} | ${last['total_balance']:>6,.0f} | ${last['remaining_mortgage']:>7,.0f} | "
+                    f"{source_icon:6s} |")
 
-        print(f"{last['year']:4d} | {actual_year} | {last['return']:>+6.2f}% | ${last['stock_balance']:>6,.0f} | "
-              f"${last['cash_balance']:>6,.0f} | ${last['total_balance']:>6,.0f} | ${last['remaining_mortgage']:>7,.0f} | "
-              f"{source_icon:6s} |")
+    sys.stdout.write("\n".join(rows) + "\n")
 
     print()
     print(f"Legend: 💰 = Withdrew from cash, 📈 = Withdrew from stocks")
@@ -277,8 +415,8 @@ def main():
     print("=" * 90)
     print()
 
-    cash_withdrawals = sum(1 for y in best_result['year_by_year'] if y['withdrawal_source'] == 'cash')
-    stock_withdrawals = sum(1 for y in best_result['year_by_year'] if y['withdrawal_source'] == 'stocks')
+    cash_withdrawals = int(np.count_nonzero(best_result['year_by_year']['withdrawal_source'] == SOURCE_CASH))
+    stock_withdrawals = len(best_result['year_by_year']) - cash_withdrawals
 
     print(f"Cash withdrawals: {cash_withdrawals} years (protected stocks during crashes)")
     print(f"Stock withdrawals: {stock_withdrawals} years (used gains to pay mortgage)")
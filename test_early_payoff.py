@@ -71,12 +71,14 @@ success, years, final, yearly = simulate_investment_with_early_payoff(
     new_min, returns_1927, annual_payment, mortgage_balance
 )
 
+rows = []
 for i, y in enumerate(yearly):
     actual_year = 1927 + i
     can_payoff = "✓ CAN PAY OFF!" if y['can_payoff_early'] else ""
-    print(f"{actual_year} (Yr {y['year']:2d}): Return {y['return']:+7.2f}%  "
-          f"Balance: ${y['balance']:>12,.0f}  "
-          f"Mortgage: ${y['remaining_mortgage']:>12,.0f}  {can_payoff}")
+    rows.append(f"{actual_year} (Yr {y['year']:2d}): Return {y['return']:+7.2f}%  "
+                f"Balance: ${y['balance']:>12,.0f}  "
+                f"Mortgage: ${y['remaining_mortgage']:>12,.0f}  {can_payoff}")
+sys.stdout.write("\n".join(rows) + "\n")
 
 print()
 print(f"Success: {success}")
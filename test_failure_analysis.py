@@ -7,11 +7,18 @@ import sys
 sys.path.insert(0, '/Users/sachin/projects/finance-app')
 
 from backend.services.data_loader import SP500DataLoader
+from backend.services.investment_simulator import stock_balance_path
+import numpy as np
 
 loader = SP500DataLoader()
 
+# Load the whole series once; every window below is a slice of it
+first_year, last_year = loader.get_available_years()
+returns_all = loader.get_returns_array(first_year, last_year)
+
 # Analyze the worst period: 1969-2018
-returns = loader.get_returns(1969, 2018)
+returns = returns_all[1969 - first_year:2018 - first_year + 1].tolist()
+growth = (1.0 + returns_all[1969 - first_year:2018 - first_year + 1] / 100.0).tolist()
 
 print("Detailed year-by-year analysis: 1969-2018")
 print("Initial: $5,000,000 | Withdrawal: $200,000")
@@ -23,7 +30,7 @@ for year_idx, ret in enumerate(returns, start=1):
     balance_before = balance
     balance -= 200_000
     balance_after_withdrawal = balance
-    balance *= (1 + ret / 100.0)
+    balance *= growth[year_idx - 1]
 
     if year_idx <= 10 or year_idx >= 20 and year_idx <= 30 or year_idx >= 45:
         print(f"Year {year_idx} ({year}): ${balance_before/1_000_000:>6.2f}M → "
@@ -45,30 +52,15 @@ print("Checking FICalc's exact setup...")
 print("Maybe FICalc is using 25-year rolling windows, not 50-year?")
 print("=" * 80)
 
-# Test with 25-year windows
-successes_25 = 0
-failures_25 = 0
-
-for start_year in range(1948, 2025 - 25 + 1):
-    end_year = start_year + 25 - 1
-
-    try:
-        returns = loader.get_returns(start_year, end_year)
-    except:
-        continue
-
-    if len(returns) != 25:
-        continue
-
-    balance = 5_000_000
-    for ret in returns:
-        balance -= 200_000
-        balance *= (1 + ret / 100.0)
+# Rolling windows start no earlier than 1948 and end no later than 2024
+scan_returns = returns_all[max(1948, first_year) - first_year:min(2024, last_year) - first_year + 1]
 
-    if balance >= 0:
-        successes_25 += 1
-    else:
-        failures_25 += 1
+# Test with 25-year windows, all at once
+finals_25 = stock_balance_path(
+    np.lib.stride_tricks.sliding_window_view(scan_returns, 25), 200_000, 5_000_000
+)[:, -1]
+successes_25 = int(np.count_nonzero(finals_25 >= 0))
+failures_25 = len(finals_25) - successes_25
 
 total_25 = successes_25 + failures_25
 success_rate_25 = (successes_25 / total_25 * 100) if total_25 > 0 else 0
@@ -78,29 +70,11 @@ print(f"  Total windows: {total_25}")
 print(f"  Success rate: {success_rate_25:.1f}%")
 
 # Test with 30-year windows (more common retirement timeframe)
-successes_30 = 0
-failures_30 = 0
-
-for start_year in range(1948, 2025 - 30 + 1):
-    end_year = start_year + 30 - 1
-
-    try:
-        returns = loader.get_returns(start_year, end_year)
-    except:
-        continue
-
-    if len(returns) != 30:
-        continue
-
-    balance = 5_000_000
-    for ret in returns:
-        balance -= 200_000
-        balance *= (1 + ret / 100.0)
-
-    if balance >= 0:
-        successes_30 += 1
-    else:
-        failures_30 += 1
+finals_30 = stock_balance_path(
+    np.lib.stride_tricks.sliding_window_view(scan_returns, 30), 200_000, 5_000_000
+)[:, -1]
+successes_30 = int(np.count_nonzero(finals_30 >= 0))
+failures_30 = len(finals_30) - successes_30
 
 total_30 = successes_30 + failures_30
 success_rate_30 = (successes_30 / total_30 * 100) if total_30 > 0 else 0
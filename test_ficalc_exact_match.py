@@ -7,6 +7,8 @@ import sys
 sys.path.insert(0, '/Users/sachin/projects/finance-app')
 
 from backend.services.data_loader import SP500DataLoader
+from backend.services.investment_simulator import stock_balance_path
+import numpy as np
 
 # Load real returns
 loader = SP500DataLoader()
@@ -16,61 +18,51 @@ min_year = 1948
 max_year = 2024
 window_size = 50
 
+# Load the whole series once and slice each window out of it. Clamp the
+# range to the years the data file actually covers so every slice is full.
+first_year, last_year = loader.get_available_years()
+min_year = max(min_year, first_year)
+max_year = min(max_year, last_year)
+returns_all = loader.get_returns_array(first_year, last_year)
+
 print("Testing ALL 50-year windows from 1948-2024")
 print(f"Initial: $5,000,000")
 print(f"Withdrawal: $200,000/year")
 print(f"Allocation: 100% stocks (real returns)")
 print("=" * 80)
 
-successes = 0
-failures = 0
-all_results = []
-
-for start_year in range(min_year, max_year - window_size + 2):
-    end_year = start_year + window_size - 1
-
-    # Check if we have data for this full window
-    try:
-        returns = loader.get_returns(start_year, end_year)
-    except:
-        continue
+initial = 5_000_000
+withdrawal = 200_000
 
-    if len(returns) != window_size:
-        continue
+# Simulate every window at once, withdrawing at the beginning of each year
+returns_windows = np.lib.stride_tricks.sliding_window_view(
+    returns_all[min_year - first_year:max_year - first_year + 1], window_size
+)
+balances = stock_balance_path(returns_windows, withdrawal, initial)
+final_balances = balances[:, -1]
+ran_out_years = (balances < 0).argmax(axis=1) + 1
 
-    # Run simulation
-    balance = 5_000_000
-    withdrawal = 200_000
-    ran_out = False
-    ran_out_year = None
-
-    for year_idx, annual_return in enumerate(returns, start=1):
-        # Withdraw at beginning of year
-        balance -= withdrawal
-
-        # Apply return
-        balance *= (1 + annual_return / 100.0)
+successes = int(np.count_nonzero(final_balances >= 0))
+failures = len(final_balances) - successes
+all_results = []
 
-        # Check if ran out
-        if balance < 0 and not ran_out:
-            ran_out = True
-            ran_out_year = year_idx
+for i, balance in enumerate(final_balances.tolist()):
+    start_year = min_year + i
+    end_year = start_year + window_size - 1
 
     # Record result
     if balance >= 0:
-        successes += 1
         all_results.append({
             'period': f'{start_year}-{end_year}',
             'success': True,
             'final_balance': balance
         })
     else:
-        failures += 1
         all_results.append({
             'period': f'{start_year}-{end_year}',
             'success': False,
             'final_balance': balance,
-            'ran_out_year': ran_out_year
+            'ran_out_year': int(ran_out_years[i])
         })
 
 total = successes + failures
@@ -15,39 +15,36 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
-from statistics import mean, median
+from backend.services.investment_simulator import stock_balance_path
+import numpy as np
 
 
 def simulate_full_term(
     initial_amount: float,
-    returns_sequence: list,
-    annual_payment: float
+    returns_sequence: np.ndarray,
+    annual_payment: float,
+    record: bool = False
 ):
     """
     Simulate investing for FULL term, don't pay off early.
     Just track what's left after 25 years.
-    """
-    balance = initial_amount
-    year_by_year = []
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        # Withdraw payment
-        balance -= annual_payment
 
-        # Apply return
-        balance *= (1 + stock_return / 100.0)
+    returns_sequence may also be a (windows, years) array, in which case
+    every window is simulated at once and each result field gets a leading
+    windows axis.
 
-        year_by_year.append({
-            'year': year,
-            'return': stock_return,
-            'balance': balance
-        })
+    The per-year 'balances' are only returned when record=True.
+    """
+    balances = stock_balance_path(returns_sequence, annual_payment, initial_amount)
+    final_balance = balances[..., -1]
 
-    return {
-        'final_balance': balance,
-        'success': balance >= 0,
-        'year_by_year': year_by_year
+    result = {
+        'final_balance': final_balance,
+        'success': final_balance >= 0
     }
+    if record:
+        result['balances'] = balances
+    return result
 
 
 def main():
@@ -71,41 +68,43 @@ def main():
     print(f"  Final balance after 25 years: ???")
     print()
 
-    # Get all historical windows
+    # Get all historical windows, clamped to the years the data covers
+    first_year, last_year = loader.get_available_years()
     all_windows = []
-    for start_year in range(1926, 2001):
+    for start_year in range(max(1926, first_year), min(2000, last_year - 24) + 1):
         end_year = start_year + 24
-        if end_year <= 2025:
-            try:
-                returns = loader.get_returns(start_year, end_year)
-                if len(returns) == 25:
-                    all_windows.append({
-                        'period': f"{start_year}-{end_year}",
-                        'start_year': start_year,
-                        'returns': returns
-                    })
-            except:
-                pass
+        all_windows.append({
+            'period': f"{start_year}-{end_year}",
+            'start_year': start_year,
+            'returns': loader.get_returns_array(start_year, end_year)
+        })
 
     print(f"Testing across {len(all_windows)} historical 25-year periods...")
     print()
 
-    # Simulate all periods
+    # Simulate all periods in one batch
+    batch = simulate_full_term(500000, np.stack([w['returns'] for w in all_windows]), annual_payment)
     results = []
-    for window in all_windows:
-        result = simulate_full_term(500000, window['returns'], annual_payment)
+    for i, window in enumerate(all_windows):
         results.append({
             'period': window['period'],
             'start_year': window['start_year'],
-            'final_balance': result['final_balance'],
-            'success': result['success'],
-            'year_by_year': result['year_by_year']
+            'final_balance': float(batch['final_balance'][i]),
+            'success': bool(batch['success'][i]),
+            'returns': window['returns']
         })
 
     # Analyze results
     successes = [r for r in results if r['success']]
     failures = [r for r in results if not r['success']]
 
+    # One argsort orders the successful windows by final balance; worst,
+    # median and best are then just positions in it
+    success_idx = np.flatnonzero(batch['success'])
+    by_final = success_idx[np.argsort(batch['final_balance'][success_idx], kind='stable')]
+    success_finals = batch['final_balance'][by_final]
+    avg_final = float(success_finals.mean()) if successes else 0.0
+
     print("=" * 90)
     print("RESULTS")
     print("=" * 90)
@@ -115,18 +114,17 @@ def main():
     print()
 
     if successes:
-        final_balances = [r['final_balance'] for r in successes]
         print(f"Final Balance After 25 Years (Successful Scenarios):")
-        print(f"  Average:  ${mean(final_balances):,.0f}")
-        print(f"  Median:   ${median(final_balances):,.0f}")
-        print(f"  Minimum:  ${min(final_balances):,.0f}")
-        print(f"  Maximum:  ${max(final_balances):,.0f}")
+        print(f"  Average:  ${avg_final:,.0f}")
+        print(f"  Median:   ${np.median(success_finals):,.0f}")
+        print(f"  Minimum:  ${success_finals[0]:,.0f}")
+        print(f"  Maximum:  ${success_finals[-1]:,.0f}")
         print()
 
     if failures:
-        print(f"Failed Scenarios ({len(failures)}):")
-        for f in failures:
-            print(f"  {f['period']}: Final balance ${f['final_balance']:,.0f}")
+        rows = [f"Failed Scenarios ({len(failures)}):"]
+        rows.extend(f"  {f['period']}: Final balance ${f['final_balance']:,.0f}" for f in failures)
+        sys.stdout.write("\n".join(rows) + "\n")
         print()
 
     # Show distribution
@@ -145,11 +143,17 @@ def main():
         (1000000, float('inf'), "Over $1M"),
     ]
 
-    for low, high, label in ranges:
-        count = sum(1 for r in results if low <= r['final_balance'] < high)
+    # Bucket every final balance by the ranges' inner edges ([low, high) like
+    # the ranges above), then count each bucket in one pass
+    buckets = np.digitize(batch['final_balance'], [low for low, _, _ in ranges[1:]])
+    counts = np.bincount(buckets, minlength=len(ranges))
+
+    rows = []
+    for (low, high, label), count in zip(ranges, counts.tolist()):
         pct = count / len(results) * 100
         bar = "█" * int(pct / 2)
-        print(f"{label:20s} | {count:3d} ({pct:5.1f}%) {bar}")
+        rows.append(f"{label:20s} | {count:3d} ({pct:5.1f}%) {bar}")
+    sys.stdout.write("\n".join(rows) + "\n")
 
     print()
 
@@ -160,8 +164,6 @@ def main():
     print()
 
     if successes:
-        avg_final = mean([r['final_balance'] for r in successes])
-
         print(f"Pay off now:      $0 final balance")
         print(f"Invest strategy:  ${avg_final:,.0f} average final balance")
         print()
@@ -207,8 +209,8 @@ def main():
     print()
 
     if successes:
-        best = max(successes, key=lambda x: x['final_balance'])
-        worst_success = min(successes, key=lambda x: x['final_balance'])
+        best = results[by_final[-1]]
+        worst_success = results[by_final[0]]
 
         print(f"Best Case: {best['period']}")
         print(f"  Final balance: ${best['final_balance']:,.0f}")
@@ -219,34 +221,39 @@ def main():
         print()
 
     if failures:
-        print(f"Failed Cases (even $500K not enough):")
-        for f in failures:
-            print(f"  {f['period']}: ${f['final_balance']:,.0f}")
+        rows = [f"Failed Cases (even $500K not enough):"]
+        rows.extend(f"  {f['period']}: ${f['final_balance']:,.0f}" for f in failures)
+        sys.stdout.write("\n".join(rows) + "\n")
         print()
 
     # Detailed breakdown for median case
     if successes:
-        median_result = sorted(successes, key=lambda x: x['final_balance'])[len(successes)//2]
+        median_result = results[by_final[len(by_final) // 2]]
+        # Only this window's per-year balances are shown, so record just it
+        median_balances = simulate_full_term(500000, median_result['returns'], annual_payment, record=True)['balances']
 
         print("=" * 90)
         print(f"MEDIAN CASE EXAMPLE: {median_result['period']}")
         print("=" * 90)
         print()
 
-        print("Year | Return  | Balance After Payment | Notes")
-        print("-----|---------|----------------------|---------------------------")
+        rows = [
+            "Year | Return  | Balance After Payment | Notes",
+            "-----|---------|----------------------|---------------------------",
+        ]
 
         for i in [0, 4, 9, 14, 19, 24]:  # Years 1, 5, 10, 15, 20, 25
-            if i < len(median_result['year_by_year']):
-                y = median_result['year_by_year'][i]
+            if i < len(median_balances):
+                balance = median_balances[i]
                 note = ""
                 if i == 0:
                     note = "Start"
                 elif i == 24:
-                    note = f"END - Keep ${y['balance']:,.0f}!"
+                    note = f"END - Keep ${balance:,.0f}!"
 
-                print(f"{y['year']:4d} | {y['return']:>+6.2f}% | ${y['balance']:>19,.0f} | {note}")
+                rows.append(f"{i + 1:4d} | {median_result['returns'][i]:>+6.2f}% | ${balance:>19,.0f} | {note}")
 
+        sys.stdout.write("\n".join(rows) + "\n")
         print()
 
     # Final recommendation
@@ -261,7 +268,7 @@ def main():
         print(f"✅ YES! Invest the $500K!")
         print()
         print(f"Success rate: {success_rate:.1f}% ({len(successes)}/{len(results)} scenarios)")
-        print(f"Average final balance: ${mean([r['final_balance'] for r in successes]):,.0f}")
+        print(f"Average final balance: ${avg_final:,.0f}")
         print()
         print("You beat paying off in nearly all historical scenarios!")
         print("The only failures are extreme events (Great Depression era).")
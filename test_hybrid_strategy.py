@@ -38,49 +38,29 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
+from backend.services.investment_simulator import stock_balance_path, first_year
+from backend.services.treasury_curve import treasury_present_values
 from typing import Tuple, List, Dict
+import numpy as np
 
 
-def interpolate_treasury_rate(year: int, rate_points: dict) -> float:
-    """Interpolate treasury rate for given year."""
-    years = sorted(rate_points.keys())
-
-    if year in rate_points:
-        return rate_points[year]
-
-    lower_year = None
-    upper_year = None
-
-    for y in years:
-        if y < year:
-            lower_year = y
-        elif y > year and upper_year is None:
-            upper_year = y
-            break
-
-    if lower_year is None:
-        return rate_points[years[0]]
-    if upper_year is None:
-        return rate_points[years[-1]]
-
-    lower_rate = rate_points[lower_year]
-    upper_rate = rate_points[upper_year]
+def build_treasury_cost_table(annual_payment: float, num_years: int, rate_points: dict) -> np.ndarray:
+    """
+    Cost today of a treasury ladder covering the next m payments, for every
+    m = 0..num_years.
 
-    return lower_rate + (year - lower_year) * (upper_rate - lower_rate) / (upper_year - lower_year)
+    A ladder's cost only depends on how many years it covers, so one running
+    sum answers every bail-out year in a sweep.
+    """
+    table = np.zeros(num_years + 1)
+    table[1:] = np.cumsum(treasury_present_values(annual_payment, num_years, rate_points))
+    return table
 
 
 def cost_of_treasury_ladder(annual_payment: float, start_year: int, end_year: int, rate_points: dict) -> float:
     """Calculate cost of treasury ladder for years [start_year, end_year]."""
-    total_cost = 0
-
-    for year in range(start_year, end_year + 1):
-        years_from_now = year - start_year + 1
-        rate = interpolate_treasury_rate(years_from_now, rate_points) / 100.0
-        discount_factor = (1 + rate) ** years_from_now
-        cost_today = annual_payment / discount_factor
-        total_cost += cost_today
-
-    return total_cost
+    num_years = max(0, end_year - start_year + 1)
+    return float(build_treasury_cost_table(annual_payment, num_years, rate_points)[-1])
 
 
 def strategy_rolling_lockin(
@@ -99,55 +79,41 @@ def strategy_rolling_lockin(
 
     Returns performance metrics
     """
-    stock_balance = initial_stock_investment
-    remaining_mortgage = initial_mortgage_balance
-    treasury_locked_years = set()  # Years we've locked in with treasuries
-
-    total_treasury_cost = 0
-    years_to_payoff = None
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        # Withdraw from stocks
-        stock_balance -= annual_payment
-        remaining_mortgage -= annual_payment
-
-        # Apply stock return
-        stock_balance *= (1 + stock_return / 100.0)
-
-        total_balance = stock_balance
-
-        # Decision: Lock in treasuries for far-out years?
-        if stock_return > lockin_threshold and stock_balance > annual_payment * 2:
-            # Good year! Lock in treasury for farthest year not yet locked
-            # (This is simplified - in reality you'd lock in specific bonds)
-            pass  # For now, just continue with stocks
-
-        # Check for early payoff
-        if total_balance >= remaining_mortgage:
-            years_to_payoff = year
-            leftover = total_balance - remaining_mortgage
-            return {
-                'success': True,
-                'years_to_payoff': years_to_payoff,
-                'initial_capital': initial_stock_investment + total_treasury_cost,
-                'leftover': leftover,
-                'strategy': 'rolling_lockin'
-            }
-
-        if total_balance < 0:
-            # Failed - would need to bail out
-            return {
-                'success': False,
-                'years_to_payoff': year,
-                'initial_capital': initial_stock_investment + total_treasury_cost,
-                'leftover': total_balance,
-                'strategy': 'rolling_lockin'
-            }
-
+    num_years = len(returns_sequence)
+    stock_balances = stock_balance_path(returns_sequence, annual_payment, initial_stock_investment)
+    remaining_mortgages = initial_mortgage_balance - annual_payment * np.arange(1, num_years + 1)
+
+    # Locking in treasuries after good years (> lockin_threshold) is not
+    # modelled yet, so the strategy just runs on stocks and buys no treasuries
+
+    # First year that pays off early or fails
+    payoff_year = first_year(stock_balances >= remaining_mortgages)
+    failure_year = first_year(stock_balances < 0)
+
+    if payoff_year and (not failure_year or payoff_year <= failure_year):
+        return {
+            'success': True,
+            'years_to_payoff': payoff_year,
+            'initial_capital': initial_stock_investment,
+            'leftover': float(stock_balances[payoff_year - 1] - remaining_mortgages[payoff_year - 1]),
+            'strategy': 'rolling_lockin'
+        }
+
+    if failure_year:
+        # Failed - would need to bail out
+        return {
+            'success': False,
+            'years_to_payoff': failure_year,
+            'initial_capital': initial_stock_investment,
+            'leftover': float(stock_balances[failure_year - 1]),
+            'strategy': 'rolling_lockin'
+        }
+
+    stock_balance = float(stock_balances[-1]) if num_years else initial_stock_investment
     return {
         'success': stock_balance >= 0,
-        'years_to_payoff': len(returns_sequence),
-        'initial_capital': initial_stock_investment + total_treasury_cost,
+        'years_to_payoff': num_years,
+        'initial_capital': initial_stock_investment,
         'leftover': stock_balance,
         'strategy': 'rolling_lockin'
     }
@@ -158,7 +124,7 @@ def strategy_crash_bailout(
     annual_payment: float,
     initial_mortgage_balance: float,
     initial_stock_investment: float,
-    treasury_rates: dict,
+    treasury_cost_table: np.ndarray,
     crash_threshold: float = -15.0,  # Bail out if cumulative loss > 15%
     bailout_window: int = 5  # Check for bail-out in first 5 years
 ) -> Dict:
@@ -169,34 +135,39 @@ def strategy_crash_bailout(
     - Otherwise continue with stocks
 
     This optimizes for the common case (no crash) with a safety net
-    """
-    stock_balance = initial_stock_investment
-    remaining_mortgage = initial_mortgage_balance
-    years_remaining = len(returns_sequence)
-
-    cumulative_return = 0
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        # Withdraw from stocks
-        stock_balance -= annual_payment
-        remaining_mortgage -= annual_payment
-        years_remaining -= 1
 
-        # Apply stock return
-        stock_balance *= (1 + stock_return / 100.0)
-
-        # Track cumulative performance
-        cumulative_return = ((stock_balance + (year * annual_payment)) / initial_stock_investment - 1) * 100
+    treasury_cost_table[m] is the cost of a ladder for the last m years (see
+    build_treasury_cost_table).
+    """
+    num_years = len(returns_sequence)
+    stock_balances = stock_balance_path(returns_sequence, annual_payment, initial_stock_investment)
+    years = np.arange(1, num_years + 1)
+    remaining_mortgages = initial_mortgage_balance - annual_payment * years
+
+    # A crash is cumulative performance (counting the payments made so far)
+    # below crash_threshold, i.e. value below this dollar level; only the
+    # bail-out window is checked
+    crash_level = initial_stock_investment * (1 + crash_threshold / 100.0)
+    window = max(0, bailout_window)
+
+    # Each year is checked for a crash first, then early payoff, then failure;
+    # the first year where any of them fires decides the outcome
+    bailout_year = first_year(stock_balances[:window] + years[:window] * annual_payment < crash_level)
+    payoff_year = first_year(stock_balances >= remaining_mortgages)
+    failure_year = first_year(stock_balances < 0)
+    decided = [y for y in (bailout_year, payoff_year, failure_year) if y]
+    year = min(decided) if decided else 0
+
+    if year:
+        stock_balance = float(stock_balances[year - 1])
+        remaining_mortgage = float(remaining_mortgages[year - 1])
 
         # BAIL-OUT DECISION: Are we in a crash?
-        if year <= bailout_window and cumulative_return < crash_threshold:
+        if year == bailout_year:
             # CRASH DETECTED! Bail out to treasuries
 
             # Cost to buy treasury ladder for remaining years
-            treasury_cost = cost_of_treasury_ladder(annual_payment, year + 1, len(returns_sequence), treasury_rates)
-
-            # Total capital needed
-            total_capital = initial_stock_investment + treasury_cost
+            treasury_cost = float(treasury_cost_table[num_years - year])
 
             # Do we have enough in stock balance to buy treasuries?
             if stock_balance >= treasury_cost:
@@ -204,7 +175,7 @@ def strategy_crash_bailout(
                 leftover = stock_balance - treasury_cost
                 return {
                     'success': True,
-                    'years_to_payoff': len(returns_sequence),
+                    'years_to_payoff': num_years,
                     'initial_capital': initial_stock_investment,
                     'additional_capital': 0,
                     'total_capital': initial_stock_investment,
@@ -218,7 +189,7 @@ def strategy_crash_bailout(
                 additional_needed = treasury_cost - stock_balance
                 return {
                     'success': True,
-                    'years_to_payoff': len(returns_sequence),
+                    'years_to_payoff': num_years,
                     'initial_capital': initial_stock_investment,
                     'additional_capital': additional_needed,
                     'total_capital': initial_stock_investment + additional_needed,
@@ -257,9 +228,10 @@ def strategy_crash_bailout(
             }
 
     # Completed full term without bailout
+    stock_balance = float(stock_balances[-1]) if num_years else initial_stock_investment
     return {
         'success': stock_balance >= 0,
-        'years_to_payoff': len(returns_sequence),
+        'years_to_payoff': num_years,
         'initial_capital': initial_stock_investment,
         'additional_capital': 0,
         'total_capital': initial_stock_investment,
@@ -334,6 +306,9 @@ def test_hybrid_strategies():
 
     print("Testing different initial stock investments:")
     print()
+    # Every investment level bails out against the same ladder prices
+    treasury_cost_table = build_treasury_cost_table(annual_payment, len(returns_2000), treasury_rates)
+
     print("Initial Investment | Outcome | Total Capital | Years | Bailed Out?")
     print("-------------------|---------|---------------|-------|-------------")
 
@@ -346,7 +321,7 @@ def test_hybrid_strategies():
             annual_payment,
             mortgage_balance,
             initial_inv,
-            treasury_rates
+            treasury_cost_table
         )
 
         outcome = "✓ Success" if result['success'] else "✗ Failed"
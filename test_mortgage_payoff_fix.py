@@ -5,10 +5,12 @@ sys.path.insert(0, '/Users/sachin/projects/finance-app')
 
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
+from backend.services.investment_simulator import withdrawal_balance_path
+import numpy as np
 
 # Setup
 loader = SP500DataLoader()
-returns = loader.get_returns(1949, 1998)  # 50 years
+returns = loader.get_returns_array(1949, 1998)  # 50 years
 
 portfolio = 5_000_000
 living_expenses = 170_000
@@ -28,20 +30,17 @@ print(f"Projection Years: {len(returns)}")
 print("=" * 70)
 
 # Simulate Keep Invested (with mortgage payoff logic)
-balance = portfolio
+# Withdrawal changes after mortgage is paid off
+years = np.arange(1, len(returns) + 1)
+withdrawals = np.where(years <= mortgage_years, living_expenses + mortgage_payment, living_expenses)
 
-for year_idx, ret in enumerate(returns, start=1):
-    # Withdrawal changes after mortgage is paid off
-    if year_idx <= mortgage_years:
-        withdrawal = living_expenses + mortgage_payment
-    else:
-        withdrawal = living_expenses
+# Withdraw at the start of each year, then apply the return
+balances = withdrawal_balance_path(returns, withdrawals, portfolio)
+balance = float(balances[-1])
 
-    balance -= withdrawal
-    balance *= (1 + ret / 100.0)
-
-    if year_idx == 1 or year_idx == 25 or year_idx == 26 or year_idx == 50:
-        print(f"Year {year_idx}: Withdraw ${withdrawal:,.0f} → Balance: ${balance/1_000_000:.1f}M")
+for year_idx in (1, 25, 26, 50):
+    if year_idx <= len(returns):
+        print(f"Year {year_idx}: Withdraw ${withdrawals[year_idx - 1]:,.0f} → Balance: ${balances[year_idx - 1]/1_000_000:.1f}M")
 
 print("\n" + "=" * 70)
 print(f"Final Balance (1949-1998): ${balance/1_000_000:.1f}M")
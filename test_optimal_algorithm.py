@@ -6,6 +6,7 @@ Validates the two-phase binary search algorithm against known results.
 
 import sys
 import os
+import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from backend.services.data_loader import SP500DataLoader
@@ -13,6 +14,11 @@ from backend.services.optimal_allocator import find_optimal_allocation
 from backend.services.historical_optimizer import HistoricalOptimizer
 from backend.models.mortgage_calculator import calculate_annual_payment
 
+# Scenario shared by every test: $500K mortgage at 3% over 25 years
+MORTGAGE_BALANCE = 500000
+MORTGAGE_RATE = 3.0
+ANNUAL_PAYMENT = calculate_annual_payment(MORTGAGE_BALANCE, MORTGAGE_RATE, 25)
+
 
 def test_single_period():
     """Test optimal allocation for 2000-2024 worst case."""
@@ -24,9 +30,9 @@ def test_single_period():
     loader = SP500DataLoader()
     returns_2000 = loader.get_returns(2000, 2024)
 
-    mortgage_balance = 500000
-    mortgage_rate = 3.0
-    annual_payment = calculate_annual_payment(mortgage_balance, mortgage_rate, 25)
+    mortgage_balance = MORTGAGE_BALANCE
+    mortgage_rate = MORTGAGE_RATE
+    annual_payment = ANNUAL_PAYMENT
 
     print(f"Mortgage: ${mortgage_balance:,} at {mortgage_rate}%")
     print(f"Annual Payment: ${annual_payment:,.2f}")
@@ -80,9 +86,8 @@ def test_percentile_analysis():
     print("=" * 90)
     print()
 
-    mortgage_balance = 500000
-    mortgage_rate = 3.0
-    annual_payment = calculate_annual_payment(mortgage_balance, mortgage_rate, 25)
+    mortgage_balance = MORTGAGE_BALANCE
+    annual_payment = ANNUAL_PAYMENT
 
     optimizer = HistoricalOptimizer(annual_payment, mortgage_balance)
 
@@ -101,14 +106,18 @@ def test_percentile_analysis():
     print("=" * 90)
     print()
 
-    print("Pct  | Total Capital | Stock   | Cash   | Ratio | Years | Period")
-    print("-----|---------------|---------|--------|-------|-------|---------------")
+    rows = [
+        "Pct  | Total Capital | Stock   | Cash   | Ratio | Years | Period",
+        "-----|---------------|---------|--------|-------|-------|---------------",
+    ]
 
     for pct, data in sorted(analysis['percentiles'].items()):
-        print(f"{pct:3d}% | ${data['total_capital']:>12,.0f} | "
-              f"${data['stock']:>6,.0f} | ${data['cash']:>5,.0f} | "
-              f"{data['stock_ratio']*100:5.1f}% | {data['years_to_payoff']:5d} | "
-              f"{data['period']}")
+        rows.append(f"{pct:3d}% | ${data['total_capital']:>12,.0f} | "
+                    f"${data['stock']:>6,.0f} | ${data['cash']:>5,.0f} | "
+                    f"{data['stock_ratio']*100:5.1f}% | {data['years_to_payoff']:5d} | "
+                    f"{data['period']}")
+
+    sys.stdout.write("\n".join(rows) + "\n")
 
     print()
     print("=" * 90)
@@ -167,9 +176,8 @@ def test_success_curve():
     print("=" * 90)
     print()
 
-    mortgage_balance = 500000
-    mortgage_rate = 3.0
-    annual_payment = calculate_annual_payment(mortgage_balance, mortgage_rate, 25)
+    mortgage_balance = MORTGAGE_BALANCE
+    annual_payment = ANNUAL_PAYMENT
 
     optimizer = HistoricalOptimizer(annual_payment, mortgage_balance)
 
@@ -190,8 +198,10 @@ def test_success_curve():
     print("=" * 90)
     print()
 
-    print("Capital  | Success | Failures | Rate    | Avg Years | Status")
-    print("---------|---------|----------|---------|-----------|------------------")
+    rows = [
+        "Capital  | Success | Failures | Rate    | Avg Years | Status",
+        "---------|---------|----------|---------|-----------|------------------",
+    ]
 
     for point in curve_data['curve']:
         status = ""
@@ -206,8 +216,10 @@ def test_success_curve():
         else:
             status = "⚠️ Risky"
 
-        print(f"${point['capital']:>7,} | {point['successes']:7d} | {point['failures']:8d} | "
-              f"{point['success_rate']:6.1f}% | {point['avg_years']:9.1f} | {status}")
+        rows.append(f"${point['capital']:>7,} | {point['successes']:7d} | {point['failures']:8d} | "
+                    f"{point['success_rate']:6.1f}% | {point['avg_years']:9.1f} | {status}")
+
+    sys.stdout.write("\n".join(rows) + "\n")
 
     print()
     print(f"Periods tested: {curve_data['periods_tested']}")
@@ -216,6 +228,15 @@ def test_success_curve():
 
 def main():
     """Run all tests."""
+    parser = argparse.ArgumentParser(description="Optimal allocation algorithm tests")
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="run the full historical tests without prompting (or set RUN_FULL=1)"
+    )
+    args = parser.parse_args()
+    run_full = args.full or os.environ.get("RUN_FULL") == "1"
+
     print()
     print("╔" + "=" * 88 + "╗")
     print("║" + " " * 20 + "OPTIMAL ALLOCATION ALGORITHM TESTS" + " " * 34 + "║")
@@ -235,7 +256,10 @@ def main():
     print("  - Test 3: Generate success curve (~3-5 minutes)")
     print()
 
-    response = input("Continue with full historical tests? [y/N]: ").strip().lower()
+    if run_full:
+        response = 'y'
+    else:
+        response = input("Continue with full historical tests? [y/N]: ").strip().lower()
 
     if response == 'y':
         print()
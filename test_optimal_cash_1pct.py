@@ -10,93 +10,152 @@ This will show if the cash-heavy strategy was driven by the positive carry.
 
 import sys
 import os
+import math
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
-from typing import List, Dict
+from typing import List, Sequence, Dict, Tuple
 
 
-def simulate_smart_withdrawal_custom_cash_rate(
+# Withdrawal source codes stored in year_by_year; SOURCE_NAMES[code] is the label
+SOURCE_CASH_DOWN = 0
+SOURCE_STOCKS_UP = 1
+SOURCE_CASH_PROTECT = 2
+SOURCE_STOCKS_FORCED = 3
+SOURCE_NAMES = (
+    "cash (market down)",
+    "stocks (market up, above base)",
+    "cash (protect base)",
+    "stocks (forced, no cash)",
+)
+
+# 1 / golden ratio: the golden-section step as a fraction of the bracket
+INV_PHI = (math.sqrt(5) - 1) / 2
+
+
+def _cash_rate_outcome(
+    market_down: List[bool],
+    growth: List[float],
     initial_stock: float,
     initial_cash: float,
-    returns_sequence: List[float],
     annual_payment: float,
     initial_mortgage_balance: float,
-    cash_rate: float = 3.7,  # Cash return rate
-    protected_base: float = 100000
-) -> Dict:
+    cash_growth: float,
+    protected_base: float = 100000,
+    history: List[Tuple] = None
+) -> Tuple[bool, int, float]:
     """
-    Simulate smart withdrawal with custom cash rate.
+    Smart withdrawal loop reduced to what the optimizer compares.
+
+    Takes the per-year market-down flags and growth factors precomputed by
+    the caller, so repeated probes on the same sequence skip that work.
+    When a history list is passed, one (year, stock, cash, total, mortgage,
+    withdrawal_source) tuple is appended to it per simulated year.
+
+    Returns:
+        (success, years_to_payoff, leftover)
     """
     stock_balance = initial_stock
     cash_balance = initial_cash
     remaining_mortgage = initial_mortgage_balance
+    total_balance = stock_balance + cash_balance
 
-    year_by_year = []
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
+    for year, (down, g) in enumerate(zip(market_down, growth), start=1):
         # Smart withdrawal logic
-        if stock_return < 0:
+        if down:
             # Market DOWN: Use cash
             if cash_balance >= annual_payment:
-                withdrawal_source = "cash (market down)"
+                withdrawal_source = SOURCE_CASH_DOWN
                 cash_balance -= annual_payment
             else:
-                withdrawal_source = "stocks (forced, no cash)"
+                withdrawal_source = SOURCE_STOCKS_FORCED
                 stock_balance -= annual_payment
         else:
             # Market UP: Use stocks if above base
             if stock_balance > protected_base:
-                withdrawal_source = "stocks (market up, above base)"
+                withdrawal_source = SOURCE_STOCKS_UP
                 stock_balance -= annual_payment
             elif cash_balance >= annual_payment:
-                withdrawal_source = "cash (protect base)"
+                withdrawal_source = SOURCE_CASH_PROTECT
                 cash_balance -= annual_payment
             else:
-                withdrawal_source = "stocks (forced, no cash)"
+                withdrawal_source = SOURCE_STOCKS_FORCED
                 stock_balance -= annual_payment
 
         # Apply returns
-        stock_balance *= (1 + stock_return / 100.0)
-        cash_balance *= (1 + cash_rate / 100.0)  # Use custom cash rate
+        stock_balance *= g
+        cash_balance *= cash_growth
         remaining_mortgage -= annual_payment
 
         total_balance = stock_balance + cash_balance
 
-        year_by_year.append({
-            'year': year,
-            'return': stock_return,
-            'stock_balance': round(stock_balance, 2),
-            'cash_balance': round(cash_balance, 2),
-            'total_balance': round(total_balance, 2),
-            'remaining_mortgage': round(remaining_mortgage, 2),
-            'withdrawal_source': withdrawal_source
-        })
+        if history is not None:
+            history.append((
+                year, stock_balance, cash_balance, total_balance,
+                remaining_mortgage, withdrawal_source
+            ))
 
         # Check for early payoff
         if total_balance >= remaining_mortgage:
-            leftover = total_balance - remaining_mortgage
-            return {
-                'success': True,
-                'years_to_payoff': year,
-                'leftover': leftover,
-                'year_by_year': year_by_year
-            }
+            return True, year, total_balance - remaining_mortgage
 
         # Check for failure
         if total_balance < 0:
-            return {
-                'success': False,
-                'years_to_payoff': year,
-                'leftover': total_balance,
-                'year_by_year': year_by_year
+            return False, year, total_balance
+
+    return total_balance >= 0, len(growth), total_balance
+
+
+def simulate_smart_withdrawal_custom_cash_rate(
+    initial_stock: float,
+    initial_cash: float,
+    returns_sequence: Sequence[float],
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    cash_rate: float = 3.7,  # Cash return rate
+    protected_base: float = 100000,
+    record: bool = False
+) -> Dict:
+    """
+    Simulate smart withdrawal with custom cash rate.
+
+    The simulation itself is _cash_rate_outcome; 'year_by_year' is only
+    built from its history when record=True.
+    """
+    returns_arr = np.asarray(returns_sequence, dtype=float)
+    market_down = (returns_arr < 0).tolist()
+    growth = (1 + returns_arr / 100.0).tolist()
+    cash_growth = 1 + cash_rate / 100.0
+
+    history = [] if record else None
+    success, years, leftover = _cash_rate_outcome(
+        market_down, growth, initial_stock, initial_cash, annual_payment,
+        initial_mortgage_balance, cash_growth, protected_base, history
+    )
+
+    year_by_year = None
+    if record:
+        year_by_year = [
+            {
+                'year': year,
+                'return': float(returns_arr[year - 1]),
+                'stock_balance': round(stock_balance, 2),
+                'cash_balance': round(cash_balance, 2),
+                'total_balance': round(total_balance, 2),
+                'remaining_mortgage': round(remaining_mortgage, 2),
+                'withdrawal_source': withdrawal_source
             }
+            for (year, stock_balance, cash_balance, total_balance,
+                 remaining_mortgage, withdrawal_source) in history
+        ]
 
     return {
-        'success': total_balance >= 0,
-        'years_to_payoff': len(returns_sequence),
-        'leftover': total_balance,
+        'success': success,
+        'years_to_payoff': years,
+        'leftover': leftover,
         'year_by_year': year_by_year
     }
 
@@ -105,15 +164,30 @@ def find_optimal_with_cash_rate(returns_sequence, annual_payment, mortgage_balan
     """
     Find optimal allocation for given cash rate using binary search.
     """
-    import math
+    returns_arr = np.asarray(returns_sequence, dtype=float)
+    market_down = (returns_arr < 0).tolist()
+    growth = (1 + returns_arr / 100.0).tolist()
 
     def find_best_split(total_capital, cash_rate):
         """Golden section search on stock/cash split."""
-        phi = (1 + math.sqrt(5)) / 2
+        cash_growth = 1 + cash_rate / 100.0
+
+        def outcome(ratio):
+            success, years, leftover = _cash_rate_outcome(
+                market_down, growth, total_capital * ratio, total_capital * (1 - ratio),
+                annual_payment, mortgage_balance, cash_growth
+            )
+            return {'success': success, 'years_to_payoff': years, 'leftover': leftover}
+
+        def score(result):
+            if not result['success']:
+                return -1000
+            return -result['years_to_payoff']
 
         a, b = 0.0, 1.0
-        c = b - (b - a) / phi
-        d = a + (b - a) / phi
+        c = b - INV_PHI * (b - a)
+        d = a + INV_PHI * (b - a)
+        result_c = result_d = None
 
         best_result = None
         best_ratio = 0.5
@@ -122,35 +196,27 @@ def find_optimal_with_cash_rate(returns_sequence, annual_payment, mortgage_balan
             if abs(b - a) < 0.01:
                 break
 
-            stock_c = total_capital * c
-            cash_c = total_capital * (1 - c)
-            result_c = simulate_smart_withdrawal_custom_cash_rate(
-                stock_c, cash_c, returns_sequence, annual_payment, mortgage_balance, cash_rate
-            )
-
-            stock_d = total_capital * d
-            cash_d = total_capital * (1 - d)
-            result_d = simulate_smart_withdrawal_custom_cash_rate(
-                stock_d, cash_d, returns_sequence, annual_payment, mortgage_balance, cash_rate
-            )
-
-            def score(result):
-                if not result['success']:
-                    return -1000
-                return -result['years_to_payoff']
+            # The interior point kept from the previous step is still
+            # valid, so only the newly inserted probe is simulated
+            if result_c is None:
+                result_c = outcome(c)
+            if result_d is None:
+                result_d = outcome(d)
 
             if score(result_c) > score(result_d):
                 b = d
                 d = c
-                c = b - (b - a) / phi
+                c = b - INV_PHI * (b - a)
                 best_result = result_c
                 best_ratio = c
+                result_c, result_d = None, result_c
             else:
                 a = c
                 c = d
-                d = a + (b - a) / phi
+                d = a + INV_PHI * (b - a)
                 best_result = result_d
                 best_ratio = d
+                result_c, result_d = result_d, None
 
         optimal_stock = total_capital * best_ratio
         optimal_cash = total_capital * (1 - best_ratio)
@@ -186,7 +252,7 @@ def main():
     print()
 
     loader = SP500DataLoader()
-    returns_2000 = loader.get_returns(2000, 2024)
+    returns_2000 = loader.get_returns_array(2000, 2024)
 
     mortgage_balance = 500000
     mortgage_rate = 3.0
@@ -254,6 +320,7 @@ def main():
     print("Rate | Spread  | Capital | Alloc   | Alloc   | Ratio  |       |")
     print("-----|---------|---------|---------|---------|--------|-------|------------------")
 
+    rows = []
     for r in results:
         spread = r['cash_rate'] - mortgage_rate
         insight = ""
@@ -266,10 +333,11 @@ def main():
         else:
             insight = "Stock-dominant"
 
-        print(f"{r['cash_rate']:4.1f}% | {spread:+6.1f}% | ${r['total']:>6,.0f} | "
-              f"${r['stock']:>6,.0f} | ${r['cash']:>6,.0f} | {r['stock_ratio']:5.1f}% | "
-              f"{r['years']:5d} | {insight}")
+        rows.append(f"{r['cash_rate']:4.1f}% | {spread:+6.1f}% | ${r['total']:>6,.0f} | "
+                    f"${r['stock']:>6,.0f} | ${r['cash']:>6,.0f} | {r['stock_ratio']:5.1f}% | "
+                    f"{r['years']:5d} | {insight}")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
 
     # Key insights
@@ -313,11 +381,12 @@ def main():
     treasury = 433032
     print(f"Treasury ladder: ${treasury:,}")
     print()
-    print("Cash rate impact:")
+    rows = ["Cash rate impact:"]
     for r in results:
         savings = treasury - r['total']
-        print(f"  {r['cash_rate']:.1f}%: ${r['total']:>6,.0f} → {savings:>+6,.0f} vs treasury ({savings/treasury*100:>+5.1f}%)")
+        rows.append(f"  {r['cash_rate']:.1f}%: ${r['total']:>6,.0f} → {savings:>+6,.0f} vs treasury ({savings/treasury*100:>+5.1f}%)")
 
+    sys.stdout.write("\n".join(rows) + "\n")
     print()
 
 
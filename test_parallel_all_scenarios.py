@@ -13,47 +13,15 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
 from backend.services.backtester import MortgageInvestmentBacktester
+from backend.services.treasury_curve import treasury_present_values
 from typing import Dict, List
 
 
-def interpolate_treasury_rate(year: int, rate_points: dict) -> float:
-    """Interpolate treasury rate."""
-    years = sorted(rate_points.keys())
-    if year in rate_points:
-        return rate_points[year]
-
-    lower_year = None
-    upper_year = None
-    for y in years:
-        if y < year:
-            lower_year = y
-        elif y > year and upper_year is None:
-            upper_year = y
-            break
-
-    if lower_year is None:
-        return rate_points[years[0]]
-    if upper_year is None:
-        return rate_points[years[-1]]
-
-    lower_rate = rate_points[lower_year]
-    upper_rate = rate_points[upper_year]
-    return lower_rate + (year - lower_year) * (upper_rate - lower_rate) / (upper_year - lower_year)
-
-
-def calculate_treasury_cost(annual_payment: float, start_year: int, end_year: int, treasury_rates: dict) -> float:
-    """Calculate treasury ladder cost."""
-    total_cost = 0
-    for year in range(start_year, end_year + 1):
-        rate = interpolate_treasury_rate(year, treasury_rates) / 100.0
-        discount_factor = (1 + rate) ** year
-        total_cost += annual_payment / discount_factor
-    return total_cost
-
-
 def main():
     print("=" * 90)
     print("PARALLEL STRATEGY: Test Across ALL Historical Scenarios")
@@ -81,19 +49,24 @@ def main():
     print(f"Total scenarios: {len(all_scenarios)}")
     print()
 
-    # Sort by investment required
-    sorted_scenarios = sorted(all_scenarios, key=lambda x: x['investment_required'])
+    # Get key percentiles by investment required. Only these six ranks are
+    # needed, so partition instead of sorting; ties break on scenario order,
+    # as a stable sort would
+    n = len(all_scenarios)
+    ranks = [0, n // 4, n // 2, 3 * n // 4, 9 * n // 10, n - 1]
+    keys = np.zeros(n, dtype=[('investment', 'f8'), ('position', 'i8')])
+    keys['investment'] = [s['investment_required'] for s in all_scenarios]
+    keys['position'] = np.arange(n)
+    order = np.argpartition(keys, ranks, order=['investment', 'position'])
 
-    # Get key percentiles
-    best_case = sorted_scenarios[0]
-    percentile_25 = sorted_scenarios[len(sorted_scenarios) // 4]
-    median = sorted_scenarios[len(sorted_scenarios) // 2]
-    percentile_75 = sorted_scenarios[3 * len(sorted_scenarios) // 4]
-    percentile_90 = sorted_scenarios[9 * len(sorted_scenarios) // 10]
-    worst_case = sorted_scenarios[-1]
+    best_case, percentile_25, median, percentile_75, percentile_90, worst_case = (
+        all_scenarios[order[rank]] for rank in ranks
+    )
 
-    # Full treasury cost
-    treasury_full = calculate_treasury_cost(annual_payment, 1, years, treasury_rates)
+    # Full treasury cost; a safety net covering years s..25 costs the tail
+    # of the same per-year present values
+    treasury_pv = treasury_present_values(annual_payment, years, treasury_rates)
+    treasury_full = float(treasury_pv.sum())
 
     print("=" * 90)
     print("STOCK-ONLY STRATEGY (from backtester)")
@@ -134,7 +107,7 @@ def main():
     median_stock = median['investment_required']
 
     for safety_year in safety_nets:
-        treasury_cost = calculate_treasury_cost(annual_payment, safety_year, years, treasury_rates)
+        treasury_cost = float(treasury_pv[safety_year - 1:].sum())
 
         # For median scenario, assume stock strategy needs median amount
         total_upfront = median_stock + treasury_cost
@@ -159,7 +132,7 @@ def main():
     print()
 
     # Best parallel for median
-    treasury_safety_23_25 = calculate_treasury_cost(annual_payment, 23, years, treasury_rates)
+    treasury_safety_23_25 = float(treasury_pv[23 - 1:].sum())
     median_parallel_total = median_stock_needed + treasury_safety_23_25
 
     print(f"With parallel strategy (safety net years 23-25):")
@@ -24,60 +24,37 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
-from typing import Tuple, List, Dict
-
-
-def interpolate_treasury_rate(year: int, rate_points: dict) -> float:
-    """Interpolate treasury rate for given year."""
-    years = sorted(rate_points.keys())
-    if year in rate_points:
-        return rate_points[year]
-
-    lower_year = None
-    upper_year = None
-    for y in years:
-        if y < year:
-            lower_year = y
-        elif y > year and upper_year is None:
-            upper_year = y
-            break
-
-    if lower_year is None:
-        return rate_points[years[0]]
-    if upper_year is None:
-        return rate_points[years[-1]]
-
-    lower_rate = rate_points[lower_year]
-    upper_rate = rate_points[upper_year]
-    return lower_rate + (year - lower_year) * (upper_rate - lower_rate) / (upper_year - lower_year)
+from backend.services.investment_simulator import withdrawal_growth, stock_balance_path, first_year
+from backend.services.treasury_curve import interpolate_treasury_rate, treasury_present_values
+from typing import Tuple, List, Dict, Union
 
 
 def calculate_treasury_cost(annual_payment: float, start_year: int, end_year: int, treasury_rates: dict) -> float:
     """Calculate cost of treasury ladder for years [start_year, end_year]."""
-    total_cost = 0
-    for year in range(start_year, end_year + 1):
-        rate = interpolate_treasury_rate(year, treasury_rates) / 100.0
-        discount_factor = (1 + rate) ** year
-        cost_today = annual_payment / discount_factor
-        total_cost += cost_today
-    return total_cost
-
-
-def calculate_treasury_value_at_year(annual_payment: float, purchase_year: int, current_year: int, treasury_rates: dict) -> float:
-    """Calculate current value of a treasury bond purchased for year N."""
-    if current_year >= purchase_year:
-        # Bond has matured or will mature this year
-        return annual_payment
-
-    # Bond still has time value
-    years_remaining = purchase_year - current_year
-    rate = interpolate_treasury_rate(years_remaining, treasury_rates) / 100.0
+    years = np.arange(start_year, end_year + 1)
+    rates = interpolate_treasury_rate(years, treasury_rates) / 100.0
+    return float(np.sum(annual_payment / (1 + rates) ** years))
+
 
-    # Current value = FV / (1 + r)^n
-    current_value = annual_payment / ((1 + rate) ** years_remaining)
-    return current_value
+def calculate_treasury_value_at_year(
+    annual_payment: float,
+    purchase_year: Union[int, np.ndarray],
+    current_year: int,
+    treasury_rates: dict
+) -> Union[float, np.ndarray]:
+    """
+    Calculate current value of a treasury bond purchased for year N (or of
+    each bond in an array of purchase years).
+    """
+    # Bonds that have matured or mature this year are worth the payment;
+    # the rest are discounted over the years remaining: FV / (1 + r)^n
+    years_remaining = np.maximum(np.asarray(purchase_year) - current_year, 0)
+    rate = interpolate_treasury_rate(years_remaining, treasury_rates) / 100.0
+    return annual_payment / (1 + rate) ** years_remaining
 
 
 def simulate_parallel_allocation(
@@ -99,87 +76,82 @@ def simulate_parallel_allocation(
 
     # Calculate treasury cost
     treasury_cost = calculate_treasury_cost(annual_payment, treasury_start_year, total_years, treasury_rates)
-
-    # Simulate stocks
-    stock_balance = stock_investment
-    remaining_mortgage = initial_mortgage_balance
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        # Make payment from stocks
-        stock_balance -= annual_payment
-        remaining_mortgage -= annual_payment
-
-        # Apply return
-        stock_balance *= (1 + stock_return / 100.0)
-
-        # Check for early payoff
-        if stock_balance >= remaining_mortgage:
-            # SUCCESS! Paid off early
-            leftover_stocks = stock_balance - remaining_mortgage
-
-            # Calculate value of unused treasuries
-            # Treasuries for years [year+1, total_years] are unused
-            treasury_refund = 0
-            if year < treasury_start_year:
-                # All treasuries unused - can sell them
-                for t_year in range(treasury_start_year, total_years + 1):
-                    treasury_refund += calculate_treasury_value_at_year(
-                        annual_payment, t_year, year, treasury_rates
-                    )
-
-            total_capital_needed = stock_investment + treasury_cost
-            net_capital = total_capital_needed - treasury_refund - leftover_stocks
-
-            return {
-                'success': True,
-                'paid_off_early': True,
-                'years_to_payoff': year,
-                'stock_investment': stock_investment,
-                'treasury_cost': treasury_cost,
-                'total_upfront_capital': total_capital_needed,
-                'leftover_stocks': leftover_stocks,
-                'treasury_refund': treasury_refund,
-                'net_capital_used': net_capital,
-                'treasury_safety_net_used': False
-            }
-
-        # Check if we reached treasury safety net
-        if year >= treasury_start_year:
-            # Treasuries take over, guaranteed finish
-            total_capital_needed = stock_investment + treasury_cost
-
-            return {
-                'success': True,
-                'paid_off_early': False,
-                'years_to_payoff': total_years,
-                'stock_investment': stock_investment,
-                'treasury_cost': treasury_cost,
-                'total_upfront_capital': total_capital_needed,
-                'leftover_stocks': 0,
-                'treasury_refund': 0,
-                'net_capital_used': total_capital_needed,
-                'treasury_safety_net_used': True,
-                'treasury_kicked_in': year
-            }
-
-        # Check for failure before safety net
-        if stock_balance < 0 and year < treasury_start_year:
-            return {
-                'success': False,
-                'paid_off_early': False,
-                'years_to_payoff': year,
-                'stock_investment': stock_investment,
-                'treasury_cost': treasury_cost,
-                'total_upfront_capital': stock_investment + treasury_cost,
-                'leftover_stocks': stock_balance,
-                'treasury_refund': 0,
-                'net_capital_used': stock_investment + treasury_cost,
-                'treasury_safety_net_used': False,
-                'failed_before_safety_net': True
-            }
-
-    # Completed full term
     total_capital_needed = stock_investment + treasury_cost
+
+    # Simulate stocks: payments come out of stocks every year
+    stock_balances = stock_balance_path(returns_sequence, annual_payment, stock_investment)
+    remaining_mortgages = initial_mortgage_balance - annual_payment * np.arange(1, total_years + 1)
+
+    # The simulation stops at the first early payoff, the year treasuries
+    # take over, or a failure before the safety net - in that order of
+    # precedence within a year
+    payoff_year = first_year(stock_balances >= remaining_mortgages)
+    safety_year = max(treasury_start_year, 1) if treasury_start_year <= total_years else 0
+    failure_year = first_year(stock_balances[:max(treasury_start_year - 1, 0)] < 0)
+    decided = [y for y in (payoff_year, safety_year, failure_year) if y]
+    year = min(decided) if decided else 0
+
+    if year and year == payoff_year:
+        # SUCCESS! Paid off early
+        leftover_stocks = float(stock_balances[year - 1] - remaining_mortgages[year - 1])
+
+        # Calculate value of unused treasuries
+        # Treasuries for years [year+1, total_years] are unused
+        treasury_refund = 0
+        if year < treasury_start_year:
+            # All treasuries unused - can sell them
+            treasury_refund = float(np.sum(calculate_treasury_value_at_year(
+                annual_payment, np.arange(treasury_start_year, total_years + 1), year, treasury_rates
+            )))
+
+        net_capital = total_capital_needed - treasury_refund - leftover_stocks
+
+        return {
+            'success': True,
+            'paid_off_early': True,
+            'years_to_payoff': year,
+            'stock_investment': stock_investment,
+            'treasury_cost': treasury_cost,
+            'total_upfront_capital': total_capital_needed,
+            'leftover_stocks': leftover_stocks,
+            'treasury_refund': treasury_refund,
+            'net_capital_used': net_capital,
+            'treasury_safety_net_used': False
+        }
+
+    if year and year == safety_year:
+        # Treasuries take over, guaranteed finish
+        return {
+            'success': True,
+            'paid_off_early': False,
+            'years_to_payoff': total_years,
+            'stock_investment': stock_investment,
+            'treasury_cost': treasury_cost,
+            'total_upfront_capital': total_capital_needed,
+            'leftover_stocks': 0,
+            'treasury_refund': 0,
+            'net_capital_used': total_capital_needed,
+            'treasury_safety_net_used': True,
+            'treasury_kicked_in': year
+        }
+
+    if year:
+        # Failed before safety net
+        return {
+            'success': False,
+            'paid_off_early': False,
+            'years_to_payoff': year,
+            'stock_investment': stock_investment,
+            'treasury_cost': treasury_cost,
+            'total_upfront_capital': total_capital_needed,
+            'leftover_stocks': float(stock_balances[year - 1]),
+            'treasury_refund': 0,
+            'net_capital_used': total_capital_needed,
+            'treasury_safety_net_used': False,
+            'failed_before_safety_net': True
+        }
+
+    # Completed full term (safety net starts after the last year)
     return {
         'success': True,
         'paid_off_early': False,
@@ -187,13 +159,41 @@ def simulate_parallel_allocation(
         'stock_investment': stock_investment,
         'treasury_cost': treasury_cost,
         'total_upfront_capital': total_capital_needed,
-        'leftover_stocks': max(0, stock_balance),
+        'leftover_stocks': max(0, float(stock_balances[-1])) if total_years else max(0, stock_investment),
         'treasury_refund': 0,
         'net_capital_used': total_capital_needed,
-        'treasury_safety_net_used': year >= treasury_start_year
+        'treasury_safety_net_used': False
     }
 
 
+def required_stock_investment(
+    treasury_start_year: int,
+    returns_sequence: List[float],
+    annual_payment: float,
+    initial_mortgage_balance: float
+) -> float:
+    """
+    Smallest stock investment for which simulate_parallel_allocation succeeds
+    (-inf if it cannot fail).
+
+    The balance after year k is G[k] * (investment - drawn[k]), so it goes
+    negative in year k exactly when investment < drawn[k], and pays off the
+    mortgage exactly when investment >= payoff_level[k]. A failure before
+    the safety net happens when some year k < treasury_start_year is below
+    drawn[k] and below every payoff level up to k. Assumes every return is
+    above -100%, so G stays positive.
+    """
+    cumulative_growth, draw_factors = withdrawal_growth(returns_sequence)
+    drawn = annual_payment * draw_factors
+
+    remaining_mortgages = initial_mortgage_balance - annual_payment * np.arange(1, len(drawn) + 1)
+    payoff_level = remaining_mortgages / cumulative_growth + drawn
+
+    failure_level = np.minimum(drawn, np.minimum.accumulate(payoff_level))
+    failure_level = failure_level[:max(treasury_start_year - 1, 0)]
+    return float(failure_level.max()) if failure_level.size else float('-inf')
+
+
 def find_minimum_stock_investment(
     treasury_start_year: int,
     returns_sequence: List[float],
@@ -201,7 +201,17 @@ def find_minimum_stock_investment(
     initial_mortgage_balance: float,
     treasury_rates: dict
 ) -> Tuple[float, Dict]:
-    """Find minimum stock investment needed with given treasury safety net."""
+    """
+    Find minimum stock investment needed with given treasury safety net.
+
+    Success only depends on whether the investment reaches the analytic
+    threshold, so the $100 bisection compares against it instead of
+    simulating every probe; only the answer is simulated.
+    """
+    required = required_stock_investment(
+        treasury_start_year, returns_sequence, annual_payment, initial_mortgage_balance
+    )
+
     low = 0.0
     high = initial_mortgage_balance
     tolerance = 100.0
@@ -209,12 +219,7 @@ def find_minimum_stock_investment(
     while high - low > tolerance:
         mid = (low + high) / 2.0
 
-        result = simulate_parallel_allocation(
-            mid, treasury_start_year, returns_sequence, annual_payment,
-            initial_mortgage_balance, treasury_rates
-        )
-
-        if result['success']:
+        if mid >= required:
             high = mid
         else:
             low = mid
@@ -227,6 +232,43 @@ def find_minimum_stock_investment(
     return high, result
 
 
+def sweep_safety_nets(
+    safety_net_years: List[int],
+    returns_sequence: List[float],
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    treasury_rates: dict
+) -> Dict[int, Dict]:
+    """
+    Ladder cost, minimum stock investment and outcome for each safety net
+    start year, keyed by that year. No output; main formats the table.
+    """
+    total_years = len(returns_sequence)
+
+    # Cost today of each year's payment; a safety net from year s onwards
+    # costs the suffix sum from s, so ladder_costs[s - 1] prices it
+    present_values = treasury_present_values(annual_payment, total_years, treasury_rates)
+    ladder_costs = np.cumsum(present_values[::-1])[::-1]
+
+    results = {}
+
+    for safety_year in safety_net_years:
+        treasury_cost = float(ladder_costs[safety_year - 1])
+
+        stock_needed, result = find_minimum_stock_investment(
+            safety_year, returns_sequence, annual_payment, initial_mortgage_balance, treasury_rates
+        )
+
+        results[safety_year] = {
+            'treasury_cost': treasury_cost,
+            'stock_needed': stock_needed,
+            'total_upfront': stock_needed + treasury_cost,
+            'result': result
+        }
+
+    return results
+
+
 def main():
     print("=" * 90)
     print("PARALLEL ALLOCATION: Treasury Safety Net + Stock Upside")
@@ -235,7 +277,7 @@ def main():
 
     # Setup
     loader = SP500DataLoader()
-    returns_2000 = loader.get_returns(2000, 2024)
+    returns_2000 = loader.get_returns_array(2000, 2024)
 
     mortgage_balance = 500000
     mortgage_rate = 3.0
@@ -272,23 +314,13 @@ def main():
     print("Starts Yr  | Cost     | Needed   | Upfront  | ")
     print("-----------|----------|----------|----------|----------------------------------")
 
-    results = {}
-
-    for safety_year in safety_net_years:
-        treasury_cost = calculate_treasury_cost(annual_payment, safety_year, years, treasury_rates)
-
-        stock_needed, result = find_minimum_stock_investment(
-            safety_year, returns_2000, annual_payment, mortgage_balance, treasury_rates
-        )
+    results = sweep_safety_nets(
+        safety_net_years, returns_2000, annual_payment, mortgage_balance, treasury_rates
+    )
 
-        total_upfront = stock_needed + treasury_cost
-
-        results[safety_year] = {
-            'treasury_cost': treasury_cost,
-            'stock_needed': stock_needed,
-            'total_upfront': total_upfront,
-            'result': result
-        }
+    rows = []
+    for safety_year, entry in results.items():
+        result = entry['result']
 
         outcome = ""
         if result.get('paid_off_early'):
@@ -300,8 +332,10 @@ def main():
         else:
             outcome = "Completed"
 
-        print(f"{safety_year:10d} | ${treasury_cost:>7,.0f} | ${stock_needed:>7,.0f} | "
-              f"${total_upfront:>7,.0f} | {outcome}")
+        rows.append(f"{safety_year:10d} | ${entry['treasury_cost']:>7,.0f} | ${entry['stock_needed']:>7,.0f} | "
+                    f"${entry['total_upfront']:>7,.0f} | {outcome}")
+
+    sys.stdout.write("\n".join(rows) + "\n")
 
     # Find optimal
     optimal_year = min(results, key=lambda k: results[k]['total_upfront'])
@@ -14,10 +14,49 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
 
 
+# Withdrawal source codes stored in year_by_year['withdrawal_source'];
+# SOURCE_NAMES[code] is the label
+SOURCE_FINISH_LINE = 0
+SOURCE_ABOVE_BASE = 1
+SOURCE_PROTECT_BASE = 2
+SOURCE_FORCED = 3
+SOURCE_NAMES = (
+    "stocks (finish line)",
+    "stocks (above base)",
+    "cash (protect base)",
+    "stocks (forced)",
+)
+
+YEAR_DTYPE = np.dtype([
+    ('year', 'i4'),
+    ('return', 'f8'),
+    ('stock_balance', 'f8'),
+    ('cash_balance', 'f8'),
+    ('total_balance', 'f8'),
+    ('remaining_mortgage', 'f8'),
+    ('withdrawal_source', 'u1'),
+    ('replenished', 'f8'),
+    ('can_payoff', '?'),
+    ('near_finish', '?'),
+])
+
+
+def _rounded_history(year_by_year, years: int):
+    """First `years` rows of a recorded history with dollar columns rounded to cents."""
+    if year_by_year is None:
+        return None
+    year_by_year = year_by_year[:years]
+    for column in ('stock_balance', 'cash_balance', 'total_balance', 'remaining_mortgage', 'replenished'):
+        year_by_year[column] = np.round(year_by_year[column], 2)
+    return year_by_year
+
+
 def simulate_protected_base(
     initial_stock: float,
     initial_cash: float,
@@ -25,22 +64,30 @@ def simulate_protected_base(
     annual_payment: float,
     initial_mortgage_balance: float,
     protected_base: float = 100000,
-    replenish_threshold: float = 15.0
+    replenish_threshold: float = 15.0,
+    record: bool = False
 ):
     """
     Protected base strategy:
     - Never withdraw from stocks if balance < protected_base
     - Exception: When remaining_mortgage < stock_balance (near finish)
     - Replenish cash in good years
+
+    'year_by_year' is only built when record=True (a YEAR_DTYPE structured
+    array, one row per simulated year); searches that just compare outcomes
+    leave it off.
     """
     stock_balance = initial_stock
     cash_balance = initial_cash
     remaining_mortgage = initial_mortgage_balance
     initial_cash_target = initial_cash
 
-    year_by_year = []
+    returns_list = [float(r) for r in returns_sequence]
+    growth = [1 + stock_return / 100.0 for stock_return in returns_list]
+
+    year_by_year = np.empty(len(returns_list), dtype=YEAR_DTYPE) if record else None
 
-    for year, stock_return in enumerate(returns_sequence, start=1):
+    for year, (stock_return, g) in enumerate(zip(returns_list, growth), start=1):
         # DECISION: Where to withdraw from?
 
         # Exception: Near the finish line?
@@ -48,23 +95,23 @@ def simulate_protected_base(
 
         if near_finish:
             # Close to done! OK to drain stocks
-            withdrawal_source = "stocks (finish line)"
+            withdrawal_source = SOURCE_FINISH_LINE
             stock_balance -= annual_payment
         elif stock_balance > protected_base:
             # Above protected base, can use stocks
-            withdrawal_source = "stocks (above base)"
+            withdrawal_source = SOURCE_ABOVE_BASE
             stock_balance -= annual_payment
         elif cash_balance >= annual_payment:
             # Below base, use cash
-            withdrawal_source = "cash (protect base)"
+            withdrawal_source = SOURCE_PROTECT_BASE
             cash_balance -= annual_payment
         else:
             # No cash left and below base - forced to use stocks
-            withdrawal_source = "stocks (forced)"
+            withdrawal_source = SOURCE_FORCED
             stock_balance -= annual_payment
 
         # Apply returns
-        stock_balance *= (1 + stock_return / 100.0)
+        stock_balance *= g
         cash_balance *= 1.037  # Cash earns 3.7%
 
         remaining_mortgage -= annual_payment
@@ -83,18 +130,12 @@ def simulate_protected_base(
                 cash_balance += replenish_amount
                 replenished = replenish_amount
 
-        year_by_year.append({
-            'year': year,
-            'return': stock_return,
-            'stock_balance': round(stock_balance, 2),
-            'cash_balance': round(cash_balance, 2),
-            'total_balance': round(total_balance, 2),
-            'remaining_mortgage': round(remaining_mortgage, 2),
-            'withdrawal_source': withdrawal_source,
-            'replenished': round(replenished, 2),
-            'can_payoff': total_balance >= remaining_mortgage,
-            'near_finish': near_finish
-        })
+        if record:
+            year_by_year[year - 1] = (
+                year, stock_return, stock_balance, cash_balance, total_balance,
+                remaining_mortgage, withdrawal_source, replenished,
+                total_balance >= remaining_mortgage, near_finish
+            )
 
         # Check for payoff
         if total_balance >= remaining_mortgage:
@@ -104,7 +145,7 @@ def simulate_protected_base(
                 'paid_off_early': True,
                 'years_to_payoff': year,
                 'leftover': leftover,
-                'year_by_year': year_by_year
+                'year_by_year': _rounded_history(year_by_year, year)
             }
 
         # Check for failure
@@ -114,16 +155,16 @@ def simulate_protected_base(
                 'paid_off_early': False,
                 'years_to_payoff': year,
                 'leftover': total_balance,
-                'year_by_year': year_by_year
+                'year_by_year': _rounded_history(year_by_year, year)
             }
 
     # Completed
     return {
         'success': total_balance >= 0,
         'paid_off_early': False,
-        'years_to_payoff': len(returns_sequence),
+        'years_to_payoff': len(returns_list),
         'leftover': total_balance,
-        'year_by_year': year_by_year
+        'year_by_year': _rounded_history(year_by_year, len(returns_list))
     }
 
 
@@ -182,7 +223,13 @@ def find_optimal_allocation(
         print("❌ No successful allocation found! Need more capital.")
         return None
 
-    return best_result
+    # Only the winner's year-by-year history is displayed
+    stock, cash, _ = best_result
+    result = simulate_protected_base(
+        stock, cash, returns_sequence, annual_payment,
+        initial_mortgage_balance, protected_base, record=True
+    )
+    return stock, cash, result
 
 
 def main():
@@ -204,7 +251,7 @@ def main():
 
     # Setup
     loader = SP500DataLoader()
-    returns_2000 = loader.get_returns(2000, 2024)
+    returns_2000 = loader.get_returns_array(2000, 2024)
 
     mortgage_balance = 500000
     mortgage_rate = 3.0
@@ -286,7 +333,7 @@ def main():
 
         print(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | ${y['stock_balance']:>6,.0f} | "
               f"${y['cash_balance']:>5,.0f} | ${y['total_balance']:>6,.0f} | ${y['remaining_mortgage']:>7,.0f} | "
-              f"{y['withdrawal_source']:20s}")
+              f"{SOURCE_NAMES[y['withdrawal_source']]:20s}")
 
     if len(best_result['year_by_year']) > 15:
         print("...")
@@ -299,10 +346,11 @@ def main():
     print("=" * 90)
     print()
 
-    cash_protect = sum(1 for y in best_result['year_by_year'] if 'protect base' in y['withdrawal_source'])
-    stock_above = sum(1 for y in best_result['year_by_year'] if 'above base' in y['withdrawal_source'])
-    stock_finish = sum(1 for y in best_result['year_by_year'] if 'finish line' in y['withdrawal_source'])
-    stock_forced = sum(1 for y in best_result['year_by_year'] if 'forced' in y['withdrawal_source'])
+    source_counts = np.bincount(best_result['year_by_year']['withdrawal_source'], minlength=len(SOURCE_NAMES))
+    cash_protect = int(source_counts[SOURCE_PROTECT_BASE])
+    stock_above = int(source_counts[SOURCE_ABOVE_BASE])
+    stock_finish = int(source_counts[SOURCE_FINISH_LINE])
+    stock_forced = int(source_counts[SOURCE_FORCED])
 
     print(f"Protected base withdrawals (from cash): {cash_protect} years")
     print(f"Normal stock withdrawals (above base):  {stock_above} years")
@@ -312,8 +360,8 @@ def main():
     print()
 
     # Find minimum stock balance
-    min_stock = min(y['stock_balance'] for y in best_result['year_by_year'])
-    min_stock_year = [y for y in best_result['year_by_year'] if y['stock_balance'] == min_stock][0]
+    min_stock_year = best_result['year_by_year'][int(np.argmin(best_result['year_by_year']['stock_balance']))]
+    min_stock = float(min_stock_year['stock_balance'])
 
     print(f"Minimum stock balance: ${min_stock:,.2f} in year {min_stock_year['year']}")
     print(f"Protected base: ${protected_base:,}")
@@ -2,13 +2,15 @@
 
 import json
 import sys
+import numpy as np
 sys.path.insert(0, '/Users/sachin/projects/finance-app')
 
 from backend.services.data_loader import SP500DataLoader
+from backend.services.investment_simulator import stock_balance_path
 
 # Load data
 loader = SP500DataLoader()
-nominal_returns_1950_1999 = loader.get_returns(1950, 1999)
+nominal_returns_1950_1999 = loader.get_returns_array(1950, 1999)
 
 print(f"Testing 1950-1999 with REAL returns (FICalc style)")
 print(f"Initial portfolio: $5,000,000")
@@ -47,13 +49,10 @@ print(f"=" * 70)
 print(f"\n\nTrying to match FICalc's $279M result:")
 print(f"=" * 70)
 
-for inf_rate in [3.5, 3.7, 4.0, 4.5, 5.0]:
-    balance = 5_000_000
-    withdrawal = 200_000
-
-    real_rets = [nom - inf_rate for nom in nominal_returns_1950_1999]
-
-    for real_ret in real_rets:
-        balance = (balance - withdrawal) * (1 + real_ret / 100.0)
+# One row per inflation rate, simulated on the real (nominal - inflation) returns
+inflation_rates = [3.5, 3.7, 4.0, 4.5, 5.0]
+real_returns_by_rate = nominal_returns_1950_1999[None, :] - np.array(inflation_rates)[:, None]
+final_balances = stock_balance_path(real_returns_by_rate, 200_000, 5_000_000)[:, -1]
 
+for inf_rate, balance in zip(inflation_rates, final_balances):
     print(f"Inflation {inf_rate}% → Real returns → Final: ${balance/1_000_000:.1f}M")
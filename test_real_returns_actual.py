@@ -1,16 +1,21 @@
 """Test with actual FRED CPI-adjusted real returns."""
 
 import json
+import sys
+import numpy as np
+sys.path.insert(0, '/Users/sachin/projects/finance-app')
+
+from backend.services.investment_simulator import stock_balance_path
 
 # Load real returns
 with open('/Users/sachin/projects/finance-app/data/sp500_real_returns.json', 'r') as f:
     data = json.load(f)
 
 # Extract 1950-1999 real returns
-real_returns_1950_1999 = []
-for item in data['returns']:
-    if 1950 <= item['year'] <= 1999:
-        real_returns_1950_1999.append(item['return'])
+returns = data['returns']
+years = np.fromiter((item['year'] for item in returns), dtype=np.int32, count=len(returns))
+real_returns = np.fromiter((item['return'] for item in returns), dtype=np.float64, count=len(returns))
+real_returns_1950_1999 = real_returns[(years >= 1950) & (years <= 1999)]
 
 print(f"Testing with ACTUAL FRED CPI-adjusted real returns")
 print(f"1950-1999 period ({len(real_returns_1950_1999)} years)")
@@ -19,19 +24,19 @@ print(f"Annual withdrawal: $200,000 (constant in real terms)")
 print(f"=" * 70)
 
 balance = 5_000_000
-withdrawal = 200_000
-
-for year_idx, real_return in enumerate(real_returns_1950_1999, start=1):
-    year = 1949 + year_idx
+withdrawal = 200_000  # Constant in real dollars
 
-    # Withdraw (constant in real dollars)
-    balance = balance - withdrawal
+# Withdraw, then apply the REAL return, every year
+balances = stock_balance_path(real_returns_1950_1999, withdrawal, balance)
 
-    # Apply REAL return
-    balance = balance * (1 + real_return / 100.0)
+for year_idx, (real_return, year_balance) in enumerate(zip(real_returns_1950_1999, balances), start=1):
+    year = 1949 + year_idx
 
     if year_idx <= 5 or year_idx >= 46:
-        print(f"Year {year_idx} ({year}): Real return {real_return:+.2f}% → Balance: ${balance:,.0f}")
+        print(f"Year {year_idx} ({year}): Real return {real_return:+.2f}% → Balance: ${year_balance:,.0f}")
+
+if len(balances):
+    balance = float(balances[-1])
 
 print(f"\n" + "=" * 70)
 print(f"Final balance after 50 years: ${balance:,.0f}")
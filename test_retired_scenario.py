@@ -19,20 +19,23 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
-from statistics import mean, median
-
+from backend.services.investment_simulator import suffix_growth
 
-def simulate_portfolio(initial_amount, returns_sequence, annual_withdrawal):
-    """Simulate portfolio with fixed annual withdrawal."""
-    balance = initial_amount
 
-    for stock_return in returns_sequence:
-        balance -= annual_withdrawal
-        balance *= (1 + stock_return / 100.0)
+def end_balances(initial_amount, suffix, annual_withdrawal):
+    """
+    End balances for a suffix_growth table.
 
-    return balance
+    Withdrawing at the start of each year and then growing leaves
+    initial * prod(g) - withdrawal * sum(prod(g[t:]) for each year t).
+    initial_amount and annual_withdrawal may also be arrays, broadcast
+    against the rows (a single row then prices many scenarios at once).
+    """
+    return initial_amount * suffix[:, 0] - annual_withdrawal * suffix.sum(axis=1)
 
 
 def main():
@@ -66,50 +69,52 @@ def main():
     ]
 
     # Get test period (use 2000-2024 as worst case)
-    returns_2000 = loader.get_returns(2000, 2024)
+    returns_2000 = loader.get_returns_array(2000, 2024)
 
     print("=" * 90)
     print("COMPARISON: 2000-2024 Worst Case")
     print("=" * 90)
     print()
 
-    print("Total   | Living  | Strategy A: Pay Off  | Strategy B: Keep Invested")
-    print("Assets  | Expense | Portfolio End Balance | Portfolio End Balance | Better?")
-    print("--------|---------|----------------------|----------------------|----------")
-
-    for total_assets, living_expenses in test_scenarios:
-        # Strategy A: Pay off mortgage now
-        # Portfolio = total_assets - 500K
-        # Withdraw = living_expenses only (no mortgage)
-        portfolio_a = total_assets - 500000
-        withdrawal_a = living_expenses
+    rows = [
+        "Total   | Living  | Strategy A: Pay Off  | Strategy B: Keep Invested",
+        "Assets  | Expense | Portfolio End Balance | Portfolio End Balance | Better?",
+        "--------|---------|----------------------|----------------------|----------",
+    ]
 
-        if portfolio_a <= 0:
-            end_balance_a = "N/A (not enough to pay off)"
-            better = "B"
+    # Strategy A: Pay off mortgage now
+    # Portfolio = total_assets - 500K
+    # Withdraw = living_expenses only (no mortgage)
+    # Strategy B: Keep invested
+    # Portfolio = total_assets (all invested)
+    # Withdraw = living_expenses + mortgage_payment
+    # One pass over the 2000-2024 returns prices every scenario
+    assets, expenses = np.array(test_scenarios, dtype=np.float64).T
+    suffix_2000 = suffix_growth([returns_2000])
+    end_balances_a = end_balances(assets - 500000, suffix_2000, expenses)
+    end_balances_b = end_balances(assets, suffix_2000, expenses + mortgage_payment)
+
+    for (total_assets, living_expenses), end_balance_a, end_balance_b in zip(
+        test_scenarios, end_balances_a.tolist(), end_balances_b.tolist()
+    ):
+        if total_assets - 500000 <= 0:
+            # Not enough to pay off - Strategy A is not available
+            continue
+
+        # Which is better?
+        if end_balance_a > end_balance_b:
+            better = "A (Pay off)"
+        elif end_balance_b > end_balance_a:
+            better = "B (Invest)"
         else:
-            end_balance_a = simulate_portfolio(portfolio_a, returns_2000, withdrawal_a)
+            better = "Tie"
 
-            # Strategy B: Keep invested
-            # Portfolio = total_assets (all invested)
-            # Withdraw = living_expenses + mortgage_payment
-            portfolio_b = total_assets
-            withdrawal_b = living_expenses + mortgage_payment
+        diff = end_balance_b - end_balance_a
 
-            end_balance_b = simulate_portfolio(portfolio_b, returns_2000, withdrawal_b)
+        rows.append(f"${total_assets:>6,} | ${living_expenses:>6,} | ${end_balance_a:>19,.0f} | "
+                    f"${end_balance_b:>19,.0f} | {better} ({diff:+,.0f})")
 
-            # Which is better?
-            if end_balance_a > end_balance_b:
-                better = "A (Pay off)"
-            elif end_balance_b > end_balance_a:
-                better = "B (Invest)"
-            else:
-                better = "Tie"
-
-            diff = end_balance_b - end_balance_a
-
-            print(f"${total_assets:>6,} | ${living_expenses:>6,} | ${end_balance_a:>19,.0f} | "
-                  f"${end_balance_b:>19,.0f} | {better} ({diff:+,.0f})")
+    sys.stdout.write("\n".join(rows) + "\n")
 
     print()
 
@@ -126,49 +131,30 @@ def main():
     print(f"Scenario: ${total_assets:,} total assets, ${living_expenses:,}/year living expenses")
     print()
 
-    # Get all windows (excluding Great Depression)
+    # Get all 25-year windows in the data (excluding Great Depression)
     great_depression = ['1928-1952', '1929-1953', '1930-1954', '1931-1955']
-    all_windows = []
-
-    for start_year in range(1926, 2001):
-        end_year = start_year + 24
-        if end_year <= 2025:
-            period = f"{start_year}-{end_year}"
-            if period not in great_depression:
-                try:
-                    returns = loader.get_returns(start_year, end_year)
-                    if len(returns) == 25:
-                        all_windows.append({
-                            'period': period,
-                            'returns': returns
-                        })
-                except:
-                    pass
-
-    results_a = []
-    results_b = []
-
-    for window in all_windows:
-        # Strategy A: Pay off
-        portfolio_a = total_assets - 500000
-        withdrawal_a = living_expenses
-        end_a = simulate_portfolio(portfolio_a, window['returns'], withdrawal_a)
-        results_a.append(end_a)
-
-        # Strategy B: Invest
-        portfolio_b = total_assets
-        withdrawal_b = living_expenses + mortgage_payment
-        end_b = simulate_portfolio(portfolio_b, window['returns'], withdrawal_b)
-        results_b.append(end_b)
+    first_year, last_year = loader.get_available_years()
+    start_years = [
+        start_year for start_year in range(max(1926, first_year), min(2000, last_year - 24) + 1)
+        if f"{start_year}-{start_year + 24}" not in great_depression
+    ]
+    all_windows = np.lib.stride_tricks.sliding_window_view(
+        loader.get_returns_array(first_year, last_year), 25
+    )[np.array(start_years, dtype=int) - first_year]
+
+    # Strategy A: Pay off; Strategy B: Invest (same windows, one growth table)
+    window_suffix = suffix_growth(all_windows)
+    results_a = end_balances(total_assets - 500000, window_suffix, living_expenses)
+    results_b = end_balances(total_assets, window_suffix, living_expenses + mortgage_payment)
 
     # Calculate statistics
-    avg_a = mean(results_a)
-    median_a = median(results_a)
-    min_a = min(results_a)
+    avg_a = float(np.mean(results_a))
+    median_a = float(np.median(results_a))
+    min_a = float(results_a.min())
 
-    avg_b = mean(results_b)
-    median_b = median(results_b)
-    min_b = min(results_b)
+    avg_b = float(np.mean(results_b))
+    median_b = float(np.median(results_b))
+    min_b = float(results_b.min())
 
     print(f"Strategy A: Pay Off $500K, Invest ${total_assets - 500000:,}")
     print(f"  Withdraw ${living_expenses:,}/year for living expenses")
@@ -184,9 +170,10 @@ def main():
     print(f"  Worst case: ${min_b:,.0f}")
     print()
 
-    # Count wins
-    wins_a = sum(1 for i in range(len(results_a)) if results_a[i] > results_b[i])
-    wins_b = sum(1 for i in range(len(results_b)) if results_b[i] > results_a[i])
+    # Count wins (one subtraction serves both counts)
+    advantage_b = results_b - results_a
+    wins_a = int(np.count_nonzero(advantage_b < 0))
+    wins_b = int(np.count_nonzero(advantage_b > 0))
 
     print(f"Historical Performance:")
     print(f"  Strategy A wins: {wins_a}/{len(all_windows)} scenarios ({wins_a/len(all_windows)*100:.1f}%)")
@@ -1,24 +1,21 @@
 """Test simulation logic to debug negative outcomes."""
 
-def simulate_portfolio_old(initial: float, returns: list[float], annual_withdrawal: float) -> float:
-    """Current simulation - withdraws FIRST."""
-    balance = initial
-
-    for stock_return in returns:
-        balance -= annual_withdrawal
-        balance *= (1 + stock_return / 100.0)
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-    return balance
+from backend.services.investment_simulator import suffix_growth
 
-def simulate_portfolio_new(initial: float, returns: list[float], annual_withdrawal: float) -> float:
-    """New simulation - applies return FIRST."""
-    balance = initial
 
-    for stock_return in returns:
-        balance *= (1 + stock_return / 100.0)
-        balance -= annual_withdrawal
+def simulate_portfolio_old(initial: float, returns: list[float], annual_withdrawal: float) -> float:
+    """Current simulation - withdraws FIRST (each withdrawal forgoes suffix[t])."""
+    suffix = suffix_growth(returns)
+    return float(initial * suffix[0] - annual_withdrawal * suffix.sum()) if len(suffix) else initial
 
-    return balance
+def simulate_portfolio_new(initial: float, returns: list[float], annual_withdrawal: float) -> float:
+    """New simulation - applies return FIRST (each withdrawal forgoes suffix[t + 1])."""
+    suffix = suffix_growth(returns)
+    return float(initial * suffix[0] - annual_withdrawal * (suffix[1:].sum() + 1)) if len(suffix) else initial
 
 
 # Test with user's scenario
@@ -18,48 +18,61 @@ Let's see what ACTUALLY happens in 2000-2024...
 
 import sys
 import os
+from functools import lru_cache
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
+from backend.services.investment_simulator import stock_balance_path, first_year
+from backend.services.treasury_curve import interpolate_treasury_rate
+
+
+# Event codes stored in year_by_year['event']; EVENT_NAMES[code] is the label
+EVENT_NONE = 0
+EVENT_BAILOUT = 1
+EVENT_PAID_OFF = 2
+EVENT_SAFETY_NET = 3
+EVENT_FAILED = 4
+EVENT_NAMES = (
+    "",
+    "🚨 BAILOUT",
+    "✅ PAID OFF",
+    "🛡️ SAFETY NET",
+    "❌ FAILED",
+)
+
+YEAR_DTYPE = np.dtype([
+    ('year', 'i4'),
+    ('return', 'f8'),
+    ('stock_balance', 'f8'),
+    ('reserve_balance', 'f8'),
+    ('remaining_mortgage', 'f8'),
+    ('cumulative_return', 'f8'),
+    ('event', 'u1'),
+])
+
+
+@lru_cache(maxsize=None)
+def _ladder_discount_sum(rate_curve: tuple, num_years: int) -> float:
+    """
+    Present value of $1 paid at the end of each of the next num_years years.
 
-
-def interpolate_treasury_rate(year: int, rate_points: dict) -> float:
-    """Interpolate treasury rate."""
-    years = sorted(rate_points.keys())
-    if year in rate_points:
-        return rate_points[year]
-
-    lower_year = None
-    upper_year = None
-    for y in years:
-        if y < year:
-            lower_year = y
-        elif y > year and upper_year is None:
-            upper_year = y
-            break
-
-    if lower_year is None:
-        return rate_points[years[0]]
-    if upper_year is None:
-        return rate_points[years[-1]]
-
-    lower_rate = rate_points[lower_year]
-    upper_rate = rate_points[upper_year]
-    return lower_rate + (year - lower_year) * (upper_rate - lower_rate) / (upper_year - lower_year)
+    Memoized on the (year, rate) pairs of the curve - the ladder cost only
+    depends on how many rungs it has, not on where they sit in the horizon.
+    """
+    years_from_now = np.arange(1, num_years + 1)
+    rates = interpolate_treasury_rate(years_from_now, dict(rate_curve)) / 100.0
+    return float(np.sum(1 / (1 + rates) ** years_from_now))
 
 
 def calculate_treasury_cost(annual_payment: float, start_year: int, end_year: int, treasury_rates: dict) -> float:
     """Calculate cost of treasury ladder for years [start_year, end_year]."""
-    total_cost = 0
-    for year in range(start_year, end_year + 1):
-        # Years from NOW
-        years_from_now = year - start_year + 1
-        rate = interpolate_treasury_rate(years_from_now, treasury_rates) / 100.0
-        discount_factor = (1 + rate) ** years_from_now
-        cost_today = annual_payment / discount_factor
-        total_cost += cost_today
-    return total_cost
+    num_years = end_year - start_year + 1
+    if num_years <= 0:
+        return 0
+    return annual_payment * _ladder_discount_sum(tuple(sorted(treasury_rates.items())), num_years)
 
 
 def simulate_smart_hybrid(
@@ -76,168 +89,87 @@ def simulate_smart_hybrid(
     """
     Simulate the Smart Hybrid strategy.
 
-    Returns detailed year-by-year results.
+    Returns detailed year-by-year results: 'year_by_year' is a YEAR_DTYPE
+    structured array, one row per simulated year, with dollar columns rounded
+    to cents and the stopping year flagged in its 'event' column.
     """
-    stock_balance = initial_stock_investment
-    reserve_balance = reserve_amount
-    remaining_mortgage = initial_mortgage_balance
-    total_years = len(returns_sequence)
+    returns = np.asarray(returns_sequence, dtype=np.float64)
+    total_years = len(returns)
+    years = np.arange(1, total_years + 1)
 
     # Cost of safety net (years 23-25)
     safety_net_cost = calculate_treasury_cost(annual_payment, safety_net_start_year, total_years, treasury_rates)
 
     initial_committed = initial_stock_investment + safety_net_cost
 
-    year_by_year = []
-    bailed_out = False
-    bailout_year = None
-    additional_capital_used = 0
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        # Withdraw from stocks
-        stock_balance -= annual_payment
-        remaining_mortgage -= annual_payment
-
-        # Apply returns
-        stock_balance *= (1 + stock_return / 100.0)
-        reserve_balance *= 1.037  # Reserve earns 3.7%
-
-        # Calculate cumulative return
-        total_withdrawn = year * annual_payment
-        cumulative_return_pct = ((stock_balance + total_withdrawn) / initial_stock_investment - 1) * 100
-
-        # Check for bailout trigger
-        if (year <= bailout_check_years and
-            cumulative_return_pct < bailout_threshold and
-            not bailed_out):
-
-            # BAILOUT TRIGGERED!
-            bailed_out = True
-            bailout_year = year
-
-            # How much do we need to buy treasuries for remaining years?
-            treasury_cost_remaining = calculate_treasury_cost(
-                annual_payment,
-                year + 1,  # Next year
-                total_years,
-                treasury_rates
-            )
-
-            # Do we have enough in stock + reserve?
-            available = stock_balance + reserve_balance
-
-            if available >= treasury_cost_remaining:
-                # Yes! Use available funds
-                additional_capital_used = 0
-                leftover = available - treasury_cost_remaining
-            else:
-                # Need more capital
-                additional_capital_used = treasury_cost_remaining - available
-                leftover = 0
-
-            year_by_year.append({
-                'year': year,
-                'return': stock_return,
-                'stock_balance': round(stock_balance, 2),
-                'reserve_balance': round(reserve_balance, 2),
-                'remaining_mortgage': round(remaining_mortgage, 2),
-                'cumulative_return': round(cumulative_return_pct, 2),
-                'bailout_triggered': True,
-                'treasury_cost_remaining': round(treasury_cost_remaining, 2),
-                'available_funds': round(available, 2),
-                'additional_needed': round(additional_capital_used, 2)
-            })
-
-            break  # Exit simulation, treasuries take over
-
-        # Check for early payoff
-        if stock_balance >= remaining_mortgage:
-            year_by_year.append({
-                'year': year,
-                'return': stock_return,
-                'stock_balance': round(stock_balance, 2),
-                'reserve_balance': round(reserve_balance, 2),
-                'remaining_mortgage': round(remaining_mortgage, 2),
-                'cumulative_return': round(cumulative_return_pct, 2),
-                'paid_off_early': True
-            })
-
-            leftover_stocks = stock_balance - remaining_mortgage
-            # Can sell unused reserve and safety net
-            total_leftover = leftover_stocks + reserve_balance + safety_net_cost
-
-            return {
-                'success': True,
-                'paid_off_early': True,
-                'years_to_payoff': year,
-                'initial_committed': initial_committed,
-                'reserve_deployed': 0,
-                'additional_capital_needed': 0,
-                'total_capital_used': initial_committed - reserve_balance - safety_net_cost,
-                'leftover': total_leftover,
-                'year_by_year': year_by_year
-            }
-
-        # Check for failure (before safety net)
-        if stock_balance < 0 and year < safety_net_start_year:
-            year_by_year.append({
-                'year': year,
-                'return': stock_return,
-                'stock_balance': round(stock_balance, 2),
-                'reserve_balance': round(reserve_balance, 2),
-                'remaining_mortgage': round(remaining_mortgage, 2),
-                'cumulative_return': round(cumulative_return_pct, 2),
-                'failed': True
-            })
-
-            return {
-                'success': False,
-                'paid_off_early': False,
-                'years_to_payoff': year,
-                'initial_committed': initial_committed,
-                'reserve_deployed': 0,
-                'additional_capital_needed': float('inf'),
-                'total_capital_used': initial_committed,
-                'leftover': stock_balance,
-                'year_by_year': year_by_year
-            }
-
-        # Check if safety net kicks in
-        if year >= safety_net_start_year:
-            year_by_year.append({
-                'year': year,
-                'return': stock_return,
-                'stock_balance': round(stock_balance, 2),
-                'reserve_balance': round(reserve_balance, 2),
-                'remaining_mortgage': round(remaining_mortgage, 2),
-                'cumulative_return': round(cumulative_return_pct, 2),
-                'safety_net_active': True
-            })
-
-            return {
-                'success': True,
-                'paid_off_early': False,
-                'years_to_payoff': total_years,
-                'initial_committed': initial_committed,
-                'reserve_deployed': 0,
-                'additional_capital_needed': 0,
-                'total_capital_used': initial_committed,
-                'leftover': reserve_balance,
-                'safety_net_used': True,
-                'year_by_year': year_by_year
-            }
-
-        year_by_year.append({
-            'year': year,
-            'return': stock_return,
-            'stock_balance': round(stock_balance, 2),
-            'reserve_balance': round(reserve_balance, 2),
-            'remaining_mortgage': round(remaining_mortgage, 2),
-            'cumulative_return': round(cumulative_return_pct, 2)
-        })
-
-    # If bailed out
-    if bailed_out:
+    # Whole-horizon paths: stocks pay every year, the reserve earns 3.7%
+    stock_balances = stock_balance_path(returns, annual_payment, initial_stock_investment)
+    reserve_balances = np.cumprod(np.concatenate(([reserve_amount], np.full(total_years, 1.037))))[1:]
+    remaining_mortgages = initial_mortgage_balance - annual_payment * years
+
+    # Cumulative return, counting the payments withdrawn so far
+    cumulative_returns = ((stock_balances + years * annual_payment) / initial_stock_investment - 1) * 100
+
+    # The simulation stops at the first bailout, early payoff, failure before
+    # the safety net, or safety-net year - in that order within a year
+    bailout_year = first_year((years <= bailout_check_years) & (cumulative_returns < bailout_threshold))
+    payoff_year = first_year(stock_balances >= remaining_mortgages)
+    failure_year = first_year((stock_balances < 0) & (years < safety_net_start_year))
+    safety_year = first_year(years >= safety_net_start_year)
+    decided = [y for y in (bailout_year, payoff_year, failure_year, safety_year) if y]
+    year = min(decided) if decided else 0
+
+    simulated_years = year or total_years
+    year_by_year = np.zeros(simulated_years, dtype=YEAR_DTYPE)
+    year_by_year['year'] = years[:simulated_years]
+    year_by_year['return'] = returns[:simulated_years]
+    year_by_year['stock_balance'] = np.round(stock_balances[:simulated_years], 2)
+    year_by_year['reserve_balance'] = np.round(reserve_balances[:simulated_years], 2)
+    year_by_year['remaining_mortgage'] = np.round(remaining_mortgages[:simulated_years], 2)
+    year_by_year['cumulative_return'] = np.round(cumulative_returns[:simulated_years], 2)
+
+    if not year:
+        # Completed without bailout or payoff
+        stock_balance = float(stock_balances[-1]) if total_years else initial_stock_investment
+        reserve_balance = float(reserve_balances[-1]) if total_years else reserve_amount
+        return {
+            'success': stock_balance >= 0,
+            'paid_off_early': False,
+            'years_to_payoff': total_years,
+            'initial_committed': initial_committed,
+            'reserve_deployed': 0,
+            'additional_capital_needed': 0,
+            'total_capital_used': initial_committed,
+            'leftover': stock_balance + reserve_balance,
+            'year_by_year': year_by_year
+        }
+
+    stock_balance = float(stock_balances[year - 1])
+    reserve_balance = float(reserve_balances[year - 1])
+    remaining_mortgage = float(remaining_mortgages[year - 1])
+    event = year_by_year[year - 1]
+
+    if year == bailout_year:
+        # BAILOUT TRIGGERED! Buy treasuries for the remaining years
+        treasury_cost_remaining = calculate_treasury_cost(
+            annual_payment,
+            year + 1,  # Next year
+            total_years,
+            treasury_rates
+        )
+
+        # Do we have enough in stock + reserve?
+        available = stock_balance + reserve_balance
+
+        if available >= treasury_cost_remaining:
+            # Yes! Use available funds
+            additional_capital_used = 0
+        else:
+            # Need more capital
+            additional_capital_used = treasury_cost_remaining - available
+
+        event['event'] = EVENT_BAILOUT
+
         return {
             'success': True,
             'paid_off_early': False,
@@ -248,20 +180,60 @@ def simulate_smart_hybrid(
             'total_capital_used': initial_committed + additional_capital_used,
             'leftover': 0,
             'bailed_out': True,
-            'bailout_year': bailout_year,
+            'bailout_year': year,
+            'treasury_cost_remaining': round(treasury_cost_remaining, 2),
+            'available_funds': round(available, 2),
+            'additional_needed': round(additional_capital_used, 2),
+            'year_by_year': year_by_year
+        }
+
+    if year == payoff_year:
+        event['event'] = EVENT_PAID_OFF
+
+        leftover_stocks = stock_balance - remaining_mortgage
+        # Can sell unused reserve and safety net
+        total_leftover = leftover_stocks + reserve_balance + safety_net_cost
+
+        return {
+            'success': True,
+            'paid_off_early': True,
+            'years_to_payoff': year,
+            'initial_committed': initial_committed,
+            'reserve_deployed': 0,
+            'additional_capital_needed': 0,
+            'total_capital_used': initial_committed - reserve_balance - safety_net_cost,
+            'leftover': total_leftover,
             'year_by_year': year_by_year
         }
 
-    # Completed without bailout or payoff
+    if year == failure_year:
+        event['event'] = EVENT_FAILED
+
+        return {
+            'success': False,
+            'paid_off_early': False,
+            'years_to_payoff': year,
+            'initial_committed': initial_committed,
+            'reserve_deployed': 0,
+            'additional_capital_needed': float('inf'),
+            'total_capital_used': initial_committed,
+            'leftover': stock_balance,
+            'year_by_year': year_by_year
+        }
+
+    # Safety net kicks in
+    event['event'] = EVENT_SAFETY_NET
+
     return {
-        'success': stock_balance >= 0,
+        'success': True,
         'paid_off_early': False,
         'years_to_payoff': total_years,
         'initial_committed': initial_committed,
         'reserve_deployed': 0,
         'additional_capital_needed': 0,
         'total_capital_used': initial_committed,
-        'leftover': stock_balance + reserve_balance,
+        'leftover': reserve_balance,
+        'safety_net_used': True,
         'year_by_year': year_by_year
     }
 
@@ -274,7 +246,7 @@ def main():
 
     # Setup
     loader = SP500DataLoader()
-    returns_2000 = loader.get_returns(2000, 2024)
+    returns_2000 = loader.get_returns_array(2000, 2024)
 
     mortgage_balance = 500000
     mortgage_rate = 3.0
@@ -349,37 +321,32 @@ def main():
     print("YEAR-BY-YEAR BREAKDOWN")
     print("=" * 90)
     print()
-    print("Year | Actual | Return  | Stock Bal | Reserve Bal | Total   | Mortgage | Cum Return | Event")
-    print("-----|--------|---------|-----------|-------------|---------|----------|------------|-------")
+    rows = [
+        "Year | Actual | Return  | Stock Bal | Reserve Bal | Total   | Mortgage | Cum Return | Event",
+        "-----|--------|---------|-----------|-------------|---------|----------|------------|-------",
+    ]
 
     for y in result['year_by_year'][:10]:
         actual_year = 2000 + y['year'] - 1
         total_bal = y['stock_balance'] + y['reserve_balance']
 
-        event = ""
-        if y.get('bailout_triggered'):
-            event = "🚨 BAILOUT"
-        elif y.get('paid_off_early'):
-            event = "✅ PAID OFF"
-        elif y.get('safety_net_active'):
-            event = "🛡️ SAFETY NET"
-        elif y.get('failed'):
-            event = "❌ FAILED"
+        event = EVENT_NAMES[y['event']]
 
-        print(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | ${y['stock_balance']:>8,.0f} | "
-              f"${y['reserve_balance']:>10,.0f} | ${total_bal:>6,.0f} | ${y['remaining_mortgage']:>7,.0f} | "
-              f"{y['cumulative_return']:>+9.2f}% | {event}")
+        rows.append(f"{y['year']:4d} | {actual_year} | {y['return']:>+6.2f}% | ${y['stock_balance']:>8,.0f} | "
+                    f"${y['reserve_balance']:>10,.0f} | ${total_bal:>6,.0f} | ${y['remaining_mortgage']:>7,.0f} | "
+                    f"{y['cumulative_return']:>+9.2f}% | {event}")
 
     if len(result['year_by_year']) > 10:
-        print("...")
+        rows.append("...")
+
+    sys.stdout.write("\n".join(rows) + "\n")
 
     if result.get('bailout_triggered'):
-        last = result['year_by_year'][-1]
         print()
         print(f"Bailout Details (Year {result['bailout_year']}):")
-        print(f"  Treasury cost for remaining years: ${last['treasury_cost_remaining']:,.2f}")
-        print(f"  Available funds (stocks + reserve): ${last['available_funds']:,.2f}")
-        print(f"  Additional capital needed: ${last['additional_needed']:,.2f}")
+        print(f"  Treasury cost for remaining years: ${result['treasury_cost_remaining']:,.2f}")
+        print(f"  Available funds (stocks + reserve): ${result['available_funds']:,.2f}")
+        print(f"  Additional capital needed: ${result['additional_needed']:,.2f}")
 
     print()
     print("=" * 90)
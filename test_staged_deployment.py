@@ -14,9 +14,12 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
-from typing import List, Dict
+from backend.services.investment_simulator import stock_balance_path, first_year
+from typing import List, Dict, Tuple
 
 
 def simulate_all_stocks(
@@ -26,123 +29,138 @@ def simulate_all_stocks(
     initial_mortgage_balance: float
 ) -> Dict:
     """Simple all-stocks strategy."""
-    balance = initial_amount
-    remaining_mortgage = initial_mortgage_balance
-
-    year_by_year = []
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        balance -= annual_payment
-        remaining_mortgage -= annual_payment
-        balance *= (1 + stock_return / 100.0)
-
-        year_by_year.append({
-            'year': year,
-            'balance': balance,
-            'remaining_mortgage': remaining_mortgage
-        })
+    total_years = len(returns_sequence)
+    balances = stock_balance_path(returns_sequence, annual_payment, initial_amount)
+    remaining_mortgages = initial_mortgage_balance - annual_payment * np.arange(1, total_years + 1)
+
+    # Stops at the first early payoff or failure (payoff wins a tie)
+    payoff_year = first_year(balances >= remaining_mortgages)
+    failure_year = first_year(balances < 0)
+    decided = [y for y in (payoff_year, failure_year) if y]
+    year = min(decided) if decided else 0
+
+    if year and year == payoff_year:
+        # Early payoff
+        leftover = float(balances[year - 1] - remaining_mortgages[year - 1])
+        return {
+            'success': True,
+            'years_to_payoff': year,
+            'leftover': leftover,
+            'capital_deployed': initial_amount
+        }
 
-        # Early payoff?
-        if balance >= remaining_mortgage:
-            leftover = balance - remaining_mortgage
-            return {
-                'success': True,
-                'years_to_payoff': year,
-                'leftover': leftover,
-                'capital_deployed': initial_amount,
-                'year_by_year': year_by_year
-            }
-
-        # Failure?
-        if balance < 0:
-            return {
-                'success': False,
-                'years_to_payoff': year,
-                'leftover': balance,
-                'capital_deployed': initial_amount,
-                'year_by_year': year_by_year
-            }
+    if year:
+        # Failure
+        return {
+            'success': False,
+            'years_to_payoff': year,
+            'leftover': float(balances[year - 1]),
+            'capital_deployed': initial_amount
+        }
 
+    balance = float(balances[-1]) if total_years else initial_amount
     return {
         'success': balance >= 0,
-        'years_to_payoff': len(returns_sequence),
+        'years_to_payoff': total_years,
         'leftover': balance,
-        'capital_deployed': initial_amount,
-        'year_by_year': year_by_year
+        'capital_deployed': initial_amount
     }
 
 
-def simulate_smart_withdrawal(
+def _smart_withdrawal_outcome(
+    market_down: List[bool],
+    growth: List[float],
     initial_stock: float,
     initial_cash: float,
-    returns_sequence: List[float],
     annual_payment: float,
     initial_mortgage_balance: float,
     protected_base: float = 100000
-) -> Dict:
-    """Smart withdrawal with stock/cash allocation."""
+) -> Tuple[bool, int, float]:
+    """
+    Smart withdrawal loop reduced to the outcome.
+
+    Takes the per-year market-down flags and growth factors precomputed by
+    the caller.
+
+    Returns:
+        (success, years_to_payoff, leftover)
+    """
     stock_balance = initial_stock
     cash_balance = initial_cash
     remaining_mortgage = initial_mortgage_balance
+    total_balance = stock_balance + cash_balance
 
-    year_by_year = []
-
-    for year, stock_return in enumerate(returns_sequence, start=1):
-        # Smart withdrawal logic
-        if stock_return < 0:
-            # Market DOWN: Use cash
-            if cash_balance >= annual_payment:
-                cash_balance -= annual_payment
-            else:
-                stock_balance -= annual_payment
+    for year, (down, g) in enumerate(zip(market_down, growth), start=1):
+        # Cash pays when the market is down or stocks are at the base
+        if cash_balance >= annual_payment and (down or stock_balance <= protected_base):
+            cash_balance -= annual_payment
         else:
-            # Market UP: Use stocks if above base
-            if stock_balance > protected_base:
-                stock_balance -= annual_payment
-            elif cash_balance >= annual_payment:
-                cash_balance -= annual_payment
-            else:
-                stock_balance -= annual_payment
-
-        # Apply returns
-        stock_balance *= (1 + stock_return / 100.0)
+            stock_balance -= annual_payment
+
+        stock_balance *= g
         cash_balance *= 1.037  # Cash earns 3.7%
         remaining_mortgage -= annual_payment
 
         total_balance = stock_balance + cash_balance
 
-        year_by_year.append({
-            'year': year,
-            'stock_balance': stock_balance,
-            'cash_balance': cash_balance,
-            'total_balance': total_balance,
-            'remaining_mortgage': remaining_mortgage
-        })
-
-        # Early payoff?
         if total_balance >= remaining_mortgage:
-            leftover = total_balance - remaining_mortgage
-            return {
-                'success': True,
-                'years_to_payoff': year,
-                'leftover': leftover,
-                'year_by_year': year_by_year
-            }
-
-        # Failure?
+            return True, year, total_balance - remaining_mortgage
         if total_balance < 0:
-            return {
-                'success': False,
-                'years_to_payoff': year,
-                'leftover': total_balance,
-                'year_by_year': year_by_year
-            }
+            return False, year, total_balance
+
+    return total_balance >= 0, len(growth), total_balance
+
 
+def simulate_all_stocks_windows(
+    initial_amount: float,
+    returns_matrix: np.ndarray,
+    annual_payment: float,
+    initial_mortgage_balance: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    simulate_all_stocks for every row of returns_matrix at once.
+
+    Returns:
+        (success, years_to_payoff, leftover) arrays, one entry per row
+    """
+    balances = stock_balance_path(returns_matrix, annual_payment, initial_amount)
+    total_years = balances.shape[1]
+    remaining_mortgages = initial_mortgage_balance - annual_payment * np.arange(1, total_years + 1)
+
+    # Each row stops at its first early payoff or failure (payoff wins a
+    # tie); rows that never stop run to the last year
+    paid_off = balances >= remaining_mortgages
+    stopped = paid_off | (balances < 0)
+    stops = stopped.any(axis=1)
+    last = np.where(stops, stopped.argmax(axis=1), total_years - 1)
+
+    rows = np.arange(len(balances))
+    final_balances = balances[rows, last]
+    paid_off_at_stop = stops & paid_off[rows, last]
+
+    success = np.where(stops, paid_off_at_stop, final_balances >= 0)
+    leftover = np.where(paid_off_at_stop, final_balances - remaining_mortgages[last], final_balances)
+    return success, last + 1, leftover
+
+
+def simulate_smart_withdrawal(
+    initial_stock: float,
+    initial_cash: float,
+    returns_sequence: List[float],
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    protected_base: float = 100000
+) -> Dict:
+    """Smart withdrawal with stock/cash allocation."""
+    returns_arr = np.asarray(returns_sequence, dtype=np.float64)
+    success, years, leftover = _smart_withdrawal_outcome(
+        (returns_arr < 0).tolist(), (1 + returns_arr / 100.0).tolist(),
+        initial_stock, initial_cash, annual_payment, initial_mortgage_balance, protected_base
+    )
     return {
-        'success': total_balance >= 0,
-        'years_to_payoff': len(returns_sequence),
-        'leftover': total_balance,
-        'year_by_year': year_by_year
+        'success': success,
+        'years_to_payoff': years,
+        'leftover': leftover
     }
 
 
@@ -154,13 +172,17 @@ def simulate_staged_deployment(
     reserve_rate: float,
     returns_sequence: List[float],
     annual_payment: float,
-    initial_mortgage_balance: float
+    initial_mortgage_balance: float,
+    fallback_result: Dict = None
 ) -> Dict:
     """
     Staged deployment strategy:
     - Start with $300K deployed ($240K stocks + $60K cash)
     - Keep $200K in reserve earning reserve_rate
     - Add from reserve only if needed
+
+    fallback_result is the $500K all-stocks result for the same returns, if
+    the caller already has it; otherwise it is simulated when needed.
     """
     # Run initial deployment
     result = simulate_smart_withdrawal(
@@ -199,7 +221,7 @@ def simulate_staged_deployment(
         # For now, let's say we deploy all $500K from the start if initial fails
 
         # Re-simulate with full $500K
-        full_result = simulate_all_stocks(
+        full_result = fallback_result or simulate_all_stocks(
             500000,
             returns_sequence,
             annual_payment,
@@ -234,20 +256,19 @@ def main():
     print()
 
     # Get all historical windows
-    all_windows = []
-    for start_year in range(1926, 2001):
-        end_year = start_year + 24
-        if end_year <= 2025:
-            try:
-                returns = loader.get_returns(start_year, end_year)
-                if len(returns) == 25:
-                    all_windows.append({
-                        'period': f"{start_year}-{end_year}",
-                        'start_year': start_year,
-                        'returns': returns
-                    })
-            except:
-                pass
+    data_start, data_end = loader.get_available_years()
+    start_years = np.arange(max(1926, data_start), min(2000, data_end - 24) + 1)
+    window_returns = np.lib.stride_tricks.sliding_window_view(
+        loader.get_returns_array(data_start, data_end), 25
+    )[start_years - data_start]
+    all_windows = [
+        {
+            'period': f"{start_year}-{start_year + 24}",
+            'start_year': start_year,
+            'returns': returns
+        }
+        for start_year, returns in zip(start_years.tolist(), window_returns)
+    ]
 
     print(f"Testing across {len(all_windows)} historical 25-year periods")
     print()
@@ -261,17 +282,23 @@ def main():
     results_500k = []
     results_staged = []
 
-    for window in all_windows:
-        # Strategy 1: $500K all-stocks upfront
-        result_500k = simulate_all_stocks(
-            500000, window['returns'], annual_payment, mortgage_balance
-        )
+    # Strategy 1: $500K all-stocks upfront, every window in one pass
+    all_stocks_success, all_stocks_years, all_stocks_leftover = simulate_all_stocks_windows(
+        500000, window_returns, annual_payment, mortgage_balance
+    )
+    for window, success, years, leftover in zip(
+        all_windows, all_stocks_success.tolist(), all_stocks_years.tolist(), all_stocks_leftover.tolist()
+    ):
         results_500k.append({
             'period': window['period'],
-            **result_500k
+            'success': success,
+            'years_to_payoff': years,
+            'leftover': leftover,
+            'capital_deployed': 500000
         })
 
-        # Strategy 2: Staged deployment
+    for window, result_500k in zip(all_windows, results_500k):
+        # Strategy 2: Staged deployment (reuses Strategy 1 if the reserve is needed)
         result_staged = simulate_staged_deployment(
             initial_deployed=300000,
             initial_deployed_stocks=240000,
@@ -280,7 +307,8 @@ def main():
             reserve_rate=1.0,  # Conservative 1% on reserve
             returns_sequence=window['returns'],
             annual_payment=annual_payment,
-            initial_mortgage_balance=mortgage_balance
+            initial_mortgage_balance=mortgage_balance,
+            fallback_result=result_500k
         )
         results_staged.append({
             'period': window['period'],
@@ -288,35 +316,40 @@ def main():
         })
 
     # Calculate statistics
-    from statistics import mean, median
-
     # $500K all-stocks
-    leftover_500k = [r['leftover'] for r in results_500k if r['success']]
-    years_500k = [r['years_to_payoff'] for r in results_500k if r['success']]
-    success_500k = sum(1 for r in results_500k if r['success'])
+    leftover_500k = all_stocks_leftover[all_stocks_success]
+    years_500k = all_stocks_years[all_stocks_success]
+    success_500k = int(np.count_nonzero(all_stocks_success))
 
     # Staged deployment
-    leftover_staged = [r['leftover'] for r in results_staged if r['success']]
-    years_staged = [r['years_to_payoff'] for r in results_staged if r['success']]
-    success_staged = sum(1 for r in results_staged if r['success'])
-    needed_reserve = sum(1 for r in results_staged if r.get('needed_reserve', False))
+    staged_success = np.fromiter((r['success'] for r in results_staged), dtype=bool, count=len(results_staged))
+    staged_leftover = np.fromiter((r['leftover'] for r in results_staged), dtype=np.float64, count=len(results_staged))
+    staged_years = np.fromiter((r['years_to_payoff'] for r in results_staged), dtype=int, count=len(results_staged))
+    staged_needed_reserve = np.fromiter(
+        (r.get('needed_reserve', False) for r in results_staged), dtype=bool, count=len(results_staged)
+    )
+
+    leftover_staged = staged_leftover[staged_success]
+    years_staged = staged_years[staged_success]
+    success_staged = int(np.count_nonzero(staged_success))
+    needed_reserve = int(np.count_nonzero(staged_needed_reserve))
 
     print("Strategy 1: $500K All-Stocks Upfront")
     print(f"  Success rate: {success_500k}/{len(results_500k)} ({success_500k/len(results_500k)*100:.1f}%)")
-    if leftover_500k:
-        print(f"  Average leftover: ${mean(leftover_500k):,.0f}")
-        print(f"  Median leftover: ${median(leftover_500k):,.0f}")
-        print(f"  Average years to payoff: {mean(years_500k):.1f}")
-        print(f"  Median years to payoff: {median(years_500k):.0f}")
+    if len(leftover_500k):
+        print(f"  Average leftover: ${np.mean(leftover_500k):,.0f}")
+        print(f"  Median leftover: ${np.median(leftover_500k):,.0f}")
+        print(f"  Average years to payoff: {np.mean(years_500k):.1f}")
+        print(f"  Median years to payoff: {np.median(years_500k):.0f}")
     print()
 
     print("Strategy 2: Staged Deployment ($300K initial + $200K reserve at 1%)")
     print(f"  Success rate: {success_staged}/{len(results_staged)} ({success_staged/len(results_staged)*100:.1f}%)")
-    if leftover_staged:
-        print(f"  Average leftover: ${mean(leftover_staged):,.0f}")
-        print(f"  Median leftover: ${median(leftover_staged):,.0f}")
-        print(f"  Average years to payoff: {mean(years_staged):.1f}")
-        print(f"  Median years to payoff: {median(years_staged):.0f}")
+    if len(leftover_staged):
+        print(f"  Average leftover: ${np.mean(leftover_staged):,.0f}")
+        print(f"  Median leftover: ${np.median(leftover_staged):,.0f}")
+        print(f"  Average years to payoff: {np.mean(years_staged):.1f}")
+        print(f"  Median years to payoff: {np.median(years_staged):.0f}")
     print(f"  Needed to tap reserve: {needed_reserve}/{len(results_staged)} ({needed_reserve/len(results_staged)*100:.1f}%)")
     print()
 
@@ -328,34 +361,33 @@ def main():
 
     # Calculate expected value
     # Staged: 70% don't need reserve, 30% do
-    reserve_not_needed = [r for r in results_staged if not r.get('needed_reserve', False)]
-    reserve_needed = [r for r in results_staged if r.get('needed_reserve', False)]
+    reserve_not_needed = len(results_staged) - needed_reserve
 
     if reserve_not_needed:
-        avg_leftover_no_reserve = mean([r['leftover'] for r in reserve_not_needed if r['success']])
-        print(f"When reserve NOT needed ({len(reserve_not_needed)} scenarios):")
+        avg_leftover_no_reserve = float(np.mean(staged_leftover[~staged_needed_reserve & staged_success]))
+        print(f"When reserve NOT needed ({reserve_not_needed} scenarios):")
         print(f"  Average total leftover: ${avg_leftover_no_reserve:,.0f}")
         print(f"  (This includes $200K reserve that grew at 1%)")
         print()
 
-    if reserve_needed:
-        avg_leftover_with_reserve = mean([r['leftover'] for r in reserve_needed if r['success']])
-        print(f"When reserve WAS needed ({len(reserve_needed)} scenarios):")
+    if needed_reserve:
+        avg_leftover_with_reserve = float(np.mean(staged_leftover[staged_needed_reserve & staged_success]))
+        print(f"When reserve WAS needed ({needed_reserve} scenarios):")
         print(f"  Average leftover: ${avg_leftover_with_reserve:,.0f}")
         print(f"  (Used all $500K)")
         print()
 
     # Expected value calculation
-    pct_no_reserve = len(reserve_not_needed) / len(results_staged) * 100
-    pct_with_reserve = len(reserve_needed) / len(results_staged) * 100
+    pct_no_reserve = reserve_not_needed / len(results_staged) * 100
+    pct_with_reserve = needed_reserve / len(results_staged) * 100
 
     print(f"Expected Value Analysis:")
     print(f"  {pct_no_reserve:.1f}% scenarios: Keep ~$200K+ extra (didn't need reserve)")
     print(f"  {pct_with_reserve:.1f}% scenarios: Use all $500K (same as upfront strategy)")
     print()
 
-    if leftover_500k and leftover_staged:
-        diff = mean(leftover_staged) - mean(leftover_500k)
+    if len(leftover_500k) and len(leftover_staged):
+        diff = float(np.mean(leftover_staged) - np.mean(leftover_500k))
         print(f"Average leftover difference: ${diff:,.0f}")
         if diff > 0:
             print(f"  ✅ Staged deployment wins by ${diff:,.0f} on average!")
@@ -371,8 +403,8 @@ def main():
     print()
 
     # Best case for staged
-    best_staged = max([r for r in results_staged if r['success']],
-                     key=lambda x: x['leftover'])
+    successful = np.flatnonzero(staged_success)
+    best_staged = results_staged[successful[np.argmax(staged_leftover[successful])]]
     print(f"Best case for staged deployment: {best_staged['period']}")
     print(f"  Leftover: ${best_staged['leftover']:,.0f}")
     print(f"  Years: {best_staged['years_to_payoff']}")
@@ -380,17 +412,18 @@ def main():
     print()
 
     # Worst case where reserve was needed
-    worst_needed_reserve = [r for r in results_staged if r.get('needed_reserve', False) and r['success']]
-    if worst_needed_reserve:
-        worst = min(worst_needed_reserve, key=lambda x: x['leftover'])
+    worst_needed_reserve = np.flatnonzero(staged_needed_reserve & staged_success)
+    if len(worst_needed_reserve):
+        worst = results_staged[worst_needed_reserve[np.argmin(staged_leftover[worst_needed_reserve])]]
         print(f"Worst case that needed reserve: {worst['period']}")
         print(f"  Leftover: ${worst['leftover']:,.0f}")
         print(f"  Years: {worst['years_to_payoff']}")
         print()
 
     # Compare 2000-2024
-    staged_2000 = [r for r in results_staged if r['period'] == '2000-2024'][0]
-    stock_2000 = [r for r in results_500k if r['period'] == '2000-2024'][0]
+    index_2000 = np.flatnonzero(start_years == 2000)[0]
+    staged_2000 = results_staged[index_2000]
+    stock_2000 = results_500k[index_2000]
 
     print(f"2000-2024 (worst case) comparison:")
     print(f"  $500K upfront: {stock_2000['years_to_payoff']} years, ${stock_2000['leftover']:,.0f} leftover")
@@ -407,13 +440,13 @@ def main():
     print(f"With {pct_no_reserve:.0f}% chance of NOT needing the $200K reserve:")
     print()
     print(f"Expected outcome with STAGED approach:")
-    if reserve_not_needed and reserve_needed:
-        expected = (len(reserve_not_needed) / len(results_staged) * avg_leftover_no_reserve +
-                   len(reserve_needed) / len(results_staged) * avg_leftover_with_reserve)
+    if reserve_not_needed and needed_reserve:
+        expected = (reserve_not_needed / len(results_staged) * avg_leftover_no_reserve +
+                   needed_reserve / len(results_staged) * avg_leftover_with_reserve)
         print(f"  Expected leftover: ${expected:,.0f}")
         print()
 
-        upfront_expected = mean(leftover_500k) if leftover_500k else 0
+        upfront_expected = float(np.mean(leftover_500k)) if len(leftover_500k) else 0
         print(f"Expected outcome with $500K UPFRONT:")
         print(f"  Expected leftover: ${upfront_expected:,.0f}")
         print()
@@ -24,6 +24,8 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.models.mortgage_calculator import calculate_annual_payment
 from typing import Tuple
 
@@ -43,24 +45,23 @@ def calculate_treasury_ladder_cost(
     Returns:
         (total_cost, year_by_year_details)
     """
-    year_by_year = []
-    total_cost = 0
-
-    for year in range(1, years + 1):
-        # Cost to buy a bond that pays annual_payment in year N
-        discount_factor = (1 + treasury_rate) ** year
-        cost_today = annual_payment / discount_factor
-
-        total_cost += cost_today
+    # Cost to buy a bond that pays annual_payment in year N, for every N
+    discount_factors = np.power(1 + treasury_rate, np.arange(1, years + 1))
+    costs_today = annual_payment / discount_factors
 
-        year_by_year.append({
+    year_by_year = [
+        {
             'year': year,
             'payment_needed': annual_payment,
             'cost_today': round(cost_today, 2),
             'discount_factor': round(discount_factor, 4)
-        })
+        }
+        for year, cost_today, discount_factor in zip(
+            range(1, years + 1), costs_today.tolist(), discount_factors.tolist()
+        )
+    ]
 
-    return round(total_cost, 2), year_by_year
+    return round(float(costs_today.sum()), 2), year_by_year
 
 
 def calculate_pv_annuity(payment: float, rate: float, periods: int) -> float:
@@ -71,8 +72,7 @@ def calculate_pv_annuity(payment: float, rate: float, periods: int) -> float:
     if rate == 0:
         return payment * periods
 
-    pv = payment * ((1 - (1 / (1 + rate) ** periods)) / rate)
-    return round(pv, 2)
+    return payment * (1 - (1 + rate) ** -periods) / rate
 
 
 def compare_treasury_vs_mortgage():
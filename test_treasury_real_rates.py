@@ -19,48 +19,19 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from backend.models.mortgage_calculator import calculate_annual_payment
-
-
-def interpolate_rate(year: int, rate_points: dict) -> float:
-    """
-    Interpolate treasury rate for a given year using linear interpolation.
-
-    rate_points: {maturity_year: rate}
-    """
-    years = sorted(rate_points.keys())
-
-    # If exact match, return it
-    if year in rate_points:
-        return rate_points[year]
-
-    # Find surrounding points
-    lower_year = None
-    upper_year = None
-
-    for y in years:
-        if y < year:
-            lower_year = y
-        elif y > year and upper_year is None:
-            upper_year = y
-            break
+import numpy as np
 
-    # If year is below all points, use lowest rate
-    if lower_year is None:
-        return rate_points[years[0]]
-
-    # If year is above all points, use highest rate
-    if upper_year is None:
-        return rate_points[years[-1]]
-
-    # Linear interpolation
-    lower_rate = rate_points[lower_year]
-    upper_rate = rate_points[upper_year]
+from backend.models.mortgage_calculator import calculate_annual_payment
+from backend.services.treasury_curve import interpolate_treasury_rate
 
-    # y = y1 + (x - x1) * (y2 - y1) / (x2 - x1)
-    interpolated = lower_rate + (year - lower_year) * (upper_rate - lower_rate) / (upper_year - lower_year)
 
-    return interpolated
+LADDER_DTYPE = np.dtype([
+    ('year', 'i4'),
+    ('payment_needed', 'f8'),
+    ('treasury_rate', 'f8'),
+    ('cost_today', 'f8'),
+    ('discount_factor', 'f8'),
+])
 
 
 def calculate_treasury_ladder_actual_rates(
@@ -77,35 +48,27 @@ def calculate_treasury_ladder_actual_rates(
         rate_points: {maturity_year: rate_percent}
 
     Returns:
-        (total_cost, year_by_year_details, weighted_avg_rate)
+        (total_cost, year_by_year_details, weighted_avg_rate), with the
+        details as a LADDER_DTYPE structured array (one row per rung)
     """
-    year_by_year = []
-    total_cost = 0
-    total_payment = 0
-
-    for year in range(1, years + 1):
-        # Get interpolated rate for this maturity
-        rate_percent = interpolate_rate(year, rate_points)
-        rate_decimal = rate_percent / 100.0
-
-        # Calculate present value of this payment
-        # PV = FV / (1 + r)^n
-        discount_factor = (1 + rate_decimal) ** year
-        cost_today = annual_payment / discount_factor
-
-        total_cost += cost_today
-        total_payment += annual_payment
-
-        year_by_year.append({
-            'year': year,
-            'payment_needed': annual_payment,
-            'treasury_rate': rate_percent,
-            'cost_today': round(cost_today, 2),
-            'discount_factor': round(discount_factor, 4)
-        })
-
-    # Calculate weighted average rate
-    weighted_avg_rate = sum(y['treasury_rate'] * y['cost_today'] for y in year_by_year) / total_cost
+    years_arr = np.arange(1, years + 1)
+
+    # Interpolated rate for every maturity, then PV = FV / (1 + r)^n, with
+    # (1 + r)^n taken as exp(n * log1p(r)) to stay on the exp/log1p ufuncs
+    rates = interpolate_treasury_rate(years_arr, rate_points)
+    discount_factors = np.exp(years_arr * np.log1p(rates / 100.0))
+    costs_today = annual_payment / discount_factors
+    total_cost = float(costs_today.sum())
+
+    year_by_year = np.empty(years, dtype=LADDER_DTYPE)
+    year_by_year['year'] = years_arr
+    year_by_year['payment_needed'] = annual_payment
+    year_by_year['treasury_rate'] = rates
+    year_by_year['cost_today'] = np.round(costs_today, 2)
+    year_by_year['discount_factor'] = np.round(discount_factors, 4)
+
+    # Calculate weighted average rate (weights are the cent-rounded costs)
+    weighted_avg_rate = float(np.dot(rates, year_by_year['cost_today'])) / total_cost
 
     return round(total_cost, 2), year_by_year, round(weighted_avg_rate, 2)
 
@@ -171,24 +134,31 @@ def main():
     # Show first few years and last few years
     print("Bond Purchase Details:")
     print()
-    print("Year | Payment    | Treasury | Cost Today | Discount  | Interest Earned")
-    print("     | Needed     | Rate     |            | Factor    | vs Mortgage")
-    print("-----|------------|----------|------------|-----------|----------------")
+    # Interest earned vs the mortgage for every rung, in one pass
+    interest_advantages = (
+        (year_by_year['treasury_rate'] - mortgage_rate) / 100
+        * year_by_year['cost_today'] * year_by_year['year']
+    )
+
+    rows = [
+        "Year | Payment    | Treasury | Cost Today | Discount  | Interest Earned",
+        "     | Needed     | Rate     |            | Factor    | vs Mortgage",
+        "-----|------------|----------|------------|-----------|----------------",
+    ]
 
-    for i in range(min(10, len(year_by_year))):
-        y = year_by_year[i]
-        interest_advantage = (y['treasury_rate'] - mortgage_rate) / 100 * y['cost_today'] * y['year']
-        print(f"{y['year']:4d} | ${y['payment_needed']:>9,.0f} | {y['treasury_rate']:>6.2f}% | "
-              f"${y['cost_today']:>9,.0f} | {y['discount_factor']:>8.4f} | ${interest_advantage:>8,.0f}")
+    # Format every rung once; the table shows the first 10 and last 5
+    formatted = [
+        f"{y['year']:4d} | ${y['payment_needed']:>9,.0f} | {y['treasury_rate']:>6.2f}% | "
+        f"${y['cost_today']:>9,.0f} | {y['discount_factor']:>8.4f} | ${interest_advantage:>8,.0f}"
+        for y, interest_advantage in zip(year_by_year, interest_advantages)
+    ]
+    rows.extend(formatted[:10])
 
     if len(year_by_year) > 15:
-        print(" ... |     ...    |   ...    |     ...    |    ...    |      ...")
+        rows.append(" ... |     ...    |   ...    |     ...    |    ...    |      ...")
+        rows.extend(formatted[max(10, len(year_by_year) - 5):])
 
-        for i in range(max(10, len(year_by_year) - 5), len(year_by_year)):
-            y = year_by_year[i]
-            interest_advantage = (y['treasury_rate'] - mortgage_rate) / 100 * y['cost_today'] * y['year']
-            print(f"{y['year']:4d} | ${y['payment_needed']:>9,.0f} | {y['treasury_rate']:>6.2f}% | "
-                  f"${y['cost_today']:>9,.0f} | {y['discount_factor']:>8.4f} | ${interest_advantage:>8,.0f}")
+    sys.stdout.write("\n".join(rows) + "\n")
 
     print()
     print(f"TOTAL COST: ${total_cost:>67,}")
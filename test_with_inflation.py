@@ -2,9 +2,11 @@
 
 import json
 import sys
+import numpy as np
 sys.path.insert(0, '/Users/sachin/projects/finance-app')
 
 from backend.services.data_loader import SP500DataLoader
+from backend.services.investment_simulator import withdrawal_balance_path
 
 # Load data
 loader = SP500DataLoader()
@@ -21,6 +23,7 @@ withdrawal = 200_000
 inflation_rate = 3.5  # Historical average inflation ~3-3.5%
 
 total_withdrawn = 0
+rows = []
 
 for year_idx, annual_return in enumerate(returns_1950_1999, start=1):
     year = 1949 + year_idx
@@ -37,8 +40,10 @@ for year_idx, annual_return in enumerate(returns_1950_1999, start=1):
     balance = balance * (1 + annual_return / 100.0)
 
     if year_idx <= 5 or year_idx >= 46:
-        print(f"Year {year_idx} ({year}): Withdraw ${withdrawal:,.0f} → "
-              f"Return {annual_return:+.2f}% → Balance: ${balance:,.0f}")
+        rows.append(f"Year {year_idx} ({year}): Withdraw ${withdrawal:,.0f} → "
+                    f"Return {annual_return:+.2f}% → Balance: ${balance:,.0f}")
+
+sys.stdout.write("\n".join(rows) + "\n")
 
 print(f"\n" + "=" * 70)
 print(f"Final balance after 50 years: ${balance:,.0f}")
@@ -51,13 +56,10 @@ print(f"=" * 70)
 print(f"\n\nTrying different inflation rates:")
 print(f"=" * 70)
 
-for inflation in [3.0, 3.5, 4.0]:
-    balance = 5_000_000
-    withdrawal = 200_000
-
-    for year_idx, annual_return in enumerate(returns_1950_1999, start=1):
-        if year_idx > 1:
-            withdrawal = withdrawal * (1 + inflation / 100.0)
-        balance = (balance - withdrawal) * (1 + annual_return / 100.0)
+# One row per inflation rate, withdrawing 200,000 * (1 + inflation)^k in year k
+inflation_rates = [3.0, 3.5, 4.0]
+withdrawals = 200_000 * (1 + np.array(inflation_rates)[:, None] / 100.0) ** np.arange(len(returns_1950_1999))
+final_balances = withdrawal_balance_path(returns_1950_1999, withdrawals, 5_000_000)[:, -1]
 
+for inflation, balance in zip(inflation_rates, final_balances):
     print(f"Inflation {inflation}%: Final balance = ${balance/1_000_000:.1f}M")
@@ -4,9 +4,11 @@ Test if withdrawal timing (beginning vs end of year) explains the difference.
 
 import json
 import sys
+import numpy as np
 sys.path.insert(0, '/Users/sachin/projects/finance-app')
 
 from backend.services.data_loader import SP500DataLoader
+from backend.services.investment_simulator import withdrawal_balance_path
 
 loader = SP500DataLoader()
 
@@ -46,29 +48,16 @@ print("\n" + "=" * 80)
 print("Testing ALL periods with END-of-year withdrawals:")
 print("=" * 80)
 
-successes_end = 0
-failures_end = 0
+# Every 50-year window as one row, growing then withdrawing each year
+first_year, last_year = loader.get_available_years()
+start_years = np.arange(max(1948, first_year), min(2025 - 50, last_year - 49) + 1)
+windows = np.lib.stride_tricks.sliding_window_view(
+    loader.get_returns_array(first_year, last_year), 50
+)[start_years - first_year]
+final_balances = withdrawal_balance_path(windows, 200_000, 5_000_000, start_of_year=False)[:, -1]
 
-for start_year in range(1948, 2025 - 50 + 1):
-    end_year = start_year + 50 - 1
-
-    try:
-        returns = loader.get_returns(start_year, end_year)
-    except:
-        continue
-
-    if len(returns) != 50:
-        continue
-
-    balance = 5_000_000
-    for ret in returns:
-        balance *= (1 + ret / 100.0)  # Return first
-        balance -= 200_000  # Withdraw second
-
-    if balance >= 0:
-        successes_end += 1
-    else:
-        failures_end += 1
+successes_end = int(np.count_nonzero(final_balances >= 0))
+failures_end = len(final_balances) - successes_end
 
 total = successes_end + failures_end
 success_rate_end = (successes_end / total * 100) if total > 0 else 0
@@ -7,10 +7,92 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import numpy as np
+
 from backend.services.data_loader import SP500DataLoader
 from backend.models.mortgage_calculator import calculate_annual_payment
 
 
+CASH_GROWTH = 1.037  # Cash earns 3.7%
+
+# Withdrawal source codes returned by simulate_trace['source'];
+# SOURCE_MESSAGES[code] is the decision line
+SOURCE_FINISH_LINE = 0
+SOURCE_ABOVE_BASE = 1
+SOURCE_PROTECT_BASE = 2
+SOURCE_FORCED = 3
+SOURCE_MESSAGES = (
+    "Withdraw from STOCKS (near finish line)",
+    "Withdraw from STOCKS (above protected base)",
+    "Withdraw from CASH (protect base)",
+    "Withdraw from STOCKS (FORCED - no cash left)",
+)
+
+
+def simulate_trace(
+    returns,
+    initial_stock: float,
+    initial_cash: float,
+    annual_payment: float,
+    initial_mortgage_balance: float,
+    protected_base: float,
+    years: int
+):
+    """
+    Run the protected base strategy for `years` years without any output.
+
+    Returns a dict of arrays: 'stock', 'cash' and 'mortgage' hold the
+    start-of-year balances plus the final one (length years + 1),
+    'stock_after' and 'cash_after' the balances right after each
+    withdrawal, and 'source' the SOURCE_* code picked each year.
+    """
+    stock = np.empty(years + 1)
+    cash = np.empty(years + 1)
+    mortgage = np.empty(years + 1)
+    stock_after = np.empty(years)
+    cash_after = np.empty(years)
+    source = np.empty(years, dtype=np.int8)
+
+    stock_balance = initial_stock
+    cash_balance = initial_cash
+    remaining_mortgage = initial_mortgage_balance
+
+    for k in range(years):
+        stock[k], cash[k], mortgage[k] = stock_balance, cash_balance, remaining_mortgage
+
+        # The branch depends on the running balances, so this stays a scan
+        if remaining_mortgage <= stock_balance:
+            source[k] = SOURCE_FINISH_LINE
+            stock_balance -= annual_payment
+        elif stock_balance > protected_base:
+            source[k] = SOURCE_ABOVE_BASE
+            stock_balance -= annual_payment
+        elif cash_balance >= annual_payment:
+            source[k] = SOURCE_PROTECT_BASE
+            cash_balance -= annual_payment
+        else:
+            source[k] = SOURCE_FORCED
+            stock_balance -= annual_payment
+
+        stock_after[k], cash_after[k] = stock_balance, cash_balance
+
+        # Apply returns
+        stock_balance *= (1 + returns[k] / 100.0)
+        cash_balance *= CASH_GROWTH
+        remaining_mortgage -= annual_payment
+
+    stock[years], cash[years], mortgage[years] = stock_balance, cash_balance, remaining_mortgage
+
+    return {
+        'stock': stock,
+        'cash': cash,
+        'mortgage': mortgage,
+        'stock_after': stock_after,
+        'cash_after': cash_after,
+        'source': source
+    }
+
+
 def trace_first_10_years():
     """Show detailed calculations for first 10 years."""
 
@@ -25,7 +107,6 @@ def trace_first_10_years():
     # Initial
     stock_balance = 350000
     cash_balance = 100000
-    remaining_mortgage = mortgage_balance
     protected_base = 100000
 
     print("=" * 100)
@@ -41,76 +122,61 @@ def trace_first_10_years():
     print("=" * 100)
     print()
 
+    trace = simulate_trace(
+        returns_2000, stock_balance, cash_balance, annual_payment,
+        mortgage_balance, protected_base, years=10
+    )
+    stock, cash, mortgage = trace['stock'], trace['cash'], trace['mortgage']
+
+    lines = []
     for year in range(1, 11):
-        actual_year = 2000 + year - 1
-        stock_return = returns_2000[year - 1]
-
-        print(f"YEAR {year} ({actual_year}):")
-        print(f"  Market Return: {stock_return:+.2f}%")
-        print(f"  Start of Year:")
-        print(f"    Stocks: ${stock_balance:,.2f}")
-        print(f"    Cash:   ${cash_balance:,.2f}")
-        print(f"    Total:  ${stock_balance + cash_balance:,.2f}")
-        print(f"    Remaining Mortgage: ${remaining_mortgage:,.2f}")
-        print()
+        k = year - 1
+        actual_year = 2000 + k
+        stock_return = returns_2000[k]
+        source = trace['source'][k]
+
+        lines.append(f"YEAR {year} ({actual_year}):")
+        lines.append(f"  Market Return: {stock_return:+.2f}%")
+        lines.append(f"  Start of Year:")
+        lines.append(f"    Stocks: ${stock[k]:,.2f}")
+        lines.append(f"    Cash:   ${cash[k]:,.2f}")
+        lines.append(f"    Total:  ${stock[k] + cash[k]:,.2f}")
+        lines.append(f"    Remaining Mortgage: ${mortgage[k]:,.2f}")
+        lines.append("")
 
         # DECISION LOGIC
-        print(f"  Decision Logic:")
-        near_finish = remaining_mortgage <= stock_balance
-        above_base = stock_balance > protected_base
-        has_cash = cash_balance >= annual_payment
-
-        print(f"    - Near finish (mortgage <= stocks)? {near_finish}")
-        print(f"    - Stocks above base ($100K)? {above_base} (stocks: ${stock_balance:,.0f})")
-        print(f"    - Has cash for payment? {has_cash} (cash: ${cash_balance:,.0f})")
-
-        # Determine source
-        if near_finish:
-            source = "STOCKS (near finish)"
-            stock_balance -= annual_payment
-            print(f"    → Withdraw from STOCKS (near finish line)")
-        elif above_base:
-            source = "STOCKS (above base)"
-            stock_balance -= annual_payment
-            print(f"    → Withdraw from STOCKS (above protected base)")
-        elif has_cash:
-            source = "CASH (protect base)"
-            cash_balance -= annual_payment
-            print(f"    → Withdraw from CASH (protect base)")
-        else:
-            source = "STOCKS (forced, no cash)"
-            stock_balance -= annual_payment
-            print(f"    → Withdraw from STOCKS (FORCED - no cash left)")
-
-        print()
-        print(f"  After Withdrawal:")
-        print(f"    Stocks: ${stock_balance:,.2f}")
-        print(f"    Cash:   ${cash_balance:,.2f}")
-        print()
-
-        # Apply returns
-        stock_balance *= (1 + stock_return / 100.0)
-        cash_balance *= 1.037
-        remaining_mortgage -= annual_payment
-
-        print(f"  After Returns Applied:")
-        print(f"    Stocks: ${stock_balance:,.2f} (after {stock_return:+.2f}%)")
-        print(f"    Cash:   ${cash_balance:,.2f} (after +3.7%)")
-        print(f"    Total:  ${stock_balance + cash_balance:,.2f}")
-        print(f"    Remaining Mortgage: ${remaining_mortgage:,.2f}")
-        print()
+        lines.append(f"  Decision Logic:")
+        lines.append(f"    - Near finish (mortgage <= stocks)? {mortgage[k] <= stock[k]}")
+        lines.append(f"    - Stocks above base ($100K)? {stock[k] > protected_base} (stocks: ${stock[k]:,.0f})")
+        lines.append(f"    - Has cash for payment? {cash[k] >= annual_payment} (cash: ${cash[k]:,.0f})")
+        lines.append(f"    → {SOURCE_MESSAGES[source]}")
+
+        lines.append("")
+        lines.append(f"  After Withdrawal:")
+        lines.append(f"    Stocks: ${trace['stock_after'][k]:,.2f}")
+        lines.append(f"    Cash:   ${trace['cash_after'][k]:,.2f}")
+        lines.append("")
+
+        lines.append(f"  After Returns Applied:")
+        lines.append(f"    Stocks: ${stock[year]:,.2f} (after {stock_return:+.2f}%)")
+        lines.append(f"    Cash:   ${cash[year]:,.2f} (after +{(CASH_GROWTH - 1) * 100:.1f}%)")
+        lines.append(f"    Total:  ${stock[year] + cash[year]:,.2f}")
+        lines.append(f"    Remaining Mortgage: ${mortgage[year]:,.2f}")
+        lines.append("")
 
         # Analysis
-        if stock_return < 0 and source.startswith("STOCKS"):
-            print(f"  ⚠️  WARNING: Market was DOWN {stock_return}% but withdrew from STOCKS!")
-            print(f"       This violates the 'use cash in down markets' principle")
+        if stock_return < 0 and source != SOURCE_PROTECT_BASE:
+            lines.append(f"  ⚠️  WARNING: Market was DOWN {stock_return}% but withdrew from STOCKS!")
+            lines.append(f"       This violates the 'use cash in down markets' principle")
+
+        if stock[year] < protected_base:
+            lines.append(f"  ⚠️  WARNING: Stocks (${stock[year]:,.0f}) BELOW protected base (${protected_base:,})")
 
-        if stock_balance < protected_base:
-            print(f"  ⚠️  WARNING: Stocks (${stock_balance:,.0f}) BELOW protected base (${protected_base:,})")
+        lines.append("")
+        lines.append("=" * 100)
+        lines.append("")
 
-        print()
-        print("=" * 100)
-        print()
+    sys.stdout.write("\n".join(lines) + "\n")
 
 
 if __name__ == "__main__":
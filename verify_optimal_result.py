@@ -56,14 +56,18 @@ def main():
         print()
 
         # Show year-by-year for first 10 years
-        print(f"  First 10 years:")
-        print(f"  Year | Return  | Stocks  | Cash    | Total   | Source")
-        print(f"  -----|---------|---------|---------|---------|-------------------------")
-
-        for y in result['year_by_year'][:10]:
-            print(f"  {y['year']:4d} | {y['return']:>+6.2f}% | ${y['stock_balance']:>6,.0f} | "
-                  f"${y['cash_balance']:>6,.0f} | ${y['total_balance']:>6,.0f} | "
-                  f"{y['withdrawal_source'][:23]:23s}")
+        rows = [
+            f"  First 10 years:",
+            f"  Year | Return  | Stocks  | Cash    | Total   | Source",
+            f"  -----|---------|---------|---------|---------|-------------------------",
+        ]
+        rows.extend(
+            f"  {y['year']:4d} | {y['return']:>+6.2f}% | ${y['stock_balance']:>6,.0f} | "
+            f"${y['cash_balance']:>6,.0f} | ${y['total_balance']:>6,.0f} | "
+            f"{y['withdrawal_source'][:23]:23s}"
+            for y in result['year_by_year'][:10]
+        )
+        sys.stdout.write("\n".join(rows) + "\n")
 
         print()
         print("-" * 90)